@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import atexit
+import shutil
+import time
+import random
+import argparse
+import tempfile
+import platform
+import tracemalloc
+
+# Everything under APPDATA is redirected to a scratch directory before any app module is imported,
+# so benchmark runs never touch the user's real sessions database.
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="reports_bench_")
+atexit.register(shutil.rmtree, _SCRATCH_DIR, True)
+os.environ["APPDATA"] = _SCRATCH_DIR
+os.makedirs(os.path.join(_SCRATCH_DIR, "ReportsGenerator"), exist_ok=True)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import data_manager
+from core.constants import SSR_DATA_EXCEL
+from core.document_generator import generate_docx_internal, generate_html_preview
+from core.excel_export import write_items_workbook
+from core.ssr_catalog import read_ssr_catalog
+from core.utilities import num_to_words_indian, _amount_to_words
+
+DEFAULT_ITEM_SIZES = [10, 100, 1000, 10000]
+DEFAULT_SESSION_SIZES = [10, 1000, 10000]
+ITEMS_PER_SESSION = 20
+# Sub-millisecond stages jitter by more than any sensible threshold, so tiny absolute changes are ignored.
+NOISE_FLOOR_MS = 1.0
+NOISE_FLOOR_MIB = 0.5
+
+_DESCRIPTIONS = [
+    "Providing and laying rubble soling including hand packing",
+    "Providing and laying in situ cement concrete M15 of trap metal for foundation",
+    "Providing and laying plain cement concrete M-10 for bedding",
+    "Constructing brick masonry inspection chamber of inside dimensions",
+    "Providing and laying S.W. pipe of class SP-1 including jointing",
+    "Providing and laying Shahabad stone flooring on cement mortar",
+    "Excavation for foundation in all kinds of soil including shoring"
+]
+_UNITS = ["cum", "sqm", "rmt", "no", "kg"]
+
+def make_items(count, seed=0):
+    rng = random.Random(seed)
+    items = []
+    for index in range(1, count + 1):
+        rate = rng.uniform(50, 25000)
+        quantity = rng.uniform(0.5, 500)
+        items.append({
+            "sr_no": str(index), "chapter": f"Chapter {rng.randint(1, 30)}", "ssr_no": f"{rng.randint(1, 40)}.{rng.randint(1, 60):02d}",
+            "reference_no": "", "description": rng.choice(_DESCRIPTIONS), "additional_spec": "",
+            "unit": rng.choice(_UNITS), "unit_rate": f"₹{rate:,.2f}", "quantity": f"{quantity:.3f}",
+            "total": f"₹{rate * quantity:,.2f}", "executed_quantity": f"{quantity * rng.uniform(0.8, 1.2):.3f}"
+        })
+    return items
+
+def make_bill(count, seed=0, language="en"):
+    items = make_items(count, seed)
+    total = sum(float(i["total"].replace("₹", "").replace(",", "")) for i in items)
+    return {
+        "name": f"Synthetic bill {count}", "name_work": "Improvement of internal roads", "contractor": "M/s Example Constructions",
+        "agreement_no": "B1/12 of 2023-24", "mb_no": "1234", "fund_head": "MLA Fund", "constituency": "Bandra",
+        "date": "01-04-2024", "start_date": "01-04-2024", "end_date": "31-03-2025", "language": language,
+        "items": items, "total_amount": f"₹{total:,.2f}",
+        "signatory_jr_engineer": "J. Engineer", "deputy_engineer": "D. Engineer", "executive_engineer": "E. Engineer"
+    }
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def measure(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    # Peak memory comes from a separate traced run so tracemalloc overhead does not skew the timings.
+    if setup:
+        setup()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "runs": repeat,
+        "p50_ms": percentile(timings, 0.50) * 1000, "p90_ms": percentile(timings, 0.90) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000, "max_ms": max(timings) * 1000,
+        "peak_mib": peak / (1024 * 1024)
+    }
+
+def _scratch_path(name):
+    return os.path.join(_SCRATCH_DIR, name)
+
+def bench_docx(size, repeat):
+    data = make_bill(size)
+    return measure(lambda: generate_docx_internal(data, _scratch_path("bench.docx")), repeat)
+
+def bench_preview(size, repeat):
+    data = make_bill(size)
+    return measure(lambda: generate_html_preview(data), repeat)
+
+def bench_excel(size, repeat):
+    data = make_bill(size)
+    return measure(lambda: write_items_workbook(_scratch_path("bench.xlsx"), data), repeat)
+
+def bench_number_words(size, repeat):
+    amounts = [item["unit_rate"] for item in make_items(size)]
+    # The words cache is cleared before every run so each sample is a cold conversion.
+    return measure(lambda: [num_to_words_indian(a) for a in amounts], repeat, setup=_amount_to_words.cache_clear)
+
+def _reset_database():
+    data_manager.DB_PATH = _scratch_path("bench.db")
+    if os.path.exists(data_manager.DB_PATH):
+        os.remove(data_manager.DB_PATH)
+    data_manager.db_setup()
+
+def _save_sessions(count):
+    bill = make_bill(ITEMS_PER_SESSION)
+    for index in range(count):
+        data_manager.save_session(f"Session {index}", bill)
+
+def _fill_sessions(count):
+    _reset_database()
+    _save_sessions(count)
+
+def bench_save_session(size, repeat):
+    return measure(lambda: _save_sessions(size), repeat, setup=_reset_database)
+
+def bench_load_sessions(size, repeat):
+    _fill_sessions(size)
+    return measure(data_manager.load_sessions, repeat)
+
+def bench_session_index(size, repeat):
+    _fill_sessions(size)
+    return measure(data_manager.load_session_index, repeat)
+
+def bench_ssr_load(size, repeat):
+    return measure(lambda: read_ssr_catalog(SSR_DATA_EXCEL), repeat)
+
+def bench_ssr_all_chapters(size, repeat):
+    return measure(lambda: read_ssr_catalog(SSR_DATA_EXCEL).load_all(), repeat)
+
+# stage name -> (benchmark, which size list it runs over)
+STAGES = {
+    "docx": (bench_docx, "items"),
+    "html_preview": (bench_preview, "items"),
+    "excel_export": (bench_excel, "items"),
+    "number_words": (bench_number_words, "items"),
+    "save_session": (bench_save_session, "sessions"),
+    "load_sessions": (bench_load_sessions, "sessions"),
+    "session_index": (bench_session_index, "sessions"),
+    "ssr_load": (bench_ssr_load, None),
+    "ssr_all_chapters": (bench_ssr_all_chapters, None)
+}
+
+def run(stages, item_sizes, session_sizes, repeat):
+    results = {}
+    for stage in stages:
+        bench, size_kind = STAGES[stage]
+        sizes = {"items": item_sizes, "sessions": session_sizes}.get(size_kind, [0])
+        for size in sizes:
+            key = f"{stage}[{size}]" if size_kind else stage
+            print(f"  {key} ...", end="", flush=True)
+            results[key] = bench(size, repeat)
+            print(f" p50 {results[key]['p50_ms']:.1f} ms, peak {results[key]['peak_mib']:.1f} MiB", flush=True)
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'benchmark':32} {'baseline p50':>14} {'current p50':>14} {'change':>9}")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            print(f"{key:32} {'-':>14} {current['p50_ms']:>11.1f} ms {'new':>9}")
+            continue
+        change = (current["p50_ms"] - previous["p50_ms"]) / previous["p50_ms"] if previous["p50_ms"] else 0.0
+        flag = ""
+        if change > threshold and current["p50_ms"] - previous["p50_ms"] > NOISE_FLOOR_MS:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        memory_change = current["peak_mib"] - previous.get("peak_mib", current["peak_mib"])
+        if previous.get("peak_mib") and memory_change / previous["peak_mib"] > threshold and memory_change > NOISE_FLOOR_MIB:
+            flag += "  MEMORY"
+            if key not in regressions:
+                regressions.append(key)
+        print(f"{key:32} {previous['p50_ms']:>11.1f} ms {current['p50_ms']:>11.1f} ms {change:>+8.0%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark document generation, preview and persistence hot paths.")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--items", nargs="+", type=int, default=DEFAULT_ITEM_SIZES, help="bill sizes in items")
+    parser.add_argument("--sessions", nargs="+", type=int, default=DEFAULT_SESSION_SIZES, help="session store sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by an earlier --output run")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    print(f"Running benchmarks (scratch dir {_SCRATCH_DIR})")
+    results = run(args.stages, args.items, args.sessions, max(1, args.repeat))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "repeat": args.repeat, "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+from functools import lru_cache, cached_property
+
+from core.constants import REPORT_TRANSLATIONS, MATERIAL_KEYS
+from core.material_catalog import get_material_catalog, compute_material_consumption
+from core.data_manager import bill_item_key, load_bill_history
+from core.totals import to_decimal, round_paise, insurance_on, format_rupees
+from core.utilities import amounts_to_words
+
+ABSTRACT_HEADERS = ["Item No", "Quantity", "Quantity upto Date", "Unit", "Description of Item", "Rate", "Words", "Amount Since Previous", "Amount upto Date"]
+EXCESS_SAVING_HEADERS = ["Item No.", "Tender\nQuantity", "Executed\nQuantity", "Unit", "Description of Item", "Excess", "Saving", "Remarks"]
+CEMENT_HEADERS = ["Sr. No", "Tender Description", "Executed\nQuantity", "Rate of\ncement\nConsumption", "Unit", "Theoretical\nConsumption\nin Bag"]
+# (material, unit) in MATERIAL_KEYS order
+MATERIAL_COLUMNS = [("Sand", "M3"), ("Rubble", "M3"), ("Brick", "Nos."), ("Metal", "M3"), ("Cement", "Bags")]
+
+@lru_cache(maxsize=None)
+def report_text(language):
+    table = REPORT_TRANSLATIONS.get(language, {})
+    return lambda text: table.get(text, text)
+
+def apply_bill_history(data, bill_no, previous):
+    # previous is the preceding running-account bill on the same agreement as (bill_no, date, cumulative per item).
+    t = report_text(data.get('language', 'en'))
+    cumulative = previous[2] if previous else {}
+    data["bill_no"] = bill_no or ""
+    data["previous_bill"] = t("RA Bill No. %s dated %s") % (previous[0], previous[1]) if previous else ""
+    seen = set()
+    for item in data.get("items", []):
+        key = bill_item_key(item)
+        prior = cumulative.get(key) if key not in seen else None
+        seen.add(key)
+        if prior:
+            item["upto_date_quantity"] = f"{(to_decimal(prior[0]) + to_decimal(item.get('quantity'))).normalize():f}"
+            item["upto_date_total"] = format_rupees(round_paise(prior[1]) + to_decimal(item.get("total")))
+    previous_amount = sum((round_paise(amount) for _, amount in cumulative.values()), to_decimal(0))
+    data["upto_date_amount"] = format_rupees(previous_amount + to_decimal(data.get("total_amount", 0)))
+    return data
+
+def with_bill_history(data):
+    # Render data carries the open session's id rather than its history, so the bill chain is queried
+    # by whoever renders it, off the GUI thread.
+    session_id = data.pop("history_session_id", None)
+    return apply_bill_history(data, *load_bill_history(data.get("agreement_no"), session_id))
+
+class BillModel:
+    # Everything the DOCX report and the HTML preview print about a bill, computed once and formatted once.
+    # Sections are computed on first access, so a template without e.g. a cement statement never pays for it.
+    def __init__(self, data):
+        self.data = data
+        self.language = data.get('language', 'en')
+        self.t = report_text(self.language)
+        self.items = data.get('items', [])
+
+    @cached_property
+    def total(self):
+        return round_paise(self.data.get('total_amount', 0))
+
+    @cached_property
+    def insurance(self):
+        return insurance_on(self.total)
+
+    @cached_property
+    def grand_total(self):
+        return self.total + self.insurance
+
+    @cached_property
+    def upto_date_total(self):
+        return round_paise(self.data.get('upto_date_amount', self.data.get('total_amount', 0)))
+
+    @cached_property
+    def total_rows(self):
+        # (label, since previous bill, upto date)
+        t = self.t
+        upto_insurance = insurance_on(self.upto_date_total)
+        return [(t("TOTAL : Rs"), format_rupees(self.total), format_rupees(self.upto_date_total)),
+                (t("Add INSURANCE 0.5 %"), format_rupees(self.insurance), format_rupees(upto_insurance)),
+                (t("TOTAL BILL AMT (Rs.)"), format_rupees(self.grand_total), format_rupees(self.upto_date_total + upto_insurance))]
+
+    @cached_property
+    def abstract_rows(self):
+        rate_words = amounts_to_words([item.get("unit_rate", "0") for item in self.items], self.language)
+        return [(item.get("sr_no", ""), item.get("quantity", ""), item.get("upto_date_quantity", item.get("quantity", "")),
+                 item.get("unit", ""), item.get("description", ""), item.get("unit_rate", ""), words, item.get("total", ""),
+                 item.get("upto_date_total", item.get("total", "")))
+                for item, words in zip(self.items, rate_words)]
+
+    @cached_property
+    def excess_saving_rows(self):
+        remark = self.t("As Per Site Condition")
+        return [(item.get("sr_no", ""), item.get("quantity", ""), item.get("executed_quantity", ""), item.get("unit", ""),
+                 item.get("description", ""), str(item.get("excess", "-")), str(item.get("saving", "-")),
+                 item.get("remarks_excess_saving", remark))
+                for item in self.items]
+
+    @cached_property
+    def _consumption(self):
+        return compute_material_consumption(self.items)
+
+    @cached_property
+    def consumption_rows(self):
+        rows = []
+        for row in self._consumption[0]:
+            cells = [row["item_no"], row["short_desc"], f'{row["qty"]:.2f}', row["unit"]]
+            for key in MATERIAL_KEYS:
+                cells.append(f'{row["ratios"].get(key, 0.0):.3f}')
+                cells.append(f'{row["totals"].get(key, 0.0):.2f}')
+            rows.append(cells)
+        return rows
+
+    @cached_property
+    def consumption_totals(self):
+        return [f'{self._consumption[1][key]:.2f}' for key in MATERIAL_KEYS]
+
+    @cached_property
+    def _cement(self):
+        catalog = get_material_catalog()
+        rows = []
+        cement_total = 0.0
+        for item in self.items:
+            details = catalog.match(item)
+            if details is None or details["ratios"].get("cement", 0.0) <= 0:
+                continue
+            try:
+                executed_qty = float(item.get('executed_quantity', '0'))
+            except (ValueError, TypeError):
+                continue
+            cement_rate = details["ratios"].get("cement", 0.0)
+            consumption = executed_qty * cement_rate
+            cement_total += consumption
+            rows.append((item.get("sr_no", ""), details["short_desc"], f'{executed_qty:.2f}', f'{cement_rate:.3f}',
+                         item.get("unit", ""), f'{consumption:.2f}'))
+        return rows, cement_total
+
+    @cached_property
+    def cement_rows(self):
+        return self._cement[0]
+
+    @cached_property
+    def cement_total(self):
+        return f'{self._cement[1]:.2f}'
+
+    @cached_property
+    def cement_say(self):
+        return f'{round(self._cement[1]):.0f}'
+
+    @cached_property
+    def excess_saving_signatures(self):
+        return [(self.data.get('deputy_engineer', 'DEPUTY ENGINEER'), ["SLUMP IMP. (WEST) SUB DIV NO.", "M.S.I.BOARD, MHADA, MUMBAI-400051"]),
+                (self.data.get('executive_engineer', 'EXECUTIVE ENGINEER'), ["SLUMP IMP. (WEST)", "M.S.I.BOARD, MHADA, MUMBAI-400051"])]
+
+    @cached_property
+    def cement_signatures(self):
+        return [(self.data.get('executive_engineer', '[Executive Engineer Name]'), ["SECT ENGINEER/ D.B.", "EXECUTIVE ENGINEER WEST", "M.S.I.BOARD, MHADA, MUMBAI-51"]),
+                (self.data.get('signatory_jr_engineer', '[Jr. Engineer Name]'), ["JR./ SECT./ ASST. ENGINEER", "SLUMP IMP. (WEST) SUB DIV NO", "M.S.I.BOARD, MHADA, MUMBAI-51"]),
+                (self.data.get('deputy_engineer', '[Deputy Engineer Name]'), ["DEPUTY ENGINEER", "SLUMP IMP. (WEST) SUB DIV NO", "M.S.I.BOARD, MHADA, MUMBAI-51"])]
@@ -4,7 +4,15 @@ import hashlib
 # --- File Paths and Constants ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_PATH_MERGED = os.path.join(SCRIPT_DIR, "assets", "template_merged.docx")
+TEMPLATE_PATH_MERGED_MARATHI = os.path.join(SCRIPT_DIR, "assets", "template_merged_marathi.docx")
+TEMPLATE_PATHS = {
+    'en': TEMPLATE_PATH_MERGED,
+    'mr': TEMPLATE_PATH_MERGED_MARATHI
+}
 SSR_DATA_EXCEL = os.path.join(SCRIPT_DIR, "assets", "ssr_data.xlsx")
+# Schedules of earlier years, one workbook per version named after it (e.g. "2022-23.xlsx").
+SSR_VERSIONS_DIR = os.path.join(SCRIPT_DIR, "assets", "ssr")
+MATERIAL_RATIOS_CSV = os.path.join(SCRIPT_DIR, "assets", "material_ratios.csv")
 SESSION_TIMEOUT = 30 * 60 * 1000
 
 # --- User Authentication ---
@@ -120,6 +128,7 @@ TRANSLATIONS = {
         "Please select a valid item.": "कृपया एक वैध वस्तू निवडा.",
         "Data Not Loaded": "डेटा लोड झाला नाही",
         "SSR data not available.": "SSR डेटा उपलब्ध नाही.",
+        "Loading SSR catalog...": "SSR सूची लोड होत आहे...",
         "Excel Data Missing": "एक्सेल डेटा गहाळ",
         "Error: '%s' not found.\nPlease ensure the file exists in the 'assets' folder.": "त्रुटी: '%s' सापडले नाही.\nकृपया 'assets' फोल्डरमध्ये फाइल अस्तित्वात असल्याची खात्री करा.",
         "Invalid Excel File": "अवैध एक्सेल फाइल",
@@ -134,7 +143,8 @@ TRANSLATIONS = {
         "Software Language": "सॉफ्टवेअर भाषा",
         "English": "इंग्रजी",
         "Marathi": "मराठी",
-        "Auto-Save Interval (minutes)": "ऑटो-सेव्ह मध्यांतर (मिनिटे)",
+        "Auto-Save After Idle (seconds)": "निष्क्रियतेनंतर ऑटो-सेव्ह (सेकंद)",
+        "seconds": "सेकंद",
         "Backup & Export Location": "बॅकअप आणि निर्यात स्थान",
         "Choose Location": "स्थान निवडा",
         "No construction items to export.": "निर्यात करण्यासाठी कोणतीही बांधकाम वस्तू नाही.",
@@ -151,34 +161,206 @@ TRANSLATIONS = {
         "`pypandoc` library not installed.": "`pypandoc` लायब्ररी स्थापित नाही.",
         "Dependency Missing": "अवलंबन गहाळ",
         "Cannot generate PDF because `pypandoc` is not installed.": "`pypandoc` स्थापित नसल्यामुळे PDF तयार करू शकत नाही.",
-        "DOCX generation failed: %s": "DOCX निर्मिती अयशस्वी: %s"
+        "DOCX generation failed: %s": "DOCX निर्मिती अयशस्वी: %s",
+        "Export Bills": "देयके निर्यात करा",
+        "Export Bills to Excel": "देयके एक्सेलमध्ये निर्यात करा",
+        "Filter by date": "दिनांकानुसार निवडा",
+        "From": "पासून",
+        "To": "पर्यंत",
+        "Select All": "सर्व निवडा",
+        "Select None": "काहीही निवडू नका",
+        "No bills selected.": "कोणतेही देयक निवडलेले नाही.",
+        "%d bills exported to:\n%s": "%d देयके येथे निर्यात केली:\n%s",
+        "Show Performance Readout": "कार्यक्षमता माहिती दाखवा",
+        "Preview": "पूर्वावलोकन",
+        "Export": "निर्यात",
+        "Previous Page": "मागील पान",
+        "Next Page": "पुढील पान",
+        "Page %d": "पान %d",
+        "Exact Preview": "अचूक पूर्वावलोकन",
+        "Exact Preview (rendered from the DOCX)": "अचूक पूर्वावलोकन (DOCX वरून तयार)",
+        "Exact preview updated.": "अचूक पूर्वावलोकन अद्ययावत केले.",
+        "Exact preview needs LibreOffice (or Pandoc with a LaTeX engine) installed.": "अचूक पूर्वावलोकनासाठी LibreOffice (किंवा LaTeX सह Pandoc) स्थापित असणे आवश्यक आहे.",
+        "Import Items...": "वस्तू आयात करा...",
+        "Import measurements from an Excel or CSV sheet of SSR item numbers and quantities.": "SSR बाब क्रमांक व परिमाण असलेल्या Excel किंवा CSV शीटमधून मोजमापे आयात करा.",
+        "Paste Items": "वस्तू पेस्ट करा",
+        "Paste SSR item numbers and quantities copied from a spreadsheet.": "स्प्रेडशीटमधून कॉपी केलेले SSR बाब क्रमांक व परिमाण पेस्ट करा.",
+        "Import Measurements": "मोजमापे आयात करा",
+        "Measurement Sheets (*.xlsx *.csv)": "मोजमाप शीट (*.xlsx *.csv)",
+        "Import Error": "आयात त्रुटी",
+        "Could not read the measurement sheet: %s": "मोजमाप शीट वाचता आली नाही: %s",
+        "The clipboard holds no measurement lines.": "क्लिपबोर्डवर मोजमापाच्या ओळी नाहीत.",
+        "%d items imported.": "%d वस्तू आयात केल्या.",
+        "%d lines could not be matched:": "%d ओळी जुळल्या नाहीत:",
+        "Line %d: %s (%s)": "ओळ %d: %s (%s)",
+        "Invalid quantity": "अवैध परिमाण",
+        "Item not in SSR": "बाब SSR मध्ये नाही",
+        "Reprice Bills": "देयकांचे दर सुधारा",
+        "Reprice saved bills against the current SSR rates.": "जतन केलेल्या देयकांचे दर चालू SSR दरांनुसार सुधारा.",
+        "Reprice with Current SSR...": "चालू SSR दरांनुसार सुधारा...",
+        "Replace the rates and amounts of %d saved bills with the current SSR rates?\nQuantities are kept; unsaved changes to the open bill are saved first.": "%d जतन केलेल्या देयकांचे दर व रक्कम चालू SSR दरांनी बदलायच्या?\nपरिमाण तसेच राहतील; उघड्या देयकातील जतन न केलेले बदल आधी जतन केले जातील.",
+        "Repricing %d bills...": "%d देयकांचे दर सुधारत आहे...",
+        "%d of %d bills repriced.": "%d पैकी %d देयकांचे दर सुधारले.",
+        "Rate Revision Report": "दर सुधारणा अहवाल",
+        "%d of %d bills repriced. Total change: ₹%s": "%d पैकी %d देयकांचे दर सुधारले. एकूण फरक: ₹%s",
+        "Bill": "देयक",
+        "Items Repriced": "दर सुधारलेल्या बाबी",
+        "Items Not in SSR": "SSR मध्ये नसलेल्या बाबी",
+        "Previous Total": "आधीची एकूण रक्कम",
+        "Revised Total": "सुधारित एकूण रक्कम",
+        "Change": "फरक",
+        "Save Report...": "अहवाल जतन करा...",
+        "Save Report": "अहवाल जतन करा",
+        "Could not save the report: %s": "अहवाल जतन करता आला नाही: %s",
+        "SSR Version:": "SSR आवृत्ती:",
+        "Current": "चालू",
+        "Chapter:": "प्रकरण:",
+        "All Chapters": "सर्व प्रकरणे",
+        "Clear Items": "सर्व वस्तू काढा",
+        "Remove every item from the table.": "तक्त्यातील सर्व वस्तू काढा.",
+        "Undo": "पूर्ववत करा",
+        "Redo": "पुन्हा करा",
+        "Add Items": "वस्तू जोडा",
+        "Delete Item": "वस्तू हटवा",
+        "Edit Item": "वस्तू संपादित करा",
+        "Edit Signatory": "स्वाक्षरीकर्ता संपादित करा",
+        "Auto-saved: %s": "स्वयंचलितपणे जतन केले: %s"
     }
 }
 
-# --- Data for Material Consumption ---
-MATERIAL_CONSUMPTION_MAP = {
-    "soling": {
-        "short_desc": "Soling",
-        "ratios": {"sand": 0.000, "rubble": 1.200, "brick": 0.00, "metal": 0.000, "cement": 0.000}
-    },
-    "s.w. pipe": {
-        "short_desc": "9\" GSW Pipe",
-        "ratios": {"sand": 0.000, "rubble": 0.000, "brick": 0.00, "metal": 0.000, "cement": 0.080}
-    },
-    "m15": {
-        "short_desc": "P.C.C. 1:2:4",
-        "ratios": {"sand": 0.445, "rubble": 0.000, "brick": 0.00, "metal": 1.030, "cement": 6.400}
-    },
-    "inspection chamber": {
-        "short_desc": "I/C 90 x 45",
-        "ratios": {"sand": 0.540, "rubble": 0.000, "brick": 527.00, "metal": 0.300, "cement": 3.530}
-    },
-    "m-10": {
-        "short_desc": "P.C.C. 1:3:6",
-        "ratios": {"sand": 0.470, "rubble": 0.000, "brick": 0.00, "metal": 0.940, "cement": 4.400}
-    },
-    "shahabad stone flooring": {
-        "short_desc": "R/S Ladi",
-        "ratios": {"sand": 0.022, "rubble": 0.000, "brick": 0.00, "metal": 0.000, "cement": 0.135}
+# --- Report (DOCX and preview) strings ---
+REPORT_TRANSLATIONS = {
+    'mr': {
+        "Fund Head:": "निधी प्रमुख:",
+        "Name:": "नाव:",
+        "Constituency:": "मतदारसंघ:",
+        "Office of the Deputy Engineer": "उप अभियंता यांचे कार्यालय",
+        "Office of the Executive Engineer": "कार्यकारी अभियंता यांचे कार्यालय",
+        "M.S.I.B. WEST Division": "म.झो.सु.मं. पश्चिम विभाग",
+        "MHADA, Bandra (E),": "म्हाडा, वांद्रे (पू.),",
+        "Mumbai-400051.": "मुंबई-४०००५१.",
+        "MHADA, Mumbai.": "म्हाडा, मुंबई.",
+        "M.S.I. Board, Mumbai.": "म.झो.सु. मंडळ, मुंबई.",
+        "To,": "प्रति,",
+        "Sub: Submission of %s": "विषय: %s सादर करणेबाबत",
+        "Sir,": "महोदय,",
+        "I am submitting herewith the %s of above work along with site statement & M.B.No. %s for making payment to the contractor %s.":
+            "उपरोक्त कामाचे %s स्थळ विवरण व मो.पु.क्र. %s सह कंत्राटदार %s यांना प्रदान करण्यासाठी सोबत सादर करीत आहे.",
+        "Agreement No:": "करार क्र:",
+        "Yours faithfully,": "आपला विश्वासू,",
+        "Deputy Engineer": "उप अभियंता",
+        "D.A.: M.B.No.": "सोबत: मो.पु.क्र.",
+        "FORM 47": "नमुना ४७",
+        "RUNNING ACCOUNT BILL": "चालू देयक",
+        "Division: MSIB West Division": "विभाग: म.झो.सु.मं. पश्चिम विभाग",
+        "Sub-Division: Sub Division No.": "उपविभाग: उपविभाग क्र.",
+        "Name of Contractor:": "कंत्राटदाराचे नाव:",
+        "Serial No. of this bill:": "या देयकाचा अनुक्रमांक:",
+        "Name of Work:": "कामाचे नाव:",
+        "No. and date of previous bill:": "मागील देयकाचा क्र. व दिनांक:",
+        "RA Bill No. %s dated %s": "चालू देयक क्र. %s दिनांक %s",
+        "Reference to agreement:": "कराराचा संदर्भ:",
+        "Acceptance No:": "स्वीकृती क्र:",
+        "Date:": "दिनांक:",
+        "Work Order No:": "कार्यादेश क्र:",
+        "Date of written order to commence work:": "काम सुरू करण्याच्या लेखी आदेशाचा दिनांक:",
+        "Date of completion stipulated in contract:": "करारानुसार काम पूर्ण करण्याचा दिनांक:",
+        "Date of actual completion of work:": "काम प्रत्यक्ष पूर्ण झाल्याचा दिनांक:",
+        "Annexure – I": "परिशिष्ट – १",
+        "Name of Agency:": "अभिकर्त्याचे नाव:",
+        "CERTIFICATE": "प्रमाणपत्र",
+        "Materials are used in subjected are as per specifications.": "विषयांकित कामात वापरलेले साहित्य विनिर्देशानुसार आहे.",
+        "Construction material has been tested and test reports are found satisfactory.": "बांधकाम साहित्याची चाचणी करण्यात आली असून चाचणी अहवाल समाधानकारक आहेत.",
+        "The subjected site is not inspected by Vigilance and Quality Control Cell / A and hence the question of pending remarks does not arise.":
+            "विषयांकित स्थळाची दक्षता व गुणनियंत्रण कक्षाने तपासणी केलेली नाही, त्यामुळे प्रलंबित शेऱ्यांचा प्रश्न उद्भवत नाही.",
+        "Nothing is outstanding against the contractor.": "कंत्राटदाराकडे काहीही थकबाकी नाही.",
+        "It is to certify that the contractors have not put any sort of claim against the subjected work.": "प्रमाणित करण्यात येते की कंत्राटदारांनी विषयांकित कामाबाबत कोणताही दावा केलेला नाही.",
+        "J.E./S.E./Asst. Engineer": "क.अ./शा.अ./सहा. अभियंता",
+        "Dy. Engineer": "उप अभियंता",
+        "Executive Engineer": "कार्यकारी अभियंता",
+        "M.S.I.B. West Div": "म.झो.सु.मं. पश्चिम विभाग",
+        "Check List to be Attached with Bills of Contractor": "कंत्राटदाराच्या देयकासोबत जोडावयाची तपासणी सूची",
+        "Name of Work": "कामाचे नाव",
+        "Administrative Approval Accorded by the collector": "जिल्हाधिकारी यांनी दिलेली प्रशासकीय मान्यता",
+        "Amount Rs.": "रक्कम रु.",
+        "Letter No.": "पत्र क्र.",
+        "Technical Sanction accorded by Executive Engineer": "कार्यकारी अभियंता यांनी दिलेली तांत्रिक मान्यता",
+        "Vide letter No:": "पत्र क्र:",
+        "Amount Rs:": "रक्कम रु:",
+        "In Year:": "वर्ष:",
+        "Estimated cost put to tender": "निविदेस ठेवलेली अंदाजित किंमत",
+        "Name of Agency": "अभिकर्त्याचे नाव",
+        "Percentage Quoted": "उद्धृत टक्केवारी",
+        "Agreement No": "करार क्र",
+        "Date of start of work": "काम सुरू केल्याचा दिनांक",
+        "Stipulated date of completion": "काम पूर्ण करण्याचा नियत दिनांक",
+        "ABSTRACT": "गोषवारा",
+        "Item No": "बाब क्र",
+        "Item No.": "बाब क्र.",
+        "Quantity": "परिमाण",
+        "Quantity upto Date": "आजपर्यंतचे परिमाण",
+        "Unit": "एकक",
+        "Description of Item": "बाबीचे वर्णन",
+        "Rate": "दर",
+        "Words": "अक्षरी",
+        "Amount Since Previous": "मागील देयकापासूनची रक्कम",
+        "Amount upto Date": "आजपर्यंतची रक्कम",
+        "TOTAL : Rs": "एकूण : रु",
+        "Add INSURANCE 0.5 %": "अधिक विमा ०.५ %",
+        "TOTAL BILL AMT (Rs.)": "एकूण देयक रक्कम (रु.)",
+        "EXCESS SAVING STATEMENT": "जादा बचत विवरणपत्र",
+        "Name of Work\t:\t": "कामाचे नाव\t:\t",
+        "Name of Agency\t:\t": "अभिकर्त्याचे नाव\t:\t",
+        "Tender\nQuantity": "निविदा\nपरिमाण",
+        "Executed\nQuantity": "केलेले\nपरिमाण",
+        "Tender Qty": "निविदा परिमाण",
+        "Executed Qty": "केलेले परिमाण",
+        "Description": "वर्णन",
+        "Excess": "जादा",
+        "Saving": "बचत",
+        "Remarks": "शेरा",
+        "As Per Site Condition": "स्थळ परिस्थितीनुसार",
+        "MATERIAL CONSUMPTION STATEMENT": "साहित्य वापर विवरणपत्र",
+        "Short Description": "संक्षिप्त वर्णन",
+        "Qty": "परिमाण",
+        "Sand": "वाळू",
+        "Rubble": "दगड",
+        "Brick": "वीट",
+        "Metal": "खडी",
+        "Cement": "सिमेंट",
+        "Ratio": "प्रमाण",
+        "Total Qty (%s)": "एकूण परिमाण (%s)",
+        "Total :": "एकूण :",
+        "Total:": "एकूण:",
+        "CEMENT CONSUMPTION STATEMENT": "सिमेंट वापर विवरणपत्र",
+        "Sr. No": "अनु. क्र",
+        "Tender Description": "निविदेतील वर्णन",
+        "Rate of\ncement\nConsumption": "सिमेंट\nवापराचा\nदर",
+        "Theoretical\nConsumption\nin Bag": "सैद्धांतिक\nवापर\n(गोणी)",
+        "Total =": "एकूण =",
+        "Say =": "म्हणजे =",
+        "Chapter": "प्रकरण",
+        "SSR Item No.": "एसएसआर बाब क्र.",
+        "Reference No.": "संदर्भ क्र.",
+        "Additional Specification": "अतिरिक्त तपशील",
+        "Amount": "रक्कम",
+        "Summary": "सारांश",
+        "Date": "दिनांक",
+        "Items": "बाबी",
+        "Rate Revision": "दर सुधारणा",
+        "Bill": "देयक",
+        "Items Repriced": "दर सुधारलेल्या बाबी",
+        "Items Not in SSR": "SSR मध्ये नसलेल्या बाबी",
+        "Previous Total": "आधीची एकूण रक्कम",
+        "Revised Total": "सुधारित एकूण रक्कम",
+        "Change": "फरक"
     }
-}
\ No newline at end of file
+}
+
+# --- Bill item fields ---
+# Item dict keys in the construction table's column order, and the fields the excess/saving table adds per item.
+ITEM_KEYS = ["sr_no", "chapter", "ssr_no", "reference_no", "description", "additional_spec", "unit", "unit_rate", "quantity", "total"]
+EXCESS_KEYS = ["executed_quantity", "excess", "saving", "remarks_excess_saving"]
+
+# --- Data for Material Consumption ---
+MATERIAL_KEYS = ["sand", "rubble", "brick", "metal", "cement"]
@@ -4,7 +4,10 @@ import time
 import sqlite3
 import datetime
 import atexit
-from .utilities import TEMP_FILES
+from .constants import ITEM_KEYS, EXCESS_KEYS
+from .tracing import logger
+from .totals import round_paise, to_decimal
+from .utilities import TEMP_FILES, normalize_ssr_item_no
 
 SESSION_FILE_PATH = os.path.join(os.getenv('APPDATA'), 'ReportsGenerator', "session_data.json")
 APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), 'ReportsGenerator')
@@ -38,10 +41,14 @@ def load_session_file():
             pass
         return default_data
 
-def save_session_file(data):
+def save_session_file(data, raw=None):
+    # raw is the already serialized data, when the caller has it.
     try:
         with open(SESSION_FILE_PATH, 'w') as f:
-            json.dump(data, f)
+            if raw is None:
+                json.dump(data, f)
+            else:
+                f.write(raw)
         return True
     except (IOError, TypeError):
         return False
@@ -65,28 +72,72 @@ def db_setup():
             cur.execute("ALTER TABLE sessions_new RENAME TO sessions")
         except sqlite3.OperationalError:
             pass
+        chain_exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bill_chain'").fetchone()
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS bill_chain (
+                session_id INTEGER PRIMARY KEY, agreement_no TEXT NOT NULL, bill_no INTEGER NOT NULL,
+                bill_date TEXT, contribution TEXT, cumulative TEXT, bill_amount REAL, upto_date_amount REAL
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_bill_chain_agreement ON bill_chain (agreement_no, bill_no)")
+        if not chain_exists:
+            _backfill_bill_chain(cur)
         cur.execute("DROP TABLE IF EXISTS form_b_entries")
         cur.execute("DROP TABLE IF EXISTS construction_items")
         conn.commit()
     except Exception as e:
-        print(f"Database setup failed: {e}")
+        logger.error("Database setup failed: %s", e)
     finally:
         if conn:
             conn.close()
 
 def save_session(name, data):
+    return store_session(name, data)[0]
+
+def store_session(name, data, session_id=None):
+    # Returns the row as stored, (id, JSON, timestamp), so the caller can show it without reading it back.
+    # With a session_id that row is updated, renamed if need be; otherwise the session is found by name.
+    raw = json.dumps(data)
+    timestamp = datetime.datetime.now().isoformat()
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
-    cur.execute("SELECT id FROM sessions WHERE name = ?", (name,))
+    if session_id is not None:
+        cur.execute("SELECT id FROM sessions WHERE id = ?", (session_id,))
+    else:
+        cur.execute("SELECT id FROM sessions WHERE name = ?", (name,))
     existing_session = cur.fetchone()
     if existing_session:
-        cur.execute("UPDATE sessions SET data = ?, timestamp = ? WHERE id = ?",
-                   (json.dumps(data), datetime.datetime.now().isoformat(), existing_session[0]))
+        session_id = existing_session[0]
+        cur.execute("UPDATE sessions SET name = ?, data = ?, timestamp = ? WHERE id = ?", (name, raw, timestamp, session_id))
     else:
-        cur.execute("INSERT INTO sessions (name, data, timestamp) VALUES (?, ?, ?)",
-                   (name, json.dumps(data), datetime.datetime.now().isoformat()))
+        cur.execute("INSERT INTO sessions (name, data, timestamp) VALUES (?, ?, ?)", (name, raw, timestamp))
+        session_id = cur.lastrowid
+    update_bill_chain(cur, session_id, data)
     conn.commit()
     conn.close()
+    return session_id, raw, timestamp
+
+def bill_data(snapshot):
+    # snapshot is what the form hands over (MergedFormWidget.snapshot): plain strings and row tuples, so the
+    # session dict can be built off the GUI thread.
+    data = dict(snapshot["fields"])
+    data["message"] = snapshot["message"]
+    data["items"] = [dict(zip(ITEM_KEYS, row)) for row in snapshot["rows"]]
+    data["total_amount"] = snapshot["total_amount"]
+    data["ssr_version"] = snapshot["ssr_version"]
+    data.update(snapshot["signatories"])
+    excess = {row[0]: row[1:] for row in snapshot["excess_rows"] if row[0]}
+    for item in data["items"]:
+        values = excess.get(item["sr_no"])
+        if values:
+            item.update(zip(EXCESS_KEYS, values))
+    return data
+
+def save_bill_snapshot(snapshot, name, session_id=None):
+    data = bill_data(snapshot)
+    saved = store_session(name, data, session_id)
+    save_session_file(data, saved[1])
+    return saved
 
 def load_sessions():
     conn = sqlite3.connect(DB_PATH)
@@ -101,9 +152,153 @@ def delete_session_from_db(session_id):
         conn = sqlite3.connect(DB_PATH)
         cur = conn.cursor()
         cur.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+        _unlink_bill(cur, session_id)
         conn.commit()
         conn.close()
         return True
     except Exception as e:
-        print(f"Error deleting session: {e}")
-        return False
\ No newline at end of file
+        logger.error("Error deleting session %s: %s", session_id, e)
+        return False
+
+def load_session_index(date_from=None, date_to=None):
+    # Names and timestamps only; the bill JSON is left in the database until it is actually needed.
+    query = "SELECT id, name, timestamp FROM sessions"
+    conditions, params = [], []
+    if date_from:
+        conditions.append("timestamp >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        conditions.append("timestamp < ?")
+        params.append((date_to + datetime.timedelta(days=1)).isoformat())
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(query + " ORDER BY timestamp DESC", params).fetchall()
+    finally:
+        conn.close()
+
+SESSION_ID_BATCH = 500
+
+def iter_sessions(session_ids):
+    # Yields one decoded bill at a time, so callers never hold more than a single session in memory.
+    session_ids = list(session_ids)
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for start in range(0, len(session_ids), SESSION_ID_BATCH):
+            batch = session_ids[start:start + SESSION_ID_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            cursor = conn.execute(f"SELECT id, name, data, timestamp FROM sessions WHERE id IN ({placeholders}) ORDER BY timestamp", batch)
+            for sid, name, data, timestamp in cursor:
+                try:
+                    yield sid, name, json.loads(data), timestamp
+                except (TypeError, ValueError):
+                    continue
+    finally:
+        conn.close()
+
+# Running-account bills filed against the same agreement form a chain RA 1, 2, 3...  Each link stores what the bill
+# itself adds per item and the cumulative "upto date" totals, so a new bill only needs the previous link, never the
+# JSON of every earlier bill.
+def bill_item_key(item):
+    return normalize_ssr_item_no(item.get("ssr_no")) or item.get("description", "")
+
+def bill_contribution(data):
+    contribution = {}
+    for item in data.get("items", []):
+        entry = contribution.setdefault(bill_item_key(item), [0.0, 0.0])
+        # The chain follows the billed quantity, the one the item's amount is worked out from. Quantities and
+        # amounts are kept as floats in the JSON links and added in Decimal.
+        entry[0] = float(to_decimal(entry[0]) + to_decimal(item.get("quantity")))
+        entry[1] = float(round_paise(to_decimal(entry[1]) + to_decimal(item.get("total"))))
+    return contribution
+
+def _relink_from(cur, agreement_no, bill_no):
+    previous = cur.execute("SELECT cumulative FROM bill_chain WHERE agreement_no = ? AND bill_no < ? ORDER BY bill_no DESC LIMIT 1",
+                           (agreement_no, bill_no)).fetchone()
+    cumulative = json.loads(previous[0]) if previous else {}
+    later = cur.execute("SELECT session_id, contribution FROM bill_chain WHERE agreement_no = ? AND bill_no >= ? ORDER BY bill_no",
+                        (agreement_no, bill_no)).fetchall()
+    for session_id, contribution in later:
+        for key, (quantity, amount) in json.loads(contribution).items():
+            entry = cumulative.setdefault(key, [0.0, 0.0])
+            entry[0] = float(to_decimal(entry[0]) + to_decimal(quantity))
+            entry[1] = float(round_paise(to_decimal(entry[1]) + to_decimal(amount)))
+        upto_date_amount = sum((to_decimal(amount) for _, amount in cumulative.values()), to_decimal(0))
+        cur.execute("UPDATE bill_chain SET cumulative = ?, upto_date_amount = ? WHERE session_id = ?",
+                    (json.dumps(cumulative), float(upto_date_amount), session_id))
+
+def _unlink_bill(cur, session_id):
+    link = cur.execute("SELECT agreement_no, bill_no FROM bill_chain WHERE session_id = ?", (session_id,)).fetchone()
+    if link:
+        cur.execute("DELETE FROM bill_chain WHERE session_id = ?", (session_id,))
+        _relink_from(cur, *link)
+    return link
+
+def update_bill_chain(cur, session_id, data, relink=True):
+    agreement_no = str(data.get("agreement_no") or "").strip()
+    link = cur.execute("SELECT agreement_no, bill_no FROM bill_chain WHERE session_id = ?", (session_id,)).fetchone()
+    if link and link[0] != agreement_no:
+        _unlink_bill(cur, session_id)
+        link = None
+    if not agreement_no:
+        return
+    if link:
+        bill_no = link[1]
+    else:
+        bill_no = (cur.execute("SELECT MAX(bill_no) FROM bill_chain WHERE agreement_no = ?", (agreement_no,)).fetchone()[0] or 0) + 1
+    contribution = bill_contribution(data)
+    cur.execute("INSERT OR REPLACE INTO bill_chain (session_id, agreement_no, bill_no, bill_date, contribution, bill_amount) VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, agreement_no, bill_no, data.get("date", ""), json.dumps(contribution),
+                 float(sum((to_decimal(amount) for _, amount in contribution.values()), to_decimal(0)))))
+    # Saving the latest bill touches one link; re-saving an older one carries the change through the later links.
+    if relink:
+        _relink_from(cur, agreement_no, bill_no)
+    return agreement_no, bill_no
+
+def save_repriced_sessions(revised):
+    # revised is a list of (session id, data).  All bills are written in one transaction, keeping their
+    # timestamps, and each agreement's chain is relinked once from its earliest revised bill.
+    if not revised:
+        return
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        with conn:
+            conn.executemany("UPDATE sessions SET data = ? WHERE id = ?", [(json.dumps(data), sid) for sid, data in revised])
+            cur = conn.cursor()
+            relink = {}
+            for sid, data in revised:
+                link = update_bill_chain(cur, sid, data, relink=False)
+                if link:
+                    relink[link[0]] = min(relink.get(link[0], link[1]), link[1])
+            for agreement_no, bill_no in relink.items():
+                _relink_from(cur, agreement_no, bill_no)
+    finally:
+        conn.close()
+
+def _backfill_bill_chain(cur):
+    for session_id, data in cur.execute("SELECT id, data FROM sessions ORDER BY timestamp").fetchall():
+        try:
+            update_bill_chain(cur, session_id, json.loads(data))
+        except (TypeError, ValueError):
+            continue
+
+def load_bill_history(agreement_no, session_id=None):
+    # Returns (this bill's number, previous link as (bill_no, bill_date, cumulative) or None) for rendering.
+    agreement_no = str(agreement_no or "").strip()
+    if not agreement_no:
+        return None, None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        link = None
+        if session_id is not None:
+            link = conn.execute("SELECT bill_no FROM bill_chain WHERE session_id = ? AND agreement_no = ?", (session_id, agreement_no)).fetchone()
+        if link:
+            bill_no = link[0]
+        else:
+            bill_no = (conn.execute("SELECT MAX(bill_no) FROM bill_chain WHERE agreement_no = ?", (agreement_no,)).fetchone()[0] or 0) + 1
+        previous = conn.execute("SELECT bill_no, bill_date, cumulative FROM bill_chain WHERE agreement_no = ? AND bill_no < ? ORDER BY bill_no DESC LIMIT 1",
+                                (agreement_no, bill_no)).fetchone()
+        return bill_no, (previous[0], previous[1], json.loads(previous[2])) if previous else None
+    finally:
+        conn.close()
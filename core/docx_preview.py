@@ -0,0 +1,153 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import subprocess
+import importlib.util
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QSize, QSizeF, QRectF
+from PyQt6.QtGui import QImage
+
+from core.data_manager import APP_DATA_DIR
+from core.document_generator import generate_docx_internal, template_path_for_language, get_pypandoc
+
+PREVIEW_CACHE_DIR = os.path.join(APP_DATA_DIR, "preview_cache")
+MAX_MEMORY_ENTRIES = 4
+MAX_DISK_ENTRIES = 20
+# Pages are rasterised at 1.5x the 96 dpi layout size so zooming in on them stays sharp.
+RENDER_SCALE = 1.5
+CONVERT_TIMEOUT_SECONDS = 120
+_SOFFICE_CANDIDATES = [
+    "soffice", "libreoffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
+]
+
+_memory_cache = OrderedDict()
+
+class ExactPreviewError(Exception):
+    pass
+
+class PageImageDocument(QObject):
+    # Quacks like the parts of QTextDocument that PreviewView uses, so rendered pages share the same viewer.
+    def __init__(self, images, parent=None):
+        super().__init__(parent)
+        self.images = images
+        first = images[0] if images else None
+        self._page_size = QSizeF(first.width() / RENDER_SCALE, first.height() / RENDER_SCALE) if first else QSizeF(794, 1123)
+
+    def pageCount(self):
+        return len(self.images)
+
+    def pageSize(self):
+        return self._page_size
+
+    def drawContents(self, painter, rect):
+        height = self._page_size.height()
+        index = int(rect.top() // height)
+        if 0 <= index < len(self.images):
+            painter.drawImage(QRectF(0, index * height, self._page_size.width(), height), self.images[index])
+
+def find_soffice():
+    for candidate in _SOFFICE_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+def exact_preview_available():
+    if importlib.util.find_spec("PyQt6.QtPdf") is None:
+        return False
+    return bool(find_soffice() or get_pypandoc())
+
+def preview_cache_key(data):
+    language = data.get('language', 'en')
+    template_path = template_path_for_language(language)
+    try:
+        template_mtime = os.path.getmtime(template_path)
+    except OSError:
+        template_mtime = 0
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    for part in (payload, language, template_path, repr(template_mtime)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _convert_to_pdf(docx_path, out_dir):
+    soffice = find_soffice()
+    if soffice:
+        result = subprocess.run([soffice, "--headless", "--convert-to", "pdf", "--outdir", out_dir, docx_path],
+                                capture_output=True, timeout=CONVERT_TIMEOUT_SECONDS)
+        pdf_path = os.path.join(out_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+        if result.returncode != 0 or not os.path.exists(pdf_path):
+            raise ExactPreviewError(f"LibreOffice could not convert the document: {result.stderr.decode(errors='replace').strip()}")
+        return pdf_path
+    pypandoc = get_pypandoc()
+    if pypandoc:
+        pdf_path = os.path.join(out_dir, "preview.pdf")
+        try:
+            pypandoc.convert_file(docx_path, 'pdf', outputfile=pdf_path, extra_args=['--pdf-engine=xelatex', '-V', 'mainfont=Arial'])
+        except RuntimeError as e:
+            raise ExactPreviewError(f"Pandoc could not convert the document: {e}")
+        return pdf_path
+    raise ExactPreviewError("Exact preview needs LibreOffice (or Pandoc with a LaTeX engine) installed.")
+
+def _render_pdf(pdf_path):
+    from PyQt6.QtPdf import QPdfDocument
+    pdf = QPdfDocument(None)
+    pdf.load(pdf_path)
+    if pdf.status() != QPdfDocument.Status.Ready:
+        raise ExactPreviewError("The converted PDF could not be opened.")
+    images = []
+    for index in range(pdf.pageCount()):
+        points = pdf.pagePointSize(index)
+        # PDF points are 1/72 inch; the layout size is 96 dpi.
+        size = QSize(int(points.width() * 96 / 72 * RENDER_SCALE), int(points.height() * 96 / 72 * RENDER_SCALE))
+        images.append(pdf.render(index, size))
+    pdf.close()
+    return images
+
+def _load_disk_cache(key):
+    entry_dir = os.path.join(PREVIEW_CACHE_DIR, key)
+    if not os.path.isdir(entry_dir):
+        return None
+    names = sorted((n for n in os.listdir(entry_dir) if n.endswith(".png")), key=lambda n: int(n.split(".")[0]))
+    images = [QImage(os.path.join(entry_dir, n)) for n in names]
+    if not images or any(image.isNull() for image in images):
+        return None
+    os.utime(entry_dir)
+    return images
+
+def _store_disk_cache(key, images):
+    entry_dir = os.path.join(PREVIEW_CACHE_DIR, key)
+    try:
+        os.makedirs(entry_dir, exist_ok=True)
+        for index, image in enumerate(images):
+            image.save(os.path.join(entry_dir, f"{index}.png"))
+        entries = sorted((os.path.join(PREVIEW_CACHE_DIR, n) for n in os.listdir(PREVIEW_CACHE_DIR)), key=os.path.getmtime, reverse=True)
+        for stale in entries[MAX_DISK_ENTRIES:]:
+            shutil.rmtree(stale, ignore_errors=True)
+    except OSError:
+        pass
+
+def render_docx_preview(data):
+    key = preview_cache_key(data)
+    images = _memory_cache.get(key)
+    if images is not None:
+        _memory_cache.move_to_end(key)
+        return images
+    images = _load_disk_cache(key)
+    if images is None:
+        with tempfile.TemporaryDirectory(prefix="preview_") as work_dir:
+            docx_path = os.path.join(work_dir, "preview.docx")
+            success, message = generate_docx_internal(data, docx_path)
+            if not success:
+                raise ExactPreviewError(message)
+            images = _render_pdf(_convert_to_pdf(docx_path, work_dir))
+        _store_disk_cache(key, images)
+    _memory_cache[key] = images
+    while len(_memory_cache) > MAX_MEMORY_ENTRIES:
+        _memory_cache.popitem(last=False)
+    return images
@@ -0,0 +1,289 @@
+import io
+import os
+from functools import lru_cache
+from docx import Document
+from docx.shared import Inches, Pt
+from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.ns import qn
+from docx.oxml import OxmlElement
+from docx.enum.section import WD_ORIENT
+
+from core.constants import TEMPLATE_PATH_MERGED
+from core.bill_model import BillModel, ABSTRACT_HEADERS, EXCESS_SAVING_HEADERS, CEMENT_HEADERS, MATERIAL_COLUMNS
+from core.tracing import logger
+
+TABLE_PLACEHOLDERS = ["abstract_table", "excess_saving_statement_table", "material_consumption_statement_table", "cement_consumption_statement_table"]
+
+@lru_cache(maxsize=None)
+def _compiled_template(template_path, mtime):
+    with open(template_path, 'rb') as f:
+        template_bytes = f.read()
+    document = Document(io.BytesIO(template_bytes))
+    texts = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                texts.extend(p.text for p in cell.paragraphs)
+    full_text = "\n".join(texts)
+    table_sections = frozenset(name for name in TABLE_PLACEHOLDERS if f"{{{{{name}}}}}" in full_text)
+    return template_bytes, table_sections
+
+def load_template(template_path):
+    return _compiled_template(template_path, os.path.getmtime(template_path))
+
+def add_table_borders(table):
+    tbl = table._tbl
+    tblPr = tbl.find(qn('w:tblPr'))
+    if tblPr is None:
+        tblPr = OxmlElement('w:tblPr')
+        tbl.insert(0, tblPr)
+    tblBorders = OxmlElement('w:tblBorders')
+    for border_name in ["top", "left", "bottom", "right", "insideH", "insideV"]:
+        border_el = OxmlElement(f'w:{border_name}')
+        border_el.set(qn('w:val'), 'single')
+        border_el.set(qn('w:sz'), '4')
+        border_el.set(qn('w:color'), 'auto')
+        tblBorders.append(border_el)
+    tblPr.append(tblBorders)
+
+def set_table_cell_margins(table, **kwargs):
+    tbl = table._tbl
+    tblPr = tbl.find(qn('w:tblPr'))
+    if tblPr is None:
+        tblPr = OxmlElement('w:tblPr')
+        tbl.insert(0, tblPr)
+    tblCellMar = OxmlElement('w:tblCellMar')
+    for m in kwargs:
+        if kwargs[m] is not None:
+            mar = OxmlElement(f'w:{m}')
+            mar.set(qn('w:w'), str(kwargs[m]))
+            mar.set(qn('w:type'), 'dxa')
+            tblCellMar.append(mar)
+    tblPr.append(tblCellMar)
+
+def _add_header_row(table, headers):
+    hdr_cells = table.rows[0].cells
+    for i, header_text in enumerate(headers):
+        p = hdr_cells[i].paragraphs[0]
+        p.text = header_text
+        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        for run in p.runs: run.font.bold = True
+
+def _add_rows(table, rows):
+    for row in rows:
+        row_cells = table.add_row().cells
+        for cell, text in zip(row_cells, row):
+            cell.text = text
+
+def _add_heading(document, text):
+    p = document.add_paragraph()
+    p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    run = p.add_run(text)
+    font = run.font
+    font.name = 'Times New Roman'
+    font.size = Pt(12)
+    font.bold = True
+    font.underline = True
+    document.add_paragraph()
+
+def _add_work_lines(document, model, with_agency=True):
+    t = model.t
+    p_work = document.add_paragraph()
+    p_work.add_run(t("Name of Work\t:\t")).bold = True
+    p_work.add_run(model.data.get('name_work', ''))
+    if with_agency:
+        p_agency = document.add_paragraph()
+        p_agency.add_run(t("Name of Agency\t:\t")).bold = True
+        p_agency.add_run(model.data.get('contractor', ''))
+    document.add_paragraph()
+
+def _add_signatures(document, signatures):
+    sign_table = document.add_table(rows=1, cols=len(signatures))
+    sign_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    for cell, (name, lines) in zip(sign_table.rows[0].cells, signatures):
+        p = cell.paragraphs[0]
+        p.add_run(name).bold = True
+        for line in lines:
+            p.add_run("\n" + line)
+        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    _make_table_borderless(sign_table)
+    return sign_table
+
+def _generate_abstract_table(document, model):
+    if not model.items:
+        return
+    t = model.t
+
+    # Set page orientation to landscape for this table
+    new_section = document.add_section()
+    new_section.orientation = WD_ORIENT.LANDSCAPE
+    _add_heading(document, t('ABSTRACT'))
+
+    headers = [t(h) for h in ABSTRACT_HEADERS]
+    table = document.add_table(rows=1, cols=len(headers))
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    add_table_borders(table)
+    set_table_cell_margins(table, top=40, bottom=0, left=60, right=60)
+    _add_header_row(table, headers)
+    _add_rows(table, model.abstract_rows)
+
+    for label, since_previous, upto_date in model.total_rows:
+        row_cells = table.add_row().cells
+        row_cells[0].merge(row_cells[3])
+        p_label = row_cells[4].paragraphs[0]; p_label.add_run(label).bold = True
+        row_cells[5].merge(row_cells[6])
+        p_val1 = row_cells[7].paragraphs[0]; p_val1.add_run(since_previous).bold = True
+        p_val2 = row_cells[8].paragraphs[0]; p_val2.add_run(upto_date).bold = True
+
+def _make_table_borderless(table):
+    for row in table.rows:
+        for cell in row.cells:
+            tc_pr = cell._tc.get_or_add_tcPr()
+            tc_borders = OxmlElement('w:tcBorders')
+            for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+                border_el = OxmlElement(f'w:{border_name}')
+                border_el.set(qn('w:val'), 'nil')
+                tc_borders.append(border_el)
+            tc_pr.append(tc_borders)
+
+def _generate_excess_saving_statement(document, model):
+    t = model.t
+    new_section = document.add_section()
+    new_section.orientation = WD_ORIENT.LANDSCAPE
+    _add_work_lines(document, model)
+    _add_heading(document, t('EXCESS SAVING STATEMENT'))
+
+    if not model.items: return
+
+    headers = [t(h) for h in EXCESS_SAVING_HEADERS]
+    table = document.add_table(rows=1, cols=len(headers))
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    add_table_borders(table)
+    _add_header_row(table, headers)
+    _add_rows(table, model.excess_saving_rows)
+
+    document.add_paragraph()
+    sign_table = _add_signatures(document, model.excess_saving_signatures)
+    sign_table.columns[0].width = Inches(3.5)
+    sign_table.columns[1].width = Inches(3.5)
+
+def _generate_material_consumption_table(document, model):
+    t = model.t
+    _add_work_lines(document, model, with_agency=False)
+    _add_heading(document, t('MATERIAL CONSUMPTION STATEMENT'))
+
+    if not model.consumption_rows: return
+
+    table = document.add_table(rows=2, cols=14)
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    add_table_borders(table)
+
+    hdr1, hdr2 = table.rows
+    hdr1.cells[0].merge(hdr2.cells[0]).text = t("Item No")
+    hdr1.cells[1].merge(hdr2.cells[1]).text = t("Short Description")
+    hdr1.cells[2].merge(hdr2.cells[2]).text = t("Qty")
+    hdr1.cells[3].merge(hdr2.cells[3]).text = t("Unit")
+    for i, (name, unit) in enumerate(MATERIAL_COLUMNS):
+        hdr1.cells[4 + i*2].merge(hdr1.cells[5 + i*2]).text = t(name)
+        hdr2.cells[4 + i*2].text = t("Ratio")
+        hdr2.cells[5 + i*2].text = t("Total Qty (%s)") % unit
+
+    _add_rows(table, model.consumption_rows)
+
+    total_cells = table.add_row().cells
+    total_cells[1].text = t("Total :")
+    total_cells[1].paragraphs[0].runs[0].bold = True
+    for i, value in enumerate(model.consumption_totals):
+        p = total_cells[5 + i*2].paragraphs[0]
+        p.add_run(value).bold = True
+
+def _generate_cement_consumption_table(document, model):
+    t = model.t
+    _add_work_lines(document, model)
+    _add_heading(document, t('CEMENT CONSUMPTION STATEMENT'))
+
+    if not model.cement_rows: return
+
+    headers = [t(h) for h in CEMENT_HEADERS]
+    table = document.add_table(rows=1, cols=len(headers))
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    add_table_borders(table)
+    _add_header_row(table, headers)
+    _add_rows(table, model.cement_rows)
+
+    for label, value in [(t("Total ="), model.cement_total), (t("Say ="), model.cement_say)]:
+        row_cells = table.add_row().cells
+        row_cells[0].merge(row_cells[4])
+        row_cells[0].text = label
+        row_cells[0].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
+        row_cells[5].text = value
+
+    document.add_paragraph()
+    document.add_paragraph()
+    _add_signatures(document, model.cement_signatures)
+
+def generate_merged_form_report(data, output_path, template_path):
+    if not os.path.exists(template_path):
+        return False, f"Template file not found: {template_path}"
+
+    try:
+        template_bytes, table_sections = load_template(template_path)
+        if not table_sections and template_path != TEMPLATE_PATH_MERGED:
+            # Older localized templates carry no table placeholders; they get the same sections as the English one.
+            table_sections = load_template(TEMPLATE_PATH_MERGED)[1]
+        document = Document(io.BytesIO(template_bytes))
+        model = BillModel(data)
+
+        for p in document.paragraphs:
+            for key, val in data.items():
+                if isinstance(val, (str, int, float)):
+                    inline = p.runs
+                    full_text = "".join(run.text for run in inline)
+                    placeholder = f"{{{{{key}}}}}"
+                    if placeholder in full_text:
+                        new_text = full_text.replace(placeholder, str(val))
+                        p.clear()
+                        p.add_run(new_text)
+
+        for table in document.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    for p in cell.paragraphs:
+                        for key, val in data.items():
+                            if isinstance(val, (str, int, float)):
+                                inline = p.runs
+                                full_text = "".join(run.text for run in inline)
+                                placeholder = f"{{{{{key}}}}}"
+                                if placeholder in full_text:
+                                    new_text = full_text.replace(placeholder, str(val))
+                                    p.clear()
+                                    p.add_run(new_text)
+
+        all_paragraphs = list(document.paragraphs)
+        for table in document.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    all_paragraphs.extend(cell.paragraphs)
+
+        section_builders = [
+            ("abstract_table", _generate_abstract_table),
+            ("excess_saving_statement_table", _generate_excess_saving_statement),
+            ("material_consumption_statement_table", _generate_material_consumption_table),
+            ("cement_consumption_statement_table", _generate_cement_consumption_table)
+        ]
+        for name, builder in section_builders:
+            if name not in table_sections:
+                continue
+            placeholder = f"{{{{{name}}}}}"
+            for p in all_paragraphs:
+                if placeholder in "".join(r.text for r in p.runs):
+                    p.clear()
+                    break
+            builder(document, model)
+        
+        document.save(output_path)
+        return True, None
+    except Exception as e:
+        logger.exception("DOCX generation failed")
+        return False, f"Failed to generate DOCX: {e}"
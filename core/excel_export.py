@@ -0,0 +1,169 @@
+from core.constants import MATERIAL_KEYS
+from core.bill_model import report_text
+from core.material_catalog import compute_material_consumption
+from core.totals import to_decimal, insurance_on, parse_amount
+
+AMOUNT_FORMAT = '"₹"#,##0.00'
+QUANTITY_FORMAT = '#,##0.000'
+
+# (item key, header, column width, kind) - kind decides how the text from the items table is typed.
+EXCEL_ITEM_COLUMNS = [
+    ("sr_no", "Sr. No", 8, "text"),
+    ("chapter", "Chapter", 14, "text"),
+    ("ssr_no", "SSR Item No.", 12, "text"),
+    ("reference_no", "Reference No.", 14, "text"),
+    ("description", "Description of Item", 60, "text"),
+    ("additional_spec", "Additional Specification", 30, "text"),
+    ("unit", "Unit", 10, "text"),
+    ("unit_rate", "Rate", 14, "amount"),
+    ("quantity", "Quantity", 12, "quantity"),
+    ("total", "Amount", 16, "amount")
+]
+
+_INVALID_TITLE_CHARS = str.maketrans({c: "_" for c in '[]:*?/\\'})
+
+def _sheet_title(name, used_titles):
+    base = (str(name or "").translate(_INVALID_TITLE_CHARS).strip() or "Bill")[:31]
+    title, counter = base, 2
+    while title.lower() in used_titles:
+        suffix = f" ({counter})"
+        title = base[:31 - len(suffix)] + suffix
+        counter += 1
+    used_titles.add(title.lower())
+    return title
+
+class _CellFactory:
+    def __init__(self, worksheet):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        self.worksheet = worksheet
+        self.cell_class = WriteOnlyCell
+        self.bold = Font(bold=True)
+
+    def make(self, value, number_format=None, bold=False):
+        cell = self.cell_class(self.worksheet, value=value)
+        if number_format:
+            cell.number_format = number_format
+        if bold:
+            cell.font = self.bold
+        return cell
+
+def _item_row(cells, item):
+    row = []
+    for key, _, _, kind in EXCEL_ITEM_COLUMNS:
+        value = item.get(key, "")
+        if kind == "amount":
+            row.append(cells.make(parse_amount(value), AMOUNT_FORMAT))
+        elif kind == "quantity":
+            row.append(cells.make(parse_amount(value), QUANTITY_FORMAT))
+        else:
+            row.append(value if value is not None else "")
+    return row
+
+def write_bill_sheet(workbook, title, items, language="en"):
+    from openpyxl.utils import get_column_letter
+    t = report_text(language)
+    worksheet = workbook.create_sheet(title)
+    for index, (_, _, width, _) in enumerate(EXCEL_ITEM_COLUMNS, start=1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+    worksheet.freeze_panes = "A2"
+    cells = _CellFactory(worksheet)
+    worksheet.append([cells.make(t(header), bold=True) for _, header, _, _ in EXCEL_ITEM_COLUMNS])
+
+    total = to_decimal(0)
+    for item in items:
+        row = _item_row(cells, item)
+        total += to_decimal(item.get("total"))
+        worksheet.append(row)
+
+    insurance = insurance_on(total)
+    label_column = len(EXCEL_ITEM_COLUMNS) - 2
+    worksheet.append([])
+    for label, value in ((t("TOTAL : Rs"), total), (t("Add INSURANCE 0.5 %"), insurance), (t("TOTAL BILL AMT (Rs.)"), total + insurance)):
+        worksheet.append([None] * label_column + [cells.make(label, bold=True), cells.make(float(value), AMOUNT_FORMAT, bold=True)])
+    return total
+
+def write_bills_workbook(path, bills, language="en"):
+    # Write-only workbooks stream each row to disk, so memory stays flat however many bills are exported.
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    totals = []
+    for name, items in bills:
+        totals.append(write_bill_sheet(workbook, _sheet_title(name, used_titles), items, language))
+    if not totals:
+        write_bill_sheet(workbook, "Bill", [], language)
+    workbook.save(path)
+    return totals
+
+def write_items_workbook(path, data):
+    return write_bills_workbook(path, [(data.get("name") or "Bill", data.get("items", []))], data.get("language", "en"))
+
+SUMMARY_COLUMNS = [("Sr. No", 8), ("Name of Work", 40), ("Date", 12), ("Items", 8), ("TOTAL : Rs", 16),
+                   ("Add INSURANCE 0.5 %", 16), ("TOTAL BILL AMT (Rs.)", 18)] + [(key.capitalize(), 12) for key in MATERIAL_KEYS]
+
+def write_consolidated_workbook(path, sessions, language="en"):
+    # sessions is an iterable of (id, name, data, timestamp) such as data_manager.iter_sessions; each bill is
+    # written to its own sheet and summarised in one row, then dropped before the next one is read.
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    t = report_text(language)
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet(t("Summary"))
+    for index, (_, width) in enumerate(SUMMARY_COLUMNS, start=1):
+        summary.column_dimensions[get_column_letter(index)].width = width
+    summary.freeze_panes = "A2"
+    cells = _CellFactory(summary)
+    summary.append([cells.make(t(header), bold=True) for header, _ in SUMMARY_COLUMNS])
+
+    used_titles = {summary.title.lower()}
+    grand_total = to_decimal(0)
+    grand_materials = {key: 0.0 for key in MATERIAL_KEYS}
+    count = 0
+    for _, name, data, timestamp in sessions:
+        count += 1
+        items = data.get("items", [])
+        total = write_bill_sheet(workbook, _sheet_title(name, used_titles), items, language)
+        _, materials = compute_material_consumption(items)
+        grand_total += total
+        for key in MATERIAL_KEYS:
+            grand_materials[key] += materials[key]
+        insurance = insurance_on(total)
+        summary.append([count, name, (timestamp or "")[:10], len(items), cells.make(float(total), AMOUNT_FORMAT),
+                        cells.make(float(insurance), AMOUNT_FORMAT), cells.make(float(total + insurance), AMOUNT_FORMAT)]
+                       + [cells.make(materials[key], QUANTITY_FORMAT) for key in MATERIAL_KEYS])
+
+    grand_insurance = insurance_on(grand_total)
+    summary.append([])
+    summary.append([None, cells.make(t("Total:"), bold=True), None, None, cells.make(float(grand_total), AMOUNT_FORMAT, bold=True),
+                    cells.make(float(grand_insurance), AMOUNT_FORMAT, bold=True), cells.make(float(grand_total + grand_insurance), AMOUNT_FORMAT, bold=True)]
+                   + [cells.make(grand_materials[key], QUANTITY_FORMAT, bold=True) for key in MATERIAL_KEYS])
+    workbook.save(path)
+    return count
+
+REPRICE_REPORT_WIDTHS = [40, 14, 16, 18, 18, 16]
+
+def write_reprice_report(path, report, language="en"):
+    # report rows are (session id, name, items repriced, items not in SSR, previous total, revised total).
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    from core.repricing import REPRICE_REPORT_HEADERS
+    t = report_text(language)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(t("Rate Revision"))
+    for index, width in enumerate(REPRICE_REPORT_WIDTHS, start=1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+    sheet.freeze_panes = "A2"
+    cells = _CellFactory(sheet)
+    sheet.append([cells.make(t(header), bold=True) for header in REPRICE_REPORT_HEADERS])
+    old_sum = new_sum = to_decimal(0)
+    for _, name, repriced, unmatched, old_total, new_total in report:
+        old_sum += old_total
+        new_sum += new_total
+        sheet.append([name, repriced, unmatched, cells.make(float(old_total), AMOUNT_FORMAT), cells.make(float(new_total), AMOUNT_FORMAT),
+                      cells.make(float(new_total - old_total), AMOUNT_FORMAT)])
+    sheet.append([])
+    sheet.append([cells.make(t("Total:"), bold=True), sum(row[2] for row in report), sum(row[3] for row in report),
+                  cells.make(float(old_sum), AMOUNT_FORMAT, bold=True), cells.make(float(new_sum), AMOUNT_FORMAT, bold=True),
+                  cells.make(float(new_sum - old_sum), AMOUNT_FORMAT, bold=True)])
+    workbook.save(path)
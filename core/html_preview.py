@@ -0,0 +1,176 @@
+from functools import lru_cache
+from html import escape
+
+from core.bill_model import BillModel, report_text, ABSTRACT_HEADERS, EXCESS_SAVING_HEADERS, CEMENT_HEADERS, MATERIAL_COLUMNS
+from core.html_template import compile_template, render_rows, html_text
+
+STYLES = """<style>
+body { font-family: Arial, sans-serif; font-size: 10pt; background-color: #f8f8f8; color: #333; }
+.page { background-color: white; padding: 40px; margin: 20px auto; max-width: 800px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }
+.break { page-break-before: always; }
+h3 { text-align: center; font-weight: bold; text-decoration: underline; }
+h4 { text-align: center; font-weight: bold; }
+table { border-collapse: collapse; width: 100%; font-size: 9pt; margin-top: 15px; }
+th, td { border: 1px solid black; padding: 4px; text-align: left; vertical-align: top; }
+th { font-weight: bold; text-align: center; background-color: #e0e0e0; }
+.no-border, .no-border td { border: none; }
+.signature td { text-align: center; }
+.signatory-block { display: inline-block; width: 30%; text-align: center; vertical-align: top; margin-top: 30px; }
+.letter-body { line-height: 1.6; }
+</style>"""
+
+LETTER = """<div class='{{page_class}}'><div class='letter-body'>
+<table class='no-border'><tr><td><p><b>[[Fund Head:]]</b> {{fund_head}}<br><b>[[Name:]]</b> {{name}}<br><b>[[Constituency:]]</b> {{constituency}}</p></td>
+<td><p>{{office}}<br>[[M.S.I.B. WEST Division]]<br>[[MHADA, Bandra (E),]]<br>[[Mumbai-400051.]]</p></td></tr></table>
+<p><b>[[To,]]</b><br>{{send_to}}<br>{{&recipient}}</p>
+<p><b>{{subject_line}}</b></p>
+<p><b>[[Sir,]]</b><br>{{submission}}</p>
+<p><b>[[Agreement No:]]</b> {{agreement_no}}</p>
+<p>[[Yours faithfully,]]</p>
+<p><br><b>({{letter_signatory}})</b><br>[[M.S.I.B. WEST Division]]<br>[[MHADA, Mumbai.]]</p>
+<p>[[D.A.: M.B.No.]] {{mb_no}}</p>
+</div></div>"""
+
+SIGNATORIES = """<div style='width: 100%; margin-top: 40px;'>
+<div class='signatory-block'><b>[[J.E./S.E./Asst. Engineer]]</b><br>[[M.S.I.B. West Div]]</div>
+<div class='signatory-block'><b>[[Dy. Engineer]]</b><br>[[M.S.I.B. West Div]]</div>
+<div class='signatory-block'><b>[[Executive Engineer]]</b><br>[[M.S.I.B. West Div]]</div>
+</div>"""
+
+FORM_47 = """<div class='page break'><h3>[[FORM 47]]</h3><h4>[[RUNNING ACCOUNT BILL]]</h4>
+<table class='no-border'><tr><td>[[Division: MSIB West Division]]</td><td></td></tr><tr><td>[[Sub-Division: Sub Division No.]]</td><td></td></tr></table>
+<table><tr><td colspan='2'>[[Name of Contractor:]] {{contractor}}</td><td colspan='2'>[[Serial No. of this bill:]] {{message}}</td></tr>
+<tr><td colspan='2'>[[Name of Work:]] {{name_work}}</td><td colspan='2'>[[No. and date of previous bill:]] {{previous_bill}}</td></tr>
+<tr><td colspan='2'>[[Reference to agreement:]] {{agreement_no}}</td><td colspan='2'>[[Acceptance No:]] {{acceptance_no}} &nbsp;&nbsp; [[Date:]] {{date}}</td></tr>
+<tr><td colspan='2'>[[Work Order No:]] {{work_order_no}}</td><td colspan='2'>[[Date of written order to commence work:]] {{date}}</td></tr>
+<tr><td colspan='2'>[[Date of completion stipulated in contract:]] {{end_date}}</td><td colspan='2'>[[Date of actual completion of work:]]</td></tr></table></div>"""
+
+ANNEXURE = """<div class='page break'><h3>[[Annexure – I]]</h3>
+<p><b>[[Name of Work:]]</b> {{name_work}}<br>
+<b>[[Fund Head:]]</b> {{fund_head}}<br>
+<b>[[Constituency:]]</b> {{constituency}}<br>
+<b>[[Name of Agency:]]</b> {{contractor}}<br>
+<b>[[Agreement No:]]</b> {{agreement_no}}</p>
+<h4>[[CERTIFICATE]]</h4><ol style='list-style-position: inside; padding-left: 0;'>
+<li>[[Materials are used in subjected are as per specifications.]]</li>
+<li>[[Construction material has been tested and test reports are found satisfactory.]]</li>
+<li>[[The subjected site is not inspected by Vigilance and Quality Control Cell / A and hence the question of pending remarks does not arise.]]</li>
+<li>[[Nothing is outstanding against the contractor.]]</li>
+<li>[[It is to certify that the contractors have not put any sort of claim against the subjected work.]]</li></ol>"""
+
+CHECK_LIST = """<div class='page break'><h3>[[Check List to be Attached with Bills of Contractor]]</h3><table>
+<tr><td>1</td><td>[[Name of Work]]</td><td>:</td><td>{{name_work}}</td></tr>
+<tr><td>2</td><td>[[Administrative Approval Accorded by the collector]]</td><td>:</td><td>[[Amount Rs.]] {{amt_rupes}} <br>[[Letter No.]] {{letter_no}} <br>[[Date:]] {{date}}</td></tr>
+<tr><td>3</td><td>[[Technical Sanction accorded by Executive Engineer]]</td><td>:</td><td>[[Vide letter No:]] {{vide_letter_no}} [[Date:]] {{date}}<br>[[Amount Rs:]] {{amt_rupes}}<br>[[In Year:]] {{year}}</td></tr>
+<tr><td>4</td><td>[[Estimated cost put to tender]]</td><td>:</td><td>{{est_cost}}</td></tr>
+<tr><td>5</td><td>[[Name of Agency]]</td><td>:</td><td>{{contractor}}</td></tr>
+<tr><td>6</td><td>[[Percentage Quoted]]</td><td>:</td><td>{{percentage_quoted}}</td></tr>
+<tr><td>8</td><td>[[Agreement No]]</td><td>:</td><td>{{agreement_no}}</td></tr>
+<tr><td>9</td><td>[[Date of start of work]]</td><td>:</td><td>{{start_date}}</td></tr>
+<tr><td>10</td><td>[[Stipulated date of completion]]</td><td>:</td><td>{{end_date}}</td></tr></table></div>"""
+
+# The statement pages open the same way the DOCX sections do.
+STATEMENT_HEAD = """<div class='page break'>
+<p><b>[[Name of Work:]]</b> {{name_work}}<br><b>[[Name of Agency:]]</b> {{contractor}}</p><h3>{{heading}}</h3>"""
+
+TOTAL_ROW = """<tr><td colspan='7' style='text-align:right;'><b>{{label}}</b></td><td><b>{{since_previous}}</b></td><td><b>{{upto_date}}</b></td></tr>"""
+
+def _header_template(headers):
+    return "<table><tr>" + "".join(f"<th>[[{header}]]</th>" for header in headers) + "</tr>"
+
+ABSTRACT_HEAD = _header_template(ABSTRACT_HEADERS)
+EXCESS_SAVING_HEAD = _header_template(EXCESS_SAVING_HEADERS)
+CEMENT_HEAD = _header_template(CEMENT_HEADERS)
+
+@lru_cache(maxsize=None)
+def _material_head(language):
+    t = report_text(language)
+    first = [f"<th rowspan='2'>{html_text(t(h))}</th>" for h in ["Item No", "Short Description", "Qty", "Unit"]]
+    first += [f"<th colspan='2'>{html_text(t(name))}</th>" for name, _ in MATERIAL_COLUMNS]
+    second = [f"<th>{html_text(t('Ratio'))}</th><th>{html_text(t('Total Qty (%s)') % unit)}</th>" for _, unit in MATERIAL_COLUMNS]
+    return "<table><tr>" + "".join(first) + "</tr><tr>" + "".join(second) + "</tr>"
+
+def _render_signatures(out, signatures):
+    out.append("<table class='no-border signature'><tr>")
+    for name, lines in signatures:
+        out.append(f"<td><b>{escape(str(name))}</b><br>{'<br>'.join(map(escape, lines))}</td>")
+    out.append("</tr></table>")
+
+def _context(model):
+    t = model.t
+    context = dict(model.data)
+    context["subject_line"] = t('Sub: Submission of %s') % model.data.get('subject', '')
+    context["submission"] = t("I am submitting herewith the %s of above work along with site statement & M.B.No. %s for making payment to the contractor %s.") % (
+        model.data.get('message', ''), model.data.get('mb_no', ''), model.data.get('contractor', ''))
+    context["letter_signatory"] = model.data.get('deputy_engineer', t('Deputy Engineer'))
+    return context
+
+def render_preview_html(model):
+    language = model.language
+    t = model.t
+    template = lambda source: compile_template(source, language)
+    context = _context(model)
+    out = ["<html><head>", STYLES, "</head><body>"]
+
+    letters = [
+        ("page", t('Office of the Deputy Engineer'), [t('M.S.I.B. WEST Division'), t('MHADA, Mumbai.')]),
+        ("page break", t('Office of the Executive Engineer'), [t('M.S.I. Board, Mumbai.')])
+    ]
+    for page_class, office, recipient in letters:
+        context.update(page_class=page_class, office=office, recipient="<br>".join(map(escape, recipient)))
+        template(LETTER).render_into(out, context)
+
+    template(FORM_47).render_into(out, context)
+    template(ANNEXURE).render_into(out, context)
+    template(SIGNATORIES).render_into(out, context)
+    out.append("</div>")
+    template(CHECK_LIST).render_into(out, context)
+
+    out.append(f"<div class='page break'><h3>{html_text(t('ABSTRACT'))}</h3>")
+    if model.items:
+        template(ABSTRACT_HEAD).render_into(out, context)
+        render_rows(out, model.abstract_rows)
+        total_row = template(TOTAL_ROW)
+        for label, since_previous, upto_date in model.total_rows:
+            total_row.render_into(out, {"label": label, "since_previous": since_previous, "upto_date": upto_date})
+        out.append("</table>")
+    template(SIGNATORIES).render_into(out, context)
+    out.append("</div>")
+
+    context["heading"] = t('MATERIAL CONSUMPTION STATEMENT')
+    template(STATEMENT_HEAD).render_into(out, context)
+    if model.consumption_rows:
+        out.append(_material_head(language))
+        render_rows(out, model.consumption_rows)
+        totals = ["", t("Total :"), "", ""]
+        for value in model.consumption_totals:
+            totals += ["", value]
+        render_rows(out, [totals])
+        out.append("</table>")
+    out.append("</div>")
+
+    context["heading"] = t('EXCESS SAVING STATEMENT')
+    template(STATEMENT_HEAD).render_into(out, context)
+    if model.items:
+        template(EXCESS_SAVING_HEAD).render_into(out, context)
+        render_rows(out, model.excess_saving_rows)
+        out.append("</table>")
+        _render_signatures(out, model.excess_saving_signatures)
+    out.append("</div>")
+
+    context["heading"] = t('CEMENT CONSUMPTION STATEMENT')
+    template(STATEMENT_HEAD).render_into(out, context)
+    if model.cement_rows:
+        template(CEMENT_HEAD).render_into(out, context)
+        render_rows(out, model.cement_rows)
+        out.append(f"<tr><td colspan='5' style='text-align:right;'>{html_text(t('Total ='))}</td><td>{model.cement_total}</td></tr>")
+        out.append(f"<tr><td colspan='5' style='text-align:right;'>{html_text(t('Say ='))}</td><td>{model.cement_say}</td></tr>")
+        out.append("</table>")
+        _render_signatures(out, model.cement_signatures)
+    out.append("</div>")
+
+    out.append("</body></html>")
+    return "".join(out)
+
+def generate_html_preview(data):
+    return render_preview_html(BillModel(data))
@@ -0,0 +1,57 @@
+import re
+from html import escape
+from functools import lru_cache
+
+from core.bill_model import report_text
+
+# [[Report text]] is translated and escaped once, when the template is compiled for a language.
+# {{field}} is looked up in the render context and escaped; {{&field}} inserts trusted, already-built HTML.
+_TOKEN_RE = re.compile(r"\[\[(.+?)\]\]|\{\{(&?)(\w+)\}\}", re.S)
+
+def html_text(value):
+    return escape(str(value)).replace("\n", "<br>")
+
+class Template:
+    def __init__(self, source, language="en"):
+        t = report_text(language)
+        self.literals = []
+        self.fields = []
+        literal = []
+        position = 0
+        for match in _TOKEN_RE.finditer(source):
+            # Newlines only lay out the template source; QTextDocument would turn them into spaces.
+            literal.append(source[position:match.start()].replace("\n", ""))
+            position = match.end()
+            if match.group(1) is not None:
+                literal.append(html_text(t(match.group(1))))
+            else:
+                self.literals.append("".join(literal))
+                self.fields.append((match.group(3), bool(match.group(2))))
+                literal = []
+        literal.append(source[position:].replace("\n", ""))
+        self.literals.append("".join(literal))
+
+    def render_into(self, out, context):
+        literals = self.literals
+        out.append(literals[0])
+        for index, (name, raw) in enumerate(self.fields, 1):
+            value = context.get(name, "")
+            out.append(value if raw else escape(str(value)))
+            out.append(literals[index])
+
+    def render(self, context):
+        out = []
+        self.render_into(out, context)
+        return "".join(out)
+
+@lru_cache(maxsize=None)
+def compile_template(source, language="en"):
+    return Template(source, language)
+
+def render_rows(out, rows, cell="td"):
+    opening, separator, closing = f"<tr><{cell}>", f"</{cell}><{cell}>", f"</{cell}></tr>"
+    # Escaping a whole row at once is several times cheaper than escaping every cell; NUL never occurs in bill text.
+    for row in rows:
+        out.append(opening)
+        out.append(html_text("\0".join(map(str, row))).replace("\0", separator))
+        out.append(closing)
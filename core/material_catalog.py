@@ -0,0 +1,108 @@
+import os
+import re
+import csv
+from functools import lru_cache
+
+from core.constants import MATERIAL_RATIOS_CSV, MATERIAL_KEYS
+from core.utilities import normalize_ssr_item_no
+
+class MaterialCatalog:
+    def __init__(self, entries, version=""):
+        self.version = version
+        self.entries = entries
+        self._by_item_no = {}
+        keywords = []
+        self._priority = {}
+        for index, entry in enumerate(entries):
+            for item_no in entry["ssr_item_nos"]:
+                self._by_item_no.setdefault(item_no, entry)
+            keyword = entry["keyword"]
+            if keyword and keyword not in self._priority:
+                self._priority[keyword] = index
+                keywords.append(keyword)
+        # A zero-width lookahead reports every start position, so overlapping keywords are all seen
+        # and the entry listed first in the file wins, exactly like the old ordered dict scan.
+        self._keyword_re = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))") if keywords else None
+        self._match_description = lru_cache(maxsize=4096)(self._match_description_uncached)
+
+    def _match_description_uncached(self, description_lower):
+        if not self._keyword_re:
+            return None
+        best = None
+        for match in self._keyword_re.finditer(description_lower):
+            priority = self._priority[match.group(1)]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+        return self.entries[best] if best is not None else None
+
+    def match(self, item):
+        entry = self._by_item_no.get(normalize_ssr_item_no(item.get("ssr_no", "")))
+        if entry is not None:
+            return entry
+        return self._match_description(item.get("description", "").lower())
+
+def _parse_ratio(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+def read_material_catalog(path):
+    entries = []
+    version = ""
+    with open(path, newline="", encoding="utf-8") as f:
+        data_lines = []
+        for line in f:
+            if line.startswith("#"):
+                key, _, value = line[1:].partition(":")
+                if key.strip().lower() == "version":
+                    version = value.strip()
+                continue
+            if line.strip():
+                data_lines.append(line)
+    for row in csv.DictReader(data_lines):
+        keyword = (row.get("keyword") or "").strip().lower()
+        item_nos = [normalize_ssr_item_no(n) for n in (row.get("ssr_item_no") or "").split(";")]
+        item_nos = [n for n in item_nos if n]
+        if not keyword and not item_nos:
+            continue
+        entries.append({
+            "keyword": keyword,
+            "ssr_item_nos": item_nos,
+            "short_desc": (row.get("short_desc") or "").strip(),
+            "ratios": {key: _parse_ratio(row.get(key)) for key in MATERIAL_KEYS}
+        })
+    return MaterialCatalog(entries, version)
+
+@lru_cache(maxsize=None)
+def _load_material_catalog(path, mtime):
+    return read_material_catalog(path)
+
+def get_material_catalog():
+    try:
+        mtime = os.path.getmtime(MATERIAL_RATIOS_CSV)
+    except OSError:
+        # The ratios are optional: without the CSV the material and cement statements are simply empty.
+        return MaterialCatalog([])
+    return _load_material_catalog(MATERIAL_RATIOS_CSV, mtime)
+
+def compute_material_consumption(items, quantity_key="quantity"):
+    catalog = get_material_catalog()
+    consumption_data = []
+    consumption_totals = {key: 0.0 for key in MATERIAL_KEYS}
+    for item in items:
+        details = catalog.match(item)
+        if details is None:
+            continue
+        try: quantity = float(item.get(quantity_key, 0))
+        except (ValueError, TypeError): quantity = 0.0
+        row_data = { "item_no": item.get("sr_no", ""), "short_desc": details["short_desc"], "qty": quantity,
+                     "unit": item.get("unit", ""), "ratios": details["ratios"], "totals": {} }
+        for mat_key in MATERIAL_KEYS:
+            total_qty = quantity * details["ratios"].get(mat_key, 0.0)
+            row_data["totals"][mat_key] = total_qty
+            consumption_totals[mat_key] += total_qty
+        consumption_data.append(row_data)
+    return consumption_data, consumption_totals
@@ -0,0 +1,121 @@
+import os
+import csv
+import io
+import math
+
+from core.totals import line_amount, format_rupees
+
+# Header cells (lower-cased) that name the two columns a measurement sheet needs; sheets without
+# a recognisable header are read positionally as (SSR item no., quantity).
+ITEM_NO_HEADERS = {"ssr item no.", "ssr item no", "ssr no", "ssr no.", "item no", "item no.", "ssr_no", "ssr_item_no"}
+QUANTITY_HEADERS = {"quantity", "qty", "qty.", "measured quantity"}
+
+class MeasurementImportError(Exception):
+    pass
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel hands back 12.0 for a cell showing 12.
+        return str(int(value))
+    return str(value).strip()
+
+def _parse_quantity(text):
+    try:
+        quantity = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    # float() reads "nan" and "inf" too; neither is a measurement.
+    return quantity if math.isfinite(quantity) else None
+
+def _find_columns(header):
+    lowered = [_cell_text(cell).lower() for cell in header]
+    item_col = next((i for i, cell in enumerate(lowered) if cell in ITEM_NO_HEADERS), None)
+    quantity_col = next((i for i, cell in enumerate(lowered) if cell in QUANTITY_HEADERS), None)
+    if item_col is None or quantity_col is None:
+        return None
+    return item_col, quantity_col
+
+def measurement_rows(table):
+    # table is an iterable of row tuples; yields (line number, item no, quantity text) for every non-blank line.
+    columns = (0, 1)
+    first = True
+    for line_no, row in enumerate(table, 1):
+        if not any(_cell_text(cell) for cell in row):
+            continue
+        header_columns = _find_columns(row)
+        if header_columns:
+            columns = header_columns
+            continue
+        item_col, quantity_col = columns
+        item_no = _cell_text(row[item_col]) if item_col < len(row) else ""
+        quantity = _cell_text(row[quantity_col]) if quantity_col < len(row) else ""
+        if first and _parse_quantity(quantity) is None:
+            # An unrecognised header line.
+            first = False
+            continue
+        first = False
+        yield line_no, item_no, quantity
+
+def _read_csv(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        return list(measurement_rows(csv.reader(f, dialect)))
+
+def _read_xlsx(path):
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return list(measurement_rows(workbook.worksheets[0].iter_rows(values_only=True)))
+    finally:
+        workbook.close()
+
+def read_measurement_file(path):
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in (".xlsx", ".xlsm"):
+            return _read_xlsx(path)
+        if extension in (".csv", ".txt"):
+            return _read_csv(path)
+    except Exception as e:
+        raise MeasurementImportError(str(e))
+    raise MeasurementImportError(f"Unsupported file type: {extension}")
+
+def parse_measurement_text(text):
+    # Cells copied from Excel arrive tab separated; typed lists may use commas or semicolons.
+    lines = text.splitlines()
+    delimiter = "\t" if any("\t" in line for line in lines) else None
+    if delimiter is None:
+        delimiter = ";" if any(";" in line for line in lines) else ","
+    return list(measurement_rows(csv.reader(io.StringIO(text), delimiter=delimiter)))
+
+def resolve_measurements(catalog, rows, first_sr_no=1):
+    # One pass over the lines against the catalog's item-number index; nothing is scanned per line.
+    rows = list(rows)
+    # Chapters the sheet refers to are read in one go instead of one workbook pass per chapter.
+    catalog.load_item_nos(item_no for _, item_no, _ in rows)
+    resolved = []
+    unmatched = []
+    for line_no, item_no, quantity_text in rows:
+        quantity = _parse_quantity(quantity_text)
+        if quantity is None or quantity <= 0:
+            unmatched.append((line_no, item_no, quantity_text, "Invalid quantity"))
+            continue
+        record = catalog.find_by_item_no(item_no)
+        if record is None:
+            unmatched.append((line_no, item_no, quantity_text, "Item not in SSR"))
+            continue
+        rate = record.get('completed_rates') or 0
+        resolved.append([
+            str(first_sr_no + len(resolved)), str(record.get('chapter') or ''), str(record.get('ssr_item_no') or ''),
+            str(record.get('reference_no') or ''), str(record.get('description_of_the_item') or ''),
+            str(record.get('additional_specification') or ''), str(record.get('unit') or ''),
+            format_rupees(rate), quantity_text.replace(",", ""), format_rupees(line_amount(quantity_text.replace(",", ""), rate))
+        ])
+    return resolved, unmatched
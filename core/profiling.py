@@ -0,0 +1,136 @@
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+import importlib.util
+
+PROFILE_FLAG = "--profile-startup"
+TOP_IMPORTS = 15
+
+_start = time.perf_counter()
+_enabled = False
+_reported = False
+_output_path = ""
+_marks = []
+_imports = []
+_state = threading.local()
+_original_import = builtins.__import__
+
+def parse_profile_flag(argv):
+    for arg in argv[1:]:
+        if arg == PROFILE_FLAG:
+            return True, ""
+        if arg.startswith(PROFILE_FLAG + "="):
+            return True, arg.split("=", 1)[1]
+    return False, ""
+
+def enabled():
+    return _enabled
+
+def _resolved_name(name, globals, level):
+    if not level:
+        return name
+    try:
+        return importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__"))
+    except (ImportError, ValueError):
+        return name
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    full_name = _resolved_name(name, globals, level)
+    if full_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    stack = getattr(_state, "stack", None)
+    if stack is None:
+        stack = _state.stack = []
+    started = time.perf_counter()
+    stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - started
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        _imports.append({
+            "module": full_name, "total": elapsed, "self": elapsed - children, "depth": len(stack),
+            "thread": "main" if threading.current_thread() is threading.main_thread() else "background"
+        })
+
+def enable(output_path=""):
+    global _enabled, _output_path
+    if _enabled:
+        return
+    _enabled = True
+    _output_path = output_path
+    builtins.__import__ = _timed_import
+    mark("profiling enabled")
+
+def mark(label):
+    if not _enabled:
+        return
+    elapsed = time.perf_counter() - _start
+    _marks.append({"label": label, "at": elapsed})
+    if _reported:
+        # Events after the first window (e.g. the SSR catalog finishing) are still worth seeing.
+        print(f"[startup] {elapsed * 1000:9.1f} ms  {label}", flush=True)
+
+def _summary():
+    main_imports = [i for i in _imports if i["thread"] == "main"]
+    top_level = sorted((i for i in main_imports if i["depth"] == 0), key=lambda i: i["total"], reverse=True)
+    by_self = sorted(main_imports, key=lambda i: i["self"], reverse=True)
+    return {
+        "marks": list(_marks),
+        "import_total": sum(i["total"] for i in main_imports if i["depth"] == 0),
+        "top_level_imports": top_level[:TOP_IMPORTS],
+        "slowest_modules": by_self[:TOP_IMPORTS],
+        "background_imports": sum(i["total"] for i in _imports if i["thread"] == "background" and i["depth"] == 0)
+    }
+
+def _load_previous(path):
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _delta(current, previous):
+    if previous is None:
+        return ""
+    diff = (current - previous) * 1000
+    return f"  ({'+' if diff >= 0 else ''}{diff:.1f} ms)"
+
+def report(stream=None):
+    global _reported
+    if not _enabled or _reported:
+        return
+    stream = stream or sys.stdout
+    summary = _summary()
+    previous = _load_previous(_output_path)
+    previous_marks = {m["label"]: m["at"] for m in (previous or {}).get("marks", [])}
+    previous_modules = {i["module"]: i["total"] for i in (previous or {}).get("top_level_imports", [])}
+
+    print("=== Startup timeline ===", file=stream)
+    for m in summary["marks"]:
+        print(f"{m['at'] * 1000:9.1f} ms  {m['label']}{_delta(m['at'], previous_marks.get(m['label']))}", file=stream)
+    print(f"\n=== Imports on the main thread: {summary['import_total'] * 1000:.1f} ms"
+          f"{_delta(summary['import_total'], (previous or {}).get('import_total'))} ===", file=stream)
+    for i in summary["top_level_imports"]:
+        print(f"{i['total'] * 1000:9.1f} ms  {i['module']}{_delta(i['total'], previous_modules.get(i['module']))}", file=stream)
+    print("\n=== Slowest modules (self time) ===", file=stream)
+    for i in summary["slowest_modules"]:
+        print(f"{i['self'] * 1000:9.1f} ms  {i['module']}", file=stream)
+    if summary["background_imports"]:
+        print(f"\nBackground-thread imports: {summary['background_imports'] * 1000:.1f} ms", file=stream)
+    stream.flush()
+
+    if _output_path:
+        try:
+            with open(_output_path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            print(f"Could not write startup profile: {e}", file=stream)
+    _reported = True
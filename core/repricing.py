@@ -0,0 +1,52 @@
+from core.data_manager import iter_sessions, save_repriced_sessions
+from core.ssr_catalog import DEFAULT_SSR_VERSION
+from core.totals import to_decimal, round_paise, line_amount, format_rupees
+
+REPRICE_REPORT_HEADERS = ["Bill", "Items Repriced", "Items Not in SSR", "Previous Total", "Revised Total", "Change"]
+
+def _catalog_rate(record):
+    # A catalog row without a rate is left alone rather than repriced to zero.
+    rate = record.get('completed_rates')
+    if rate is None:
+        return None
+    try:
+        return round_paise(float(rate))
+    except (ValueError, TypeError):
+        return None
+
+def reprice_bill(data, catalog):
+    # Rates follow the catalog; quantities, descriptions and everything else the engineer typed stay as saved.
+    repriced = unmatched = 0
+    total = to_decimal(0)
+    for item in data.get("items", []):
+        amount = to_decimal(item.get("total"))
+        record = catalog.find_by_item_no(item.get("ssr_no"))
+        rate = _catalog_rate(record) if record is not None else None
+        if rate is None:
+            unmatched += 1
+        elif rate != round_paise(item.get("unit_rate")):
+            amount = line_amount(item.get("quantity"), rate)
+            item["unit_rate"] = format_rupees(rate)
+            item["total"] = format_rupees(amount)
+            repriced += 1
+        total += amount
+    if repriced:
+        data["total_amount"] = format_rupees(total)
+    return repriced, unmatched
+
+def reprice_sessions(session_ids, catalog, version=DEFAULT_SSR_VERSION):
+    # One pass over the bills against the catalog's item-number index, then a single transaction for
+    # every bill that changed.  Returns (session id, name, repriced, not in SSR, old total, new total) per bill.
+    # Repriced bills are pinned to the catalog's version from then on.
+    catalog.load_all()
+    report = []
+    revised = []
+    for sid, name, data, _ in iter_sessions(session_ids):
+        old_total = round_paise(data.get("total_amount"))
+        repriced, unmatched = reprice_bill(data, catalog)
+        if repriced or data.get("ssr_version", DEFAULT_SSR_VERSION) != version:
+            data["ssr_version"] = version
+            revised.append((sid, data))
+        report.append((sid, name, repriced, unmatched, old_total, round_paise(data.get("total_amount"))))
+    save_repriced_sessions(revised)
+    return report
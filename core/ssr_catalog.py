@@ -0,0 +1,436 @@
+import os
+import json
+import math
+import hashlib
+import threading
+from array import array
+from functools import cached_property
+from PyQt6.QtCore import QObject, QThread, QCoreApplication, pyqtSignal
+
+from core.constants import SSR_DATA_EXCEL, SSR_VERSIONS_DIR
+from core.data_manager import APP_DATA_DIR
+from core.tracing import span
+from core.utilities import normalize_ssr_item_no
+
+SSR_INDEX_DIR = os.path.join(APP_DATA_DIR, "ssr_index")
+
+SSR_EXCEL_COLUMNS = {
+    'Sr. No': 'sr_no', 'Chapter': 'chapter', 'SSR Item No.': 'ssr_item_no',
+    'Reference No.': 'reference_no', 'Description of the item': 'description_of_the_item',
+    'Additional Specification': 'additional_specification', 'Unit': 'unit',
+    'Completed Rates': 'completed_rates'
+}
+SSR_REQUIRED_COLUMNS = ['description_of_the_item', 'unit', 'completed_rates', 'ssr_item_no']
+# ssr_data.xlsx; sessions saved before versions existed were priced with it.
+DEFAULT_SSR_VERSION = "current"
+
+class SSRCatalogError(Exception):
+    def __init__(self, kind, detail=""):
+        super().__init__(detail)
+        self.kind = kind
+        self.detail = detail
+
+def _clean_value(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+def ssr_catalog_versions():
+    versions = {DEFAULT_SSR_VERSION: SSR_DATA_EXCEL}
+    if os.path.isdir(SSR_VERSIONS_DIR):
+        # Newest schedule year first.
+        for name in sorted(os.listdir(SSR_VERSIONS_DIR), reverse=True):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() == ".xlsx" and not name.startswith("~$"):
+                versions.setdefault(stem, os.path.join(SSR_VERSIONS_DIR, name))
+    return versions
+
+def ssr_catalog_path(version):
+    return ssr_catalog_versions().get(version or DEFAULT_SSR_VERSION, os.path.join(SSR_VERSIONS_DIR, f"{version}.xlsx"))
+
+# Column layout of the shared store: free text is interned, chapter and unit repeat a handful of values and are
+# kept as small codes, and rates live in a float array (NaN where the sheet has none).
+_TEXT_COLUMNS = ['sr_no', 'ssr_item_no', 'reference_no', 'description_of_the_item', 'additional_specification']
+_CATEGORY_COLUMNS = ['chapter', 'unit']
+_ROW_COLUMNS = _TEXT_COLUMNS + _CATEGORY_COLUMNS + ['completed_rates']
+
+def _rate_value(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+class SSRRecordPool:
+    # Column store shared by every catalog version in the registry.  A row that did not change between schedule
+    # years is stored once and referenced by row id from each version; records are assembled on lookup.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._strings = {}
+        self._row_ids = {}
+        self.text = {column: [] for column in _TEXT_COLUMNS}
+        self.categories = {column: [] for column in _CATEGORY_COLUMNS}
+        self._category_codes = {column: {} for column in _CATEGORY_COLUMNS}
+        self.codes = {column: array('H') for column in _CATEGORY_COLUMNS}
+        self.rates = array('d')
+
+    def _intern(self, value):
+        value = _clean_value(value)
+        return self._strings.setdefault(value, value) if isinstance(value, str) else value
+
+    def _code(self, column, value):
+        codes = self._category_codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[column])
+            self.categories[column].append(value)
+        return code
+
+    def add_rows(self, rows):
+        # rows are value tuples in _ROW_COLUMNS order.  Returns the row id of each, appending only rows the
+        # store has not seen in any version.
+        intern = self._intern
+        row_ids = array('I')
+        for values in rows:
+            key = tuple(map(intern, values))
+            # Keyed by hash so the store does not hold a tuple per row; a hit is confirmed against the stored row.
+            row_id = self._row_ids.get(hash(key))
+            if row_id is None or self._row(row_id) != key:
+                row_id = len(self.rates)
+                self._row_ids.setdefault(hash(key), row_id)
+                for column, value in zip(_TEXT_COLUMNS, key):
+                    self.text[column].append(value)
+                for index, column in enumerate(_CATEGORY_COLUMNS, len(_TEXT_COLUMNS)):
+                    self.codes[column].append(self._code(column, key[index]))
+                self.rates.append(_rate_value(key[-1]))
+            row_ids.append(row_id)
+        return row_ids
+
+    def _row(self, row_id):
+        values = [self.text[column][row_id] for column in _TEXT_COLUMNS]
+        values += [self.categories[column][self.codes[column][row_id]] for column in _CATEGORY_COLUMNS]
+        rate = self.rates[row_id]
+        return tuple(values) + (None if math.isnan(rate) else rate,)
+
+    def record(self, row_id):
+        record = {column: values[row_id] for column, values in self.text.items()}
+        for column, codes in self.codes.items():
+            record[column] = self.categories[column][codes[row_id]]
+        rate = self.rates[row_id]
+        record['completed_rates'] = None if math.isnan(rate) else rate
+        return record
+
+def chapter_key(value):
+    # Chapter cells are typed with stray double spaces and line breaks; "Water Supply and  Sanitary\nFitting"
+    # is the same chapter as "Water Supply and Sanitary Fitting".
+    return " ".join(str(value).split()) if value is not None else ""
+
+_HEADER_NAMES = {chapter_key(header).lower(): column for header, column in SSR_EXCEL_COLUMNS.items()}
+_CHAPTER_POSITION = _ROW_COLUMNS.index('chapter')
+_ITEM_NO_POSITION = _ROW_COLUMNS.index('ssr_item_no')
+_DESCRIPTION_POSITION = _ROW_COLUMNS.index('description_of_the_item')
+INDEX_FORMAT = 1
+
+def _header_columns(row):
+    positions = {}
+    for index, cell in enumerate(row):
+        column = _HEADER_NAMES.get(chapter_key(cell).lower()) if isinstance(cell, str) else None
+        if column:
+            positions.setdefault(column, index)
+    return positions if all(column in positions for column in SSR_REQUIRED_COLUMNS) else None
+
+def _row_values(row, columns):
+    values = tuple(_clean_value(row[columns[column]]) if column in columns and columns[column] < len(row) else None
+                   for column in _ROW_COLUMNS)
+    if values[_DESCRIPTION_POSITION] is None and values[_ITEM_NO_POSITION] is None:
+        return None
+    return values
+
+def _open_workbook(path):
+    from openpyxl import load_workbook
+    return load_workbook(path, read_only=True, data_only=True)
+
+def build_ssr_index(path):
+    # One streaming pass over the workbook that keeps only where each chapter's rows are and which chapter
+    # each item number belongs to.  A sheet without its own header row reuses the previous sheet's columns.
+    workbook = _open_workbook(path)
+    try:
+        sheets, chapters, items = [], [], {}
+        columns = None
+        for sheet in workbook.worksheets:
+            spans = {}
+            for row_no, row in enumerate(sheet.iter_rows(values_only=True), 1):
+                header = _header_columns(row)
+                if header:
+                    columns = header
+                    continue
+                values = _row_values(row, columns) if columns else None
+                if values is None:
+                    continue
+                chapter = chapter_key(values[_CHAPTER_POSITION])
+                if chapter not in spans:
+                    spans[chapter] = [row_no, row_no]
+                    if chapter not in chapters:
+                        chapters.append(chapter)
+                spans[chapter][1] = row_no
+                item_no = normalize_ssr_item_no(values[_ITEM_NO_POSITION])
+                if item_no:
+                    items.setdefault(item_no, chapter)
+            sheets.append({"title": sheet.title, "columns": columns or {}, "chapters": spans})
+    finally:
+        workbook.close()
+    if not items:
+        raise SSRCatalogError("invalid", path)
+    return {"format": INDEX_FORMAT, "sheets": sheets, "chapters": chapters, "items": items}
+
+def _index_cache_path(path):
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{INDEX_FORMAT}".encode("utf-8")).hexdigest()
+    return os.path.join(SSR_INDEX_DIR, digest + ".json")
+
+def load_ssr_index(path):
+    # The index is cached next to the user data, keyed by the workbook's path, size and modification time,
+    # so an unchanged SSR book costs one small JSON read at start-up.
+    cache_path = _index_cache_path(path)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") == INDEX_FORMAT:
+            return index
+    except (OSError, ValueError):
+        pass
+    index = build_ssr_index(path)
+    try:
+        os.makedirs(SSR_INDEX_DIR, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False)
+    except OSError:
+        pass
+    return index
+
+class SSRCatalog:
+    # Built from the chapter index alone; a chapter's rows are read from the workbook the first time anything
+    # in it is asked for, so start-up and memory follow the chapters in use rather than the whole book.
+    def __init__(self, path, index, pool=None):
+        self.path = path
+        self.index = index
+        self.pool = pool or SSRRecordPool()
+        self.chapters = index["chapters"]
+        self._item_chapters = index["items"]
+        self._loaded = set()
+        self._lock = threading.RLock()
+        self._chapter_descriptions = {}
+        self._descriptions = None
+        self._by_description = {}
+        self._by_item_no = {}
+
+    def missing_chapters(self, chapters):
+        return {chapter for chapter in chapters if chapter not in self._loaded and chapter in self._chapter_set}
+
+    def load_chapters(self, chapters):
+        # Reads the workbook, so the GUI leaves it to SSRCatalogLoader.load_chapters; chapters already in are
+        # checked without taking the lock, so lookups never wait on a read in progress.
+        if not self.missing_chapters(chapters):
+            return
+        with self._lock:
+            pending = self.missing_chapters(chapters)
+            if not pending:
+                return
+            with span("ssr_load_chapters", chapters=len(pending)):
+                workbook = _open_workbook(self.path)
+                try:
+                    for sheet_index, sheet in enumerate(self.index["sheets"]):
+                        spans = [sheet["chapters"][chapter] for chapter in pending if chapter in sheet["chapters"]]
+                        if not spans:
+                            continue
+                        rows = []
+                        columns = sheet["columns"]
+                        # One read per sheet covering every wanted chapter; rows of other chapters in between are skipped.
+                        for row in workbook.worksheets[sheet_index].iter_rows(min_row=min(first for first, _ in spans),
+                                                                            max_row=max(last for _, last in spans), values_only=True):
+                            values = None if _header_columns(row) else _row_values(row, columns)
+                            if values is not None and chapter_key(values[_CHAPTER_POSITION]) in pending:
+                                rows.append(values)
+                        with self.pool.lock:
+                            row_ids = self.pool.add_rows(rows)
+                        self._add_rows(row_ids)
+                finally:
+                    workbook.close()
+                self._loaded.update(pending)
+
+    def load_all(self):
+        self.load_chapters(self.chapters)
+
+    def item_chapters(self, item_nos):
+        chapters = {self._item_chapters.get(normalize_ssr_item_no(item_no)) for item_no in item_nos}
+        chapters.discard(None)
+        return chapters
+
+    def load_item_nos(self, item_nos):
+        self.load_chapters(self.item_chapters(item_nos))
+
+    @cached_property
+    def _chapter_set(self):
+        return set(self.chapters)
+
+    def _add_rows(self, row_ids):
+        descriptions = self.pool.text['description_of_the_item']
+        item_nos = self.pool.text['ssr_item_no']
+        chapters = self.pool.categories['chapter']
+        chapter_codes = self.pool.codes['chapter']
+        for row_id in row_ids:
+            description = descriptions[row_id]
+            if description is not None and description not in self._by_description:
+                self._by_description[description] = row_id
+                chapter = chapter_key(chapters[chapter_codes[row_id]])
+                self._chapter_descriptions.setdefault(chapter, []).append(description)
+            item_no = normalize_ssr_item_no(item_nos[row_id])
+            if item_no:
+                self._by_item_no.setdefault(item_no, row_id)
+
+    def chapter_descriptions(self, chapter):
+        self.load_chapters([chapter])
+        return self._chapter_descriptions.get(chapter, [])
+
+    @property
+    def descriptions(self):
+        # Every chapter's descriptions in book order, as one list shared by the combo box and its completer.
+        self.load_all()
+        with self._lock:
+            if self._descriptions is None:
+                self._descriptions = [description for chapter in self.chapters for description in self._chapter_descriptions.get(chapter, [])]
+            return self._descriptions
+
+    def _record(self, row_id):
+        return self.pool.record(row_id) if row_id is not None else None
+
+    def find_by_description(self, description):
+        return self._record(self._by_description.get(description))
+
+    def find_by_item_no(self, item_no):
+        item_no = normalize_ssr_item_no(item_no)
+        chapter = self._item_chapters.get(item_no)
+        if chapter is not None and chapter not in self._loaded:
+            self.load_chapters([chapter])
+        return self._record(self._by_item_no.get(item_no))
+
+def read_ssr_catalog(path=SSR_DATA_EXCEL, pool=None):
+    if not os.path.exists(path):
+        raise SSRCatalogError("missing", path)
+    return SSRCatalog(path, load_ssr_index(path), pool)
+
+class SSRCatalogWorker(QObject):
+    finished = pyqtSignal(object, str, str)
+    # (catalog, chapters, error detail or "")
+    chapters_loaded = pyqtSignal(object, object, str)
+
+    def __init__(self, path, pool=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.pool = pool
+
+    def run(self):
+        try:
+            self.finished.emit(read_ssr_catalog(self.path, self.pool), "", "")
+        except SSRCatalogError as e:
+            self.finished.emit(None, e.kind, e.detail)
+        except Exception as e:
+            self.finished.emit(None, "error", str(e))
+
+    def load_chapters(self, catalog, chapters):
+        try:
+            catalog.load_chapters(chapters)
+        except Exception as e:
+            self.chapters_loaded.emit(catalog, chapters, str(e))
+        else:
+            self.chapters_loaded.emit(catalog, chapters, "")
+
+class SSRCatalogLoader(QObject):
+    # The worker thread stays up once the catalog is ready: chapter rows are read there on request and
+    # chapters_ready follows, so the GUI thread only ever looks records up.
+    ready = pyqtSignal(object)
+    failed = pyqtSignal(str, str)
+    chapters_ready = pyqtSignal(object, object, str)
+    _chapters_requested = pyqtSignal(object, object)
+
+    def __init__(self, path=SSR_DATA_EXCEL, pool=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.pool = pool
+        self.catalog = None
+        self.error = None
+        self.thread = None
+        self.worker = None
+        self.loading = False
+
+    def start(self):
+        if self.loading or self.catalog is not None:
+            return
+        self.loading = True
+        self.error = None
+        self.worker = SSRCatalogWorker(self.path, self.pool)
+        self.thread = QThread()
+        self.worker.moveToThread(self.thread)
+        self.thread.started.connect(self.worker.run)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.chapters_loaded.connect(self.chapters_ready)
+        self._chapters_requested.connect(self.worker.load_chapters)
+        self.thread.finished.connect(self.worker.deleteLater)
+        self.thread.finished.connect(self.thread.deleteLater)
+        QCoreApplication.instance().aboutToQuit.connect(self.stop)
+        self.thread.start()
+
+    def stop(self):
+        # A chapter read still running when the app quits finishes before the thread goes away.
+        try:
+            self.thread.quit()
+            self.thread.wait()
+        except RuntimeError:
+            # The thread already finished and was deleted.
+            pass
+
+    def _on_finished(self, catalog, error_kind, detail):
+        self.loading = False
+        if catalog is None:
+            self.thread.quit()
+            self.error = (error_kind, detail)
+            self.failed.emit(error_kind, detail)
+        else:
+            self.catalog = catalog
+            self.ready.emit(catalog)
+
+    def load_chapters(self, chapters):
+        self._chapters_requested.emit(self.catalog, list(chapters))
+
+class SSRCatalogRegistry(QObject):
+    # Every schedule version that has been asked for stays loaded, one loader per version over a shared record
+    # pool, so memory grows by the rows that changed between years rather than by a whole catalog per year.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = SSRRecordPool()
+        self.loaders = {}
+
+    def loader(self, version=None):
+        version = version or DEFAULT_SSR_VERSION
+        loader = self.loaders.get(version)
+        if loader is None:
+            loader = self.loaders[version] = SSRCatalogLoader(ssr_catalog_path(version), self.pool, self)
+        return loader
+
+    def catalog(self, version=None):
+        loader = self.loaders.get(version or DEFAULT_SSR_VERSION)
+        return loader.catalog if loader else None
+
+    def find_by_item_no(self, version, item_no):
+        catalog = self.catalog(version)
+        return catalog.find_by_item_no(item_no) if catalog else None
+
+_catalog_registry = None
+
+def get_ssr_catalog_registry():
+    global _catalog_registry
+    if _catalog_registry is None:
+        _catalog_registry = SSRCatalogRegistry(parent=QCoreApplication.instance())
+    return _catalog_registry
+
+def get_ssr_catalog_loader(version=None):
+    return get_ssr_catalog_registry().loader(version)
@@ -0,0 +1,83 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+
+# Every amount the app prints is a Decimal rounded to paise with one rule, so a line, the bill total and the
+# insurance on it come out the same in the item table, the preview, the DOCX and the Excel export.
+PAISE = Decimal("0.01")
+ROUNDING = ROUND_HALF_EVEN
+INSURANCE_RATE = Decimal("0.005")
+ZERO = Decimal("0.00")
+
+def parse_decimal(value):
+    # The one parsing rule for amounts and quantities: "₹1,234.50" as the item table shows it, plain or
+    # scientific numbers ("1e3").  Raises InvalidOperation for anything else.
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (int, float)):
+        # str() keeps 0.1 as 0.1 rather than its binary expansion.
+        return Decimal(str(value))
+    number = Decimal("".join(str(value).replace("₹", "").replace(",", "").split()))
+    if not number.is_finite():
+        raise InvalidOperation(value)
+    return number
+
+def to_decimal(value):
+    # Empty or unreadable text counts as zero.
+    if value is None or value == "":
+        return ZERO
+    try:
+        return parse_decimal(value)
+    except InvalidOperation:
+        return ZERO
+
+def parse_amount(value):
+    return float(to_decimal(value))
+
+def round_paise(value):
+    return to_decimal(value).quantize(PAISE, rounding=ROUNDING)
+
+def line_amount(quantity, rate):
+    return round_paise(to_decimal(quantity) * to_decimal(rate))
+
+def insurance_on(total):
+    return round_paise(to_decimal(total) * INSURANCE_RATE)
+
+def format_rupees(value):
+    return f"₹{round_paise(value):,.2f}"
+
+class BillTotals:
+    # Line amounts in table order with their running sum; adding, removing or editing a line adjusts the
+    # sum by that line alone, so the bill total never has to be re-added from the table.
+    def __init__(self, amounts=()):
+        self.lines = []
+        self.total = ZERO
+        self.extend(amounts)
+
+    def reset(self, amounts=()):
+        self.lines = []
+        self.total = ZERO
+        self.extend(amounts)
+
+    def extend(self, amounts):
+        self.insert(len(self.lines), amounts)
+
+    def insert(self, index, amounts):
+        amounts = [round_paise(amount) for amount in amounts]
+        self.lines[index:index] = amounts
+        self.total += sum(amounts, ZERO)
+
+    def remove(self, index, count=1):
+        self.total -= sum(self.lines[index:index + count], ZERO)
+        del self.lines[index:index + count]
+
+    def update(self, index, amount):
+        amount = round_paise(amount)
+        self.total += amount - self.lines[index]
+        self.lines[index] = amount
+
+    @property
+    def insurance(self):
+        return insurance_on(self.total)
+
+    @property
+    def grand_total(self):
+        return self.total + self.insurance
@@ -0,0 +1,71 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+LOG_FILE_NAME = "reports_generator.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+logger = logging.getLogger("reports_generator")
+_listeners = []
+_lock = threading.Lock()
+
+def setup_logging(log_dir):
+    if any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
+        return
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(log_dir, LOG_FILE_NAME), maxBytes=LOG_MAX_BYTES,
+                                      backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    except OSError:
+        # A read-only profile should not stop the app from starting; spans are still kept in memory.
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+class Span:
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.duration_ms = 0.0
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+@contextmanager
+def span(name, **fields):
+    current = Span(name, fields)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.fields["error"] = type(e).__name__
+        raise
+    finally:
+        current.duration_ms = (time.perf_counter() - started) * 1000
+        _record(current)
+
+def _record(current):
+    with _lock:
+        listeners = list(_listeners)
+    details = " ".join(f"{key}={value}" for key, value in current.fields.items())
+    logger.info("span %s %.1fms %s", current.name, current.duration_ms, details)
+    for listener in listeners:
+        try:
+            listener(current.name, current.duration_ms, dict(current.fields))
+        except Exception:
+            logger.exception("Span listener failed")
+
+def add_listener(listener):
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+def remove_listener(listener):
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
@@ -3,10 +3,12 @@ import sys
 import atexit
 import hashlib
 import json
-from decimal import Decimal
+from types import MappingProxyType
+from functools import lru_cache
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from PyQt6.QtCore import QTranslator
 from .constants import SCRIPT_DIR, TRANSLATIONS
+from .totals import round_paise, parse_decimal
 
 TEMP_FILES = []
 
@@ -19,51 +21,129 @@ def cleanup_temp_files():
             pass
 atexit.register(cleanup_temp_files)
 
-def num_to_words_indian(num_str):
-    def convert_to_words(n):
-        ones = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
-        tens = ["", "Ten", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
-        teens = ["Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
-        words = ""
-        if n >= 10000000:
-            words += convert_to_words(n // 10000000) + " Crore "
-            n %= 10000000
-        if n >= 100000:
-            words += convert_to_words(n // 100000) + " Lakh "
-            n %= 100000
-        if n >= 1000:
-            words += convert_to_words(n // 1000) + " Thousand "
-            n %= 1000
-        if n >= 100:
-            words += ones[n // 100] + " Hundred "
-            n %= 100
-        if n >= 20:
-            words += tens[n // 10] + " "
-            n %= 10
-        elif n >= 10:
-            words += teens[n - 10] + " "
-            n = 0
-        if n > 0:
-            words += ones[n] + " "
-        return words
+_ENGLISH_ONES = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine",
+                 "Ten", "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
+_ENGLISH_TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+_MARATHI_0_99 = [
+    "", "एक", "दोन", "तीन", "चार", "पाच", "सहा", "सात", "आठ", "नऊ",
+    "दहा", "अकरा", "बारा", "तेरा", "चौदा", "पंधरा", "सोळा", "सतरा", "अठरा", "एकोणीस",
+    "वीस", "एकवीस", "बावीस", "तेवीस", "चोवीस", "पंचवीस", "सव्वीस", "सत्तावीस", "अठ्ठावीस", "एकोणतीस",
+    "तीस", "एकतीस", "बत्तीस", "तेहेतीस", "चौतीस", "पस्तीस", "छत्तीस", "सदतीस", "अडतीस", "एकोणचाळीस",
+    "चाळीस", "एक्केचाळीस", "बेचाळीस", "त्रेचाळीस", "चव्वेचाळीस", "पंचेचाळीस", "सेहेचाळीस", "सत्तेचाळीस", "अठ्ठेचाळीस", "एकोणपन्नास",
+    "पन्नास", "एक्कावन्न", "बावन्न", "त्रेपन्न", "चोपन्न", "पंचावन्न", "छप्पन्न", "सत्तावन्न", "अठ्ठावन्न", "एकोणसाठ",
+    "साठ", "एकसष्ठ", "बासष्ठ", "त्रेसष्ठ", "चौसष्ठ", "पासष्ठ", "सहासष्ठ", "सदुसष्ठ", "अडुसष्ठ", "एकोणसत्तर",
+    "सत्तर", "एकाहत्तर", "बाहत्तर", "त्र्याहत्तर", "चौऱ्याहत्तर", "पंच्याहत्तर", "शहात्तर", "सत्याहत्तर", "अठ्ठ्याहत्तर", "एकोणऐंशी",
+    "ऐंशी", "एक्क्याऐंशी", "ब्याऐंशी", "त्र्याऐंशी", "चौऱ्याऐंशी", "पंच्याऐंशी", "शहाऐंशी", "सत्त्याऐंशी", "अठ्ठ्याऐंशी", "एकोणनव्वद",
+    "नव्वद", "एक्क्याण्णव", "ब्याण्णव", "त्र्याण्णव", "चौऱ्याण्णव", "पंच्याण्णव", "शहाण्णव", "सत्त्याण्णव", "अठ्ठ्याण्णव", "नव्व्याण्णव"
+]
+
+def _english_chunk(n):
+    words = []
+    if n >= 100:
+        words += [_ENGLISH_ONES[n // 100], "Hundred"]
+        n %= 100
+    if n >= 20:
+        words.append(_ENGLISH_TENS[n // 10])
+        n %= 10
+    if n > 0:
+        words.append(_ENGLISH_ONES[n])
+    return " ".join(words)
+
+def _marathi_chunk(n):
+    hundreds, rest = divmod(n, 100)
+    words = []
+    if hundreds:
+        words.append("शंभर" if hundreds == 1 and not rest else _MARATHI_0_99[hundreds] + "शे")
+    if rest:
+        words.append(_MARATHI_0_99[rest])
+    return " ".join(words)
+
+# Words for every 0-999 chunk plus the scale names, built once per language on first use.
+_NUMBER_WORDS_SPEC = {
+    'en': (_english_chunk, ("Crore", "Lakh", "Thousand"), "Rupees", "Paise", "Only", "Zero"),
+    'mr': (_marathi_chunk, ("कोटी", "लाख", "हजार"), "रुपये", "पैसे", "फक्त", "शून्य"),
+}
+
+@lru_cache(maxsize=None)
+def _number_words_table(language):
+    chunk_fn, scales, rupees, paise, only, zero = _NUMBER_WORDS_SPEC.get(language, _NUMBER_WORDS_SPEC['en'])
+    return tuple(chunk_fn(n) for n in range(1000)), scales, rupees, paise, only, zero
+
+def _integer_to_words(n, table):
+    chunks, (crore, lakh, thousand) = table[0], table[1]
+    words = []
+    if n >= 10000000:
+        words += [_integer_to_words(n // 10000000, table), crore]
+        n %= 10000000
+    if n >= 100000:
+        words += [chunks[n // 100000], lakh]
+        n %= 100000
+    if n >= 1000:
+        words += [chunks[n // 1000], thousand]
+        n %= 1000
+    if n:
+        words.append(chunks[n])
+    return " ".join(words)
+
+@lru_cache(maxsize=4096)
+def _amount_to_words(amount, language):
+    table = _number_words_table(language)
+    _, _, rupees_label, paise_label, only, zero = table
+    rupees = int(amount)
+    paise = int((amount - rupees) * 100)
+    rupees_words = rupees_label + " " + _integer_to_words(rupees, table) if rupees > 0 else ""
+    paise_words = paise_label + " " + _integer_to_words(paise, table) if paise > 0 else ""
+    result = (rupees_words + " " + paise_words).strip()
+    if not result:
+        return zero
+    return result + " " + only
+
+def _normalize_amount(num_str):
+    return round_paise(parse_decimal(num_str))
+
+def num_to_words_indian(num_str, language='en'):
     try:
-        num = Decimal(str(num_str).replace("₹", "").replace(",", ""))
-        rupees = int(num)
-        paise = int(round((num - rupees) * 100))
-        rupees_words = "Rupees " + convert_to_words(rupees).strip() if rupees > 0 else ""
-        paise_words = "Paise " + convert_to_words(paise).strip() if paise > 0 else ""
-        result = (rupees_words + " " + paise_words).strip()
-        if not result:
-            return "Zero"
-        return result + " Only"
+        return _amount_to_words(_normalize_amount(num_str), language)
     except Exception:
         return ""
 
+def amounts_to_words(values, language='en'):
+    seen = {}
+    words = []
+    for value in values:
+        key = str(value)
+        if key not in seen:
+            seen[key] = num_to_words_indian(value, language)
+        words.append(seen[key])
+    return words
+
+def normalize_ssr_item_no(value):
+    text = str(value).strip() if value is not None else ""
+    if not text or text.lower() == "nan":
+        return ""
+    try:
+        return str(float(text))
+    except ValueError:
+        return text
+
+@lru_cache(maxsize=None)
+def get_translation_catalog(language_code):
+    return MappingProxyType(dict(TRANSLATIONS.get(language_code, {})))
+
+_active_language = {'code': 'en', 'catalog': get_translation_catalog('en')}
+
+def active_language():
+    return _active_language['code']
+
+def translate_text(text):
+    return _active_language['catalog'].get(text, text)
+
 class CustomTranslator(QTranslator):
     def __init__(self, parent=None, language_code='en'):
         super().__init__(parent)
         self.language_code = language_code
-        self._translations = TRANSLATIONS.get(language_code, {})
+        self._translations = get_translation_catalog(language_code)
     def translate(self, context, sourceText, disambiguation=None, n=-1):
         if self.language_code == 'en':
             return sourceText
@@ -77,6 +157,23 @@ class CustomTranslator(QTranslator):
                 pass
         return translated_text
 
+_installed_translators = {}
+
+def install_language(app, language_code):
+    current = getattr(app, 'current_translator', None)
+    if current is not None and current.language_code == language_code:
+        return False
+    if current is not None:
+        app.removeTranslator(current)
+    translator = _installed_translators.get(language_code)
+    if translator is None:
+        translator = _installed_translators[language_code] = CustomTranslator(app, language_code)
+    _active_language['code'] = language_code
+    _active_language['catalog'] = translator._translations
+    app.installTranslator(translator)
+    app.current_translator = translator
+    return True
+
 class OperationCanceledError(Exception):
     pass
 
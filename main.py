@@ -1,24 +1,49 @@
 import sys
 import os
+from core import profiling
+
+if __name__ == "__main__":
+    # The import hook has to be in place before PyQt and the app modules load.
+    profile_startup, profile_output = profiling.parse_profile_flag(sys.argv)
+    if profile_startup:
+        profiling.enable(profile_output)
+
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QLocale
+from PyQt6.QtCore import QLocale, QSettings, QTimer
 
-from core.data_manager import db_setup
-from core.utilities import setup_assets, CustomTranslator
+from core.data_manager import db_setup, APP_DATA_DIR
+from core.ssr_catalog import get_ssr_catalog_loader
+from core.tracing import setup_logging
+from core.utilities import setup_assets, install_language
 from ui.main_window import BillApp
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    
-    # Initialize translator based on system locale
-    app.translator = CustomTranslator(app, QLocale.system().name().split('_')[0])
-    app.installTranslator(app.translator)
+    profiling.mark("modules imported")
+    app = QApplication([arg for arg in sys.argv if not arg.startswith(profiling.PROFILE_FLAG)])
+    profiling.mark("QApplication created")
+
+    # Initialize translator from the saved language, falling back to the system locale
+    settings = QSettings("BillManager", "ThemeSettings")
+    install_language(app, settings.value("language", QLocale.system().name().split('_')[0]))
+    profiling.mark("language installed")
 
     if not setup_assets():
         sys.exit(1)
-        
+    profiling.mark("assets checked")
+
+    setup_logging(APP_DATA_DIR)
     db_setup()
+    profiling.mark("database ready")
+    loader = get_ssr_catalog_loader()
+    if profiling.enabled():
+        loader.ready.connect(lambda _: profiling.mark("SSR catalog ready"))
+        loader.failed.connect(lambda kind, _: profiling.mark(f"SSR catalog failed ({kind})"))
+    loader.start()
+    profiling.mark("SSR catalog load started")
 
     win = BillApp()
+    profiling.mark("login window built")
     win.showMaximized()
-    sys.exit(app.exec())
\ No newline at end of file
+    if profiling.enabled():
+        QTimer.singleShot(0, lambda: (profiling.mark("first window shown"), profiling.report()))
+    sys.exit(app.exec())
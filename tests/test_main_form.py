@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("APPDATA", tempfile.mkdtemp())
+os.makedirs(os.path.join(os.environ["APPDATA"], "ReportsGenerator"), exist_ok=True)
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtWidgets import QApplication
+
+from core.data_manager import db_setup
+from ui.main_form import MainForm
+
+@pytest.fixture
+def form():
+    app = QApplication.instance() or QApplication([])
+    db_setup()
+    form = MainForm()
+    yield form
+    form.stop_worker()
+    form.deleteLater()
+    app.processEvents()
+
+def wait_for_saves(form):
+    while form.pending_saves:
+        form.thread.wait(10)
+        QCoreApplication.processEvents()
+
+def test_late_save_result_leaves_new_bill_blank(form):
+    form.last_session_data = {"name": "OLD STARTUP BILL", "items": [{"sr_no": "1", "description": "old", "quantity": "1"}]}
+    form.form_widget.inputs["name"].setText("Bill A")
+    form.quick_save()
+    # New Bill before the worker's result is handled.
+    form.clear_form()
+    wait_for_saves(form)
+    assert form.form_widget.inputs["name"].text() == ""
+    assert form.form_widget.construction_items_widget.rows == []
+    assert form.active_session_info is None
+    assert form.sidebar.listWidget().currentRow() == 0
+    assert any(form.sidebar.listWidget().item(row).text().startswith("Bill A") for row in range(1, form.sidebar.listWidget().count()))
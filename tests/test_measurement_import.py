@@ -0,0 +1,28 @@
+from core.measurement_import import parse_measurement_text, resolve_measurements
+
+class FakeCatalog:
+    def __init__(self, records):
+        self.records = records
+
+    def load_item_nos(self, item_nos):
+        list(item_nos)
+
+    def find_by_item_no(self, item_no):
+        return self.records.get(item_no)
+
+CATALOG = FakeCatalog({"1.1": {"ssr_item_no": "1.1", "description_of_the_item": "Excavation", "unit": "cum", "completed_rates": 100.0}})
+
+def test_resolves_known_item():
+    resolved, unmatched = resolve_measurements(CATALOG, [(1, "1.1", "2.5")])
+    assert unmatched == []
+    assert resolved[0][8] == "2.5"
+    assert resolved[0][9] == "₹250.00"
+
+def test_rejects_non_finite_quantities():
+    rows = [(1, "1.1", "nan"), (2, "1.1", "inf"), (3, "1.1", "-Infinity")]
+    resolved, unmatched = resolve_measurements(CATALOG, rows)
+    assert resolved == []
+    assert [(line_no, reason) for line_no, _, _, reason in unmatched] == [(1, "Invalid quantity"), (2, "Invalid quantity"), (3, "Invalid quantity")]
+
+def test_pasted_text_skips_header_line():
+    assert parse_measurement_text("SSR No\tQty\n1.1\t3\n") == [(2, "1.1", "3")]
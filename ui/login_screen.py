@@ -1,17 +1,21 @@
 import hashlib
 import time
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QFrame, QApplication
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLineEdit, QPushButton, QLabel, QFrame
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal
 from ui.widgets.dialogs import show_message_box
 from core.constants import ADMIN_USER, ADMIN_PASS_HASH, SESSION_TIMEOUT
+from core.utilities import translate_text, active_language
 
 class LoginScreen(QWidget):
+    login_succeeded = pyqtSignal()
+
     def __init__(self, stack):
         super().__init__()
         self.stack = stack
         self.login_attempts = 0
         self.max_attempts = 3
         self.lockout_time = 0
+        self.translated_language = active_language()
         self.setup_ui()
 
     def setup_ui(self):
@@ -40,13 +44,16 @@ class LoginScreen(QWidget):
         self.update_styles(True)
         
     def retranslate(self):
+        if self.translated_language == active_language():
+            return
+        self.translated_language = active_language()
         self.findChild(QLabel, "Header").setText(self.tr("Login to Reports Generator"))
         self.username.setPlaceholderText(self.tr("Username"))
         self.password.setPlaceholderText(self.tr("Password"))
         self.login_btn.setText(self.tr("Login"))
         
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def try_login(self):
         current_time = time.time()
@@ -60,7 +67,7 @@ class LoginScreen(QWidget):
 
         if username == ADMIN_USER and password_hash == ADMIN_PASS_HASH:
             self.login_attempts = 0
-            self.stack.setCurrentIndex(1)
+            self.login_succeeded.emit()
             QTimer.singleShot(SESSION_TIMEOUT, self.session_timeout)
         else:
             self.login_attempts += 1
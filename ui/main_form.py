@@ -1,53 +1,93 @@
 import os
 import datetime
+from collections import deque
 from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QFrame, QSplitter,
-    QToolButton, QTextEdit, QStatusBar, QMessageBox, QFileDialog, QProgressDialog, QApplication, QListWidgetItem, QMenu
+    QToolButton, QStatusBar, QLabel, QMessageBox, QFileDialog, QProgressDialog, QApplication, QListWidgetItem, QMenu
 )
 from PyQt6.QtCore import (
     Qt, QThread, QObject, pyqtSignal, QSettings, QTimer, QDateTime, QDir, QSize, QLocale
 )
 from PyQt6.QtGui import QIcon, QFont, QColor
-import pandas as pd
 import json
 
 from core.constants import SCRIPT_DIR
-from core.document_generator import DocGenWorker, convert_docx_to_pdf, generate_docx_internal
-from core.data_manager import load_session_file, load_sessions, save_session_file, save_session, delete_session_from_db
-from core.utilities import OperationCanceledError, CustomTranslator
+from core.document_generator import DocGenWorker, convert_docx_to_pdf, generate_docx_internal, get_pypandoc
+from core.docx_preview import exact_preview_available
+from core.excel_export import write_items_workbook
+from core.bill_model import with_bill_history
+from core.data_manager import load_session_file, load_sessions, delete_session_from_db
+from core.tracing import logger, span, add_listener, remove_listener
+from core.utilities import OperationCanceledError, install_language, translate_text, active_language
 from ui.widgets.dialogs import show_message_box
-from .sidebar import CollapsibleSidebar
+from .sidebar import CollapsibleSidebar, SESSION_NAME_ROLE
 from .widgets.merged_form import MergedFormWidget
-from .widgets.dialogs import SettingsDialog, DetachedPreviewDialog
+from .widgets.preview_view import PreviewView, PreviewNavigator
+from .widgets.dialogs import SettingsDialog, DetachedPreviewDialog, SessionExportDialog, RepriceReportDialog
+
+# Spans shown in the optional status-bar readout, grouped under the label they are reported as.
+PERF_READOUT_SPANS = {
+    "job.fast_preview": "Preview", "job.save_session": "Save", "job.save_docx": "Save", "job.save_pdf": "Save",
+    "job.export_excel": "Export", "job.export_sessions": "Export", "job.reprice_sessions": "Reprice"
+}
+
+PREVIEW_ACTIONS = ("fast_preview", "preview")
+# Auto-save waits for the form to be idle this long (the setting's default), or for this many edits without a pause.
+AUTO_SAVE_IDLE_SECONDS = 3
+AUTO_SAVE_CHANGE_LIMIT = 50
+PREVIEW_DELAY_MS = 750
+EXACT_PREVIEW_DELAY_MS = 2000
 
 class MainForm(QWidget):
     request_job = pyqtSignal(dict, str, str)
+    request_preview = pyqtSignal(dict, str, str)
+    span_recorded = pyqtSignal(str, float)
 
     def __init__(self):
         super().__init__()
         self.worker = None
         self.thread = None
+        # Previews, exact ones taking up to a couple of minutes, run on their own worker so saves and
+        # exports never queue behind them. One runs at a time; a newer request replaces the one waiting.
+        self.preview_worker = None
+        self.preview_thread = None
+        self.preview_running = False
+        self.pending_preview = None
         self.settings = QSettings("BillManager", "ThemeSettings")
         self.active_session_info = None
         self.detached_preview_dialog = None
         self.is_preview_detached = False
+        self.preview_document = None
         self.auto_save_timer = QTimer(self)
+        self.auto_save_timer.setSingleShot(True)
         self.auto_save_timer.timeout.connect(self.auto_save)
+        self.unsaved_changes = 0
+        # Save jobs handed to the worker and not yet reported back, oldest first.
+        self.pending_saves = deque()
+        self.unnamed_session_name = None
         self.preview_timer = QTimer(self)
         self.preview_timer.setSingleShot(True)
-        self.preview_timer.setInterval(750)
+        self.preview_timer.setInterval(PREVIEW_DELAY_MS)
         self.preview_timer.timeout.connect(self.trigger_auto_preview)
         self.last_session_data = load_session_file()
+        self.translated_language = active_language()
+        self.perf_readout = {}
         self.init_ui()
         self.setup_worker_thread()
         self.load_settings()
-        self.refresh_sidebar()
+        self.refresh_sidebar(restore_last_session=True)
 
     def init_ui(self):
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         self.status_bar = QStatusBar()
         self.status_bar.setSizeGripEnabled(False)
+        self.perf_label = QLabel()
+        self.status_bar.addPermanentWidget(self.perf_label)
+        # Spans can finish on the document worker thread; the signal hops them back onto the GUI thread.
+        self.span_recorded.connect(self.update_perf_readout)
+        self.span_listener = lambda name, duration_ms, fields: self.span_recorded.emit(name, duration_ms)
+        add_listener(self.span_listener)
         main_content_widget = QWidget()
         main_content_layout = QVBoxLayout(main_content_widget)
         main_content_layout.setContentsMargins(15, 15, 15, 15)
@@ -57,6 +97,7 @@ class MainForm(QWidget):
         self.sidebar.listWidget().customContextMenuRequested.connect(self.show_sidebar_context_menu)
         self.form_widget = MergedFormWidget()
         self.form_widget.something_changed.connect(self.start_preview_timer)
+        self.form_widget.something_changed.connect(self.note_change)
         form_card = QFrame(objectName="MainCard")
         form_card.setMaximumWidth(900)
         left_panel_layout = QVBoxLayout(form_card)
@@ -73,11 +114,18 @@ class MainForm(QWidget):
         self.quick_save_btn.clicked.connect(self.quick_save)
         self.export_btn = QPushButton(self.tr("Export Excel"))
         self.export_btn.clicked.connect(self.export_to_excel)
+        self.export_sessions_btn = QPushButton(self.tr("Export Bills"), objectName="ExportAllButton")
+        self.export_sessions_btn.clicked.connect(self.export_sessions)
+        self.reprice_btn = QPushButton(self.tr("Reprice Bills"))
+        self.reprice_btn.setToolTip(self.tr("Reprice saved bills against the current SSR rates."))
+        self.reprice_btn.clicked.connect(self.reprice_bills)
         self.settings_btn = QPushButton(QIcon(os.path.join(SCRIPT_DIR, "assets", "settings_icon.png")), self.tr("Settings"))
         self.settings_btn.clicked.connect(self.open_settings_dialog)
         buttons_layout.addStretch()
         buttons_layout.addWidget(self.quick_save_btn)
         buttons_layout.addWidget(self.export_btn)
+        buttons_layout.addWidget(self.export_sessions_btn)
+        buttons_layout.addWidget(self.reprice_btn)
         buttons_layout.addWidget(self.settings_btn)
         buttons_layout.addWidget(self.preview_btn)
         buttons_layout.addWidget(self.save_docx_btn)
@@ -88,7 +136,16 @@ class MainForm(QWidget):
         self.preview_layout = QVBoxLayout(self.preview_card)
         self.preview_layout.setContentsMargins(5, 5, 5, 5)
         zoom_layout = QHBoxLayout()
+        self.preview_widget = PreviewView()
+        self.preview_navigator = PreviewNavigator(self.preview_widget)
+        zoom_layout.addWidget(self.preview_navigator)
         zoom_layout.addStretch()
+        self.exact_preview_btn = QToolButton(objectName="exactPreviewButton")
+        self.exact_preview_btn.setText("📄")
+        self.exact_preview_btn.setCheckable(True)
+        self.exact_preview_btn.setToolTip(self.tr("Exact Preview (rendered from the DOCX)"))
+        self.exact_preview_btn.toggled.connect(self.set_exact_preview)
+        zoom_layout.addWidget(self.exact_preview_btn)
         self.detach_btn = QToolButton(objectName="detachButton")
         self.detach_btn.setText("⏏️")
         self.detach_btn.setToolTip(self.tr("Detach Preview"))
@@ -105,8 +162,6 @@ class MainForm(QWidget):
         zoom_out_btn.clicked.connect(self.zoom_out_preview)
         zoom_layout.addWidget(zoom_out_btn)
         self.preview_layout.addLayout(zoom_layout)
-        self.preview_widget = QTextEdit()
-        self.preview_widget.setReadOnly(True)
         self.preview_layout.addWidget(self.preview_widget, 1)
         splitter = QSplitter(Qt.Orientation.Horizontal)
         splitter.addWidget(form_card)
@@ -120,13 +175,25 @@ class MainForm(QWidget):
         main_layout.addWidget(self.sidebar)
         main_layout.addWidget(main_content_widget, 1)
 
+    def tr(self, text):
+        return translate_text(text)
+
     def retranslate(self):
+        # Installing a translator also posts LanguageChange to BillApp; only the first call per language does work.
+        if self.translated_language == active_language():
+            return
+        self.translated_language = active_language()
         self.save_docx_btn.setText(self.tr("Save DOCX"))
         self.save_pdf_btn.setText(self.tr("Save PDF"))
         self.preview_btn.setText(self.tr("Refresh Preview"))
         self.quick_save_btn.setText(self.tr("Quick Save"))
         self.export_btn.setText(self.tr("Export Excel"))
+        self.export_sessions_btn.setText(self.tr("Export Bills"))
+        self.reprice_btn.setText(self.tr("Reprice Bills"))
+        self.reprice_btn.setToolTip(self.tr("Reprice saved bills against the current SSR rates."))
         self.settings_btn.setText(self.tr("Settings"))
+        self.preview_navigator.retranslate()
+        self.exact_preview_btn.setToolTip(self.tr("Exact Preview (rendered from the DOCX)"))
         detach_btn = self.findChild(QToolButton, "detachButton")
         if detach_btn:
             detach_btn.setToolTip(self.tr("Detach Preview") if not self.is_preview_detached else self.tr("Dock Preview"))
@@ -152,10 +219,21 @@ class MainForm(QWidget):
         self.worker.moveToThread(self.thread)
         self.request_job.connect(self.worker.run_job)
         self.worker.finished.connect(self.on_worker_finished)
-        QApplication.instance().aboutToQuit.connect(self.thread.quit)
+        self.worker.preview_ready.connect(self.on_preview_ready)
+        self.worker.session_saved.connect(self.on_session_saved)
+        QApplication.instance().aboutToQuit.connect(self.stop_worker)
         self.thread.finished.connect(self.worker.deleteLater)
         self.thread.finished.connect(self.thread.deleteLater)
         self.thread.start()
+        self.preview_worker = DocGenWorker()
+        self.preview_thread = QThread()
+        self.preview_worker.moveToThread(self.preview_thread)
+        self.request_preview.connect(self.preview_worker.run_job)
+        self.preview_worker.finished.connect(self.on_worker_finished)
+        self.preview_worker.preview_ready.connect(self.on_preview_ready)
+        self.preview_thread.finished.connect(self.preview_worker.deleteLater)
+        self.preview_thread.finished.connect(self.preview_thread.deleteLater)
+        self.preview_thread.start()
         
     def show_sidebar_context_menu(self, pos):
         item = self.sidebar.listWidget().itemAt(pos)
@@ -163,9 +241,12 @@ class MainForm(QWidget):
             return
         session_id, _, _ = item.data(Qt.ItemDataRole.UserRole)
         menu = QMenu()
+        reprice_action = menu.addAction(self.tr("Reprice with Current SSR..."))
         delete_action = menu.addAction(self.tr("Delete Session"))
         action = menu.exec(self.sidebar.listWidget().mapToGlobal(pos))
-        if action == delete_action:
+        if action == reprice_action:
+            self.start_repricing([session_id])
+        elif action == delete_action:
             reply = QMessageBox.question(self, self.tr('Confirm Delete'), 
                                          self.tr(f"Are you sure you want to delete session '{item.text().splitlines()[0]}'?\nThis action cannot be undone."),
                                          QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
@@ -181,21 +262,24 @@ class MainForm(QWidget):
         self.update_styles(dark_mode)
         language_code = self.settings.value("language", "en")
         self.apply_language(language_code)
-        auto_save_interval = self.settings.value("auto_save_interval", 5, type=int)
-        self.auto_save_timer.start(auto_save_interval * 60 * 1000)
+        self.auto_save_timer.setInterval(self.settings.value("auto_save_idle", AUTO_SAVE_IDLE_SECONDS, type=int) * 1000)
         self.backup_location = self.settings.value("backup_location", "")
+        self.set_perf_readout_visible(self.settings.value("show_perf_readout", False, type=bool))
+        if self.settings.value("exact_preview", False, type=bool) and exact_preview_available():
+            self.exact_preview_btn.setChecked(True)
 
     def open_settings_dialog(self):
         dialog = SettingsDialog(self.settings, self)
         dialog.darkModeChanged.connect(self.update_styles)
         dialog.languageChanged.connect(self.apply_language)
-        dialog.autoSaveChanged.connect(self.update_auto_save_interval)
+        dialog.autoSaveChanged.connect(self.update_auto_save_idle)
         dialog.backupPathChanged.connect(self.update_backup_location)
+        dialog.perfReadoutChanged.connect(self.set_perf_readout_visible)
         dialog.exec()
 
-    def update_auto_save_interval(self, minutes):
-        self.settings.setValue("auto_save_interval", minutes)
-        self.auto_save_timer.setInterval(minutes * 60 * 1000)
+    def update_auto_save_idle(self, seconds):
+        self.settings.setValue("auto_save_idle", seconds)
+        self.auto_save_timer.setInterval(seconds * 1000)
 
     def update_backup_location(self, path):
         self.settings.setValue("backup_location", path)
@@ -203,14 +287,9 @@ class MainForm(QWidget):
         self.update_status(self.tr("Backup path updated."))
     
     def apply_language(self, language_code):
-        app = QApplication.instance()
-        if hasattr(app, 'current_translator'):
-            app.removeTranslator(app.current_translator)
-        translator = CustomTranslator(app, language_code)
-        app.installTranslator(translator)
-        app.current_translator = translator
         self.settings.setValue("language", language_code)
-        self.retranslate()
+        if install_language(QApplication.instance(), language_code):
+            self.retranslate()
 
     def update_styles(self, dark_mode):
         self.form_widget.update_styles(dark_mode)
@@ -259,60 +338,62 @@ class MainForm(QWidget):
             session_data = item.data(Qt.ItemDataRole.UserRole)
             if not session_data: return
             sid, raw_json, timestamp = session_data
-            data = json.loads(raw_json)
-            self.form_widget.load_data(data)
+            with span("load_session") as load_span:
+                data = json.loads(raw_json)
+                self.form_widget.load_data(data)
+                load_span.set(items=len(data.get("items", [])))
             self.active_session_info = session_data
+            self.unnamed_session_name = item.data(SESSION_NAME_ROLE)
             self.form_widget.clear_dirty()
             self.update_status(self.tr("Loaded session: %s") % item.text().splitlines()[0])
         except RuntimeError:
-            print("Warning: Attempted to load data from a deleted session item. Ignoring.")
+            logger.warning("Attempted to load data from a deleted session item")
             self.update_status(self.tr("Warning: Attempted to load data from a deleted session item. Ignoring."))
         except json.JSONDecodeError as e:
             show_message_box(self.tr("Load Error"), self.tr(f"Could not load session data: {e}"))
             self.active_session_info = None
             self.update_status(self.tr("Failed to load session data"))
 
-    def refresh_sidebar(self):
+    def refresh_sidebar(self, restore_last_session=False):
         try:
-            current_selection_info = self.active_session_info
-            self.sidebar.listWidget().clear()
-            new_bill_item = QListWidgetItem(self.tr("➕  New Bill"))
-            new_bill_item.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
-            dark_mode = self.settings.value("dark_mode", True, type=bool)
-            new_bill_item.setForeground(QColor("#3F51B5" if dark_mode else "#303F9F"))
-            self.sidebar.listWidget().addItem(new_bill_item)
-            sessions = load_sessions()
-            item_to_select = None
-            for sid, name, data, timestamp in sessions:
-                try:
-                    main_text = name if name else self.tr("Unnamed Session")
+            with span("refresh_sidebar") as refresh_span:
+                current_selection_info = self.active_session_info
+                self.sidebar.listWidget().clear()
+                new_bill_item = QListWidgetItem(self.tr("➕  New Bill"))
+                new_bill_item.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+                dark_mode = self.settings.value("dark_mode", True, type=bool)
+                new_bill_item.setForeground(QColor("#3F51B5" if dark_mode else "#303F9F"))
+                self.sidebar.listWidget().addItem(new_bill_item)
+                sessions = load_sessions()
+                refresh_span.set(sessions=len(sessions))
+                item_to_select = None
+                for sid, name, data, timestamp in sessions:
                     try:
-                        sub_text = datetime.datetime.fromisoformat(timestamp).strftime("%d %b %Y, %I:%M %p")
-                    except (ValueError, TypeError):
-                        sub_text = self.tr("No date")
-                    item = QListWidgetItem(f"{main_text}\n{sub_text}")
-                    item.setData(Qt.ItemDataRole.UserRole, (sid, data, timestamp))
-                    self.sidebar.listWidget().addItem(item)
-                    if current_selection_info and sid == current_selection_info[0]:
-                        item_to_select = item
-                except Exception as e:
-                    print(f"Error loading session {sid}: {str(e)}")
-                    continue
-            if item_to_select:
-                self.sidebar.listWidget().setCurrentItem(item_to_select)
-            elif self.active_session_info is None:
-                if self.last_session_data and self.last_session_data.get('items'):
-                    self.form_widget.load_data(self.last_session_data)
-                self.sidebar.listWidget().setCurrentRow(0)
-                self.update_status(self.tr("Ready"))
-            elif self.sidebar.listWidget().count() > 1:
-                self.sidebar.listWidget().setCurrentRow(1)
-                self.load_session_data(self.sidebar.listWidget().item(1))
-            else:
-                self.clear_form()
-            self.update_status(self.tr("Session list refreshed"))
-        except Exception as e:
-            print(f"Error refreshing sidebar: {str(e)}")
+                        item = QListWidgetItem(self.sidebar.session_item_text(name, timestamp))
+                        item.setData(Qt.ItemDataRole.UserRole, (sid, data, timestamp))
+                        item.setData(SESSION_NAME_ROLE, name)
+                        self.sidebar.listWidget().addItem(item)
+                        if current_selection_info and sid == current_selection_info[0]:
+                            item_to_select = item
+                    except Exception as e:
+                        logger.error("Error loading session %s: %s", sid, e)
+                        continue
+                if item_to_select:
+                    self.sidebar.listWidget().setCurrentItem(item_to_select)
+                elif self.active_session_info is None:
+                    # Only at start-up: the last session file is not kept up to date by background saves.
+                    if restore_last_session and self.last_session_data and self.last_session_data.get('items'):
+                        self.form_widget.load_data(self.last_session_data)
+                    self.sidebar.listWidget().setCurrentRow(0)
+                    self.update_status(self.tr("Ready"))
+                elif self.sidebar.listWidget().count() > 1:
+                    self.sidebar.listWidget().setCurrentRow(1)
+                    self.load_session_data(self.sidebar.listWidget().item(1))
+                else:
+                    self.clear_form()
+                self.update_status(self.tr("Session list refreshed"))
+        except Exception:
+            logger.exception("Error refreshing sidebar")
             self.update_status(self.tr("Error refreshing sessions"))
 
     def handle_sidebar_click(self, item):
@@ -346,94 +427,214 @@ class MainForm(QWidget):
 
     def clear_form(self):
         self.form_widget.clear_form()
-        self.preview_widget.clear()
+        self.show_preview_document(None)
         self.sidebar.listWidget().setCurrentRow(0)
         self.active_session_info = None
+        self.unnamed_session_name = None
         self.form_widget.clear_dirty()
         self.update_status(self.tr("New document ready"))
 
     def quick_save(self):
-        try:
-            data = self.form_widget.gather_data()
-            session_name = data.get("name", "").strip()
-            save_session_file(data)
-            self.last_session_data = data
-            if not session_name:
-                session_name = self.tr("Unnamed Bill - %s") % datetime.datetime.now().strftime('%Y%m%d%H%M%S')
-            save_session(session_name, data)
-            sessions = load_sessions()
-            for sid, name, s_data, timestamp in sessions:
-                if name == session_name:
-                    self.active_session_info = (sid, s_data, timestamp)
-                    break
-            self.refresh_sidebar()
-            self.form_widget.clear_dirty()
-            self.update_status(self.tr("Session saved: %s") % session_name)
-        except Exception as e:
-            print(f"Error during quick save: {str(e)}")
-            self.update_status(self.tr("Save failed - check logs"))
+        self.save_in_background(manual=True)
+
+    def note_change(self):
+        # Every edit pushes the auto-save back until the form has been idle for a moment, unless
+        # AUTO_SAVE_CHANGE_LIMIT edits pile up without a pause.
+        if not self.form_widget.is_dirty: return
+        self.unsaved_changes += 1
+        if self.unsaved_changes >= AUTO_SAVE_CHANGE_LIMIT:
+            self.auto_save()
+        else:
+            self.auto_save_timer.start()
 
     def auto_save(self):
-        if not self.isVisible(): return
-        if self.settings.value("auto_save_interval", 0, type=int) > 0 and self.form_widget.is_dirty:
-            self.quick_save()
+        if not self.isVisible() or not self.form_widget.is_dirty: return
+        self.save_in_background()
 
-    def _trigger_worker(self, action_type, output_path=""):
-        self.set_ui_enabled(False)
+    def session_name(self, name):
+        name = name.strip()
+        if name:
+            return name
+        # An unnamed bill keeps one generated name, so repeated saves update it rather than adding sessions.
+        if not self.unnamed_session_name:
+            self.unnamed_session_name = self.tr("Unnamed Bill - %s") % datetime.datetime.now().strftime('%Y%m%d%H%M%S')
+        return self.unnamed_session_name
+
+    def save_in_background(self, manual=False):
+        # Only the snapshot is taken here. The worker builds, serializes and writes the bill, after any job
+        # queued before it, so saves land in the order they were asked for.
+        self.auto_save_timer.stop()
+        self.unsaved_changes = 0
+        form = self.form_widget
+        snapshot = form.snapshot()
+        name = self.session_name(snapshot["fields"].get("name", ""))
+        job = {"snapshot": snapshot, "name": name, "bill": form.load_count,
+               "session_id": self.active_session_info[0] if self.active_session_info else None,
+               "request": (form.load_count, form.change_count, manual, name)}
+        self.pending_saves.append(job)
+        self.request_job.emit(job, "save_session", "")
+
+    def on_session_saved(self, result):
+        (load_count, change_count, manual, name), sid, raw, timestamp = result
+        self.pending_saves.popleft()
+        form = self.form_widget
+        # The form may have moved on while the worker was writing: another bill, or further edits to this one.
+        current = load_count == form.load_count
+        if current:
+            self.active_session_info = (sid, raw, timestamp)
+            self.unnamed_session_name = name
+            if change_count == form.change_count:
+                form.clear_dirty()
+        if manual and current:
+            self.refresh_sidebar()
+        else:
+            # A bill the form has left only has its sidebar entry updated; nothing is reselected or reloaded.
+            self.show_saved_session(sid, name, raw, timestamp)
+        self.update_status((self.tr("Session saved: %s") if manual else self.tr("Auto-saved: %s")) % name)
+
+    def show_saved_session(self, sid, name, raw, timestamp):
+        # Updates or adds the one sidebar entry instead of rebuilding the list from the database.
+        list_widget = self.sidebar.listWidget()
+        item = self.find_item_by_data((sid,))
+        if item is None:
+            item = QListWidgetItem()
+            list_widget.insertItem(1, item)
+        elif list_widget.row(item) != 1:
+            # Most recently saved first, as load_sessions orders them.
+            list_widget.insertItem(1, list_widget.takeItem(list_widget.row(item)))
+        item.setText(self.sidebar.session_item_text(name, timestamp))
+        item.setData(Qt.ItemDataRole.UserRole, (sid, raw, timestamp))
+        item.setData(SESSION_NAME_ROLE, name)
+        item.setHidden(self.sidebar.searchBar().text().lower() not in item.text().lower())
+        if self.active_session_info and self.active_session_info[0] == sid:
+            list_widget.setCurrentItem(item)
+
+    def stop_worker(self):
+        # Saves still queued when the app quits would go down with the worker's event loop; they are written here, in order.
+        remove_listener(self.span_listener)
+        self.pending_preview = None
+        self.preview_thread.quit()
+        self.thread.quit()
+        self.preview_thread.wait()
+        self.thread.wait()
+        while self.pending_saves:
+            job = self.pending_saves.popleft()
+            try:
+                self.worker.save_session(job)
+            except Exception:
+                logger.exception("Error saving session %s on exit", job["name"])
+
+    def gather_render_data(self):
         data = self.form_widget.gather_data()
-        if not data.get("name") and action_type != "fast_preview":
+        data["language"] = self.settings.value("language", "en")
+        # The worker adds the bill's running-account history; see with_bill_history.
+        data["history_session_id"] = self.active_session_info[0] if self.active_session_info else None
+        return data
+
+    def _trigger_worker(self, action_type, output_path=""):
+        # Previews run while the user keeps typing; only file jobs lock the form.
+        if action_type not in PREVIEW_ACTIONS:
+            self.set_ui_enabled(False)
+        data = self.gather_render_data()
+        if not data.get("name") and action_type not in PREVIEW_ACTIONS + ("export_excel",):
             show_message_box(self.tr("Missing Info"), self.tr("Please provide a 'Name' in the Document Details before generating a file."))
             self.set_ui_enabled(True)
             return
-        self.request_job.emit(data, action_type, output_path)
+        if action_type in PREVIEW_ACTIONS:
+            self.send_preview(data, action_type)
+        else:
+            self.request_job.emit(data, action_type, output_path)
 
-    def on_worker_finished(self, success, message, result_data):
-        self.set_ui_enabled(True)
+    def send_preview(self, data, action_type):
+        if self.preview_running:
+            self.pending_preview = (data, action_type)
+            return
+        self.preview_running = True
+        self.request_preview.emit(data, action_type, "")
+
+    def on_worker_finished(self, success, message, result_data, action_type):
+        if action_type in PREVIEW_ACTIONS:
+            self.preview_running = False
+            if self.pending_preview:
+                pending, self.pending_preview = self.pending_preview, None
+                self.send_preview(*pending)
+        if action_type == "save_session":
+            # Saves never lock the form; a successful one is reported through session_saved.
+            if not success:
+                self.pending_saves.popleft()
+                self.update_status(self.tr("Save failed - check logs"))
+            return
+        if action_type not in PREVIEW_ACTIONS:
+            self.set_ui_enabled(True)
         if not self.worker: return
-        action_type = self.worker.action_type
+        if not success and action_type == "preview":
+            self.update_status(self.tr(f"Error: {message}"))
+            if self.exact_preview_btn.isChecked():
+                self.exact_preview_btn.setChecked(False)
+                show_message_box(self.tr("Exact Preview"), message)
+            return
         if not success:
             show_message_box(self.tr("Error"), self.tr(f"Operation failed: {message}"))
             self.update_status(self.tr(f"Error: {message}"))
             return
-        preview_target = self.preview_widget
-        if self.is_preview_detached and self.detached_preview_dialog:
-            preview_target = self.detached_preview_dialog.preview_widget
         if action_type == "fast_preview":
-            if preview_target:
-                preview_target.setHtml(result_data)
-                self.update_status(self.tr("Preview updated."))
+            self.update_status(self.tr("Preview updated."))
         elif action_type == "preview":
-            if preview_target:
-                preview_target.setHtml(f"<h1>{self.tr('Slow preview not supported anymore. Use live preview.')}</h1>")
+            self.update_status(self.tr("Exact preview updated."))
         elif action_type in ["save_docx", "save_pdf"]:
             show_message_box(self.tr("Success"), self.tr(f"File saved to:\n{result_data}"))
             self.quick_save()
             self.update_status(self.tr(f"File saved: {os.path.basename(result_data)}"))
+        elif action_type == "export_sessions":
+            path, count = result_data
+            show_message_box(self.tr("Export Successful"), self.tr("%d bills exported to:\n%s") % (count, path))
+            self.update_status(self.tr("Exported to Excel: %s") % os.path.basename(path))
+        elif action_type == "export_excel":
+            show_message_box(self.tr("Export Successful"), self.tr(f"Data exported to:\n{result_data}"))
+            self.update_status(self.tr("Exported to Excel: %s") % os.path.basename(result_data))
+        elif action_type == "reprice_sessions":
+            self.on_repricing_finished(result_data)
     
+    def on_preview_ready(self, document):
+        self.show_preview_document(document)
+
+    def show_preview_document(self, document):
+        # The form owns the current preview document; the docked and detached views only display it.
+        previous = self.preview_document
+        if document is not None:
+            document.setParent(self)
+        self.preview_document = document
+        self.preview_widget.set_document(document)
+        if self.detached_preview_dialog:
+            self.detached_preview_dialog.preview_widget.set_document(document)
+        if previous is not None and previous is not document:
+            previous.deleteLater()
+
     def toggle_preview_dock_state(self):
         if not self.is_preview_detached:
-            self.detached_preview_dialog = DetachedPreviewDialog(self.preview_widget, self)
+            self.detached_preview_dialog = DetachedPreviewDialog(self.preview_document, self)
             self.detached_preview_dialog.closed.connect(self.toggle_preview_dock_state)
-            self.preview_layout.removeWidget(self.preview_widget)
-            self.detached_preview_dialog.layout().addWidget(self.preview_widget)
+            self.preview_widget.hide()
+            self.preview_navigator.hide()
             self.is_preview_detached = True
             self.detach_btn.setToolTip(self.tr("Dock Preview"))
             self.detach_btn.setText("⬇️")
             self.detached_preview_dialog.show()
-            self.preview_widget.update()
         else:
-            if self.detached_preview_dialog:
-                self.detached_preview_dialog.layout().removeWidget(self.preview_widget)
-                self.detached_preview_dialog.close()
-            self.preview_layout.addWidget(self.preview_widget)
+            dialog = self.detached_preview_dialog
+            self.detached_preview_dialog = None
+            if dialog:
+                dialog.closed.disconnect(self.toggle_preview_dock_state)
+                dialog.close()
+                dialog.deleteLater()
+            self.preview_widget.show()
+            self.preview_navigator.show()
             self.is_preview_detached = False
             self.detach_btn.setToolTip(self.tr("Detach Preview"))
             self.detach_btn.setText("⏏️")
-            self.preview_widget.update()
-            self.detached_preview_dialog = None
 
     def set_ui_enabled(self, enabled):
-        for w in [self.save_docx_btn, self.save_pdf_btn, self.preview_btn, self.quick_save_btn, self.export_btn]:
+        for w in [self.save_docx_btn, self.save_pdf_btn, self.preview_btn, self.quick_save_btn, self.export_btn, self.export_sessions_btn, self.reprice_btn]:
             w.setEnabled(enabled)
         self.sidebar.setEnabled(enabled)
         self.form_widget.setEnabled(enabled)
@@ -452,24 +653,70 @@ class MainForm(QWidget):
         default_filename = self.get_default_filename(data, "xlsx")
         initial_dir = self.backup_location if self.backup_location else QDir.homePath()
         file_path, _ = QFileDialog.getSaveFileName(self, self.tr("Export to Excel"), os.path.join(initial_dir, default_filename), self.tr("Excel Files (*.xlsx)"))
+        if file_path: self._trigger_worker("export_excel", output_path=file_path)
+
+    def export_sessions(self):
+        dialog = SessionExportDialog(self)
+        if not dialog.exec(): return
+        session_ids = dialog.selected_session_ids()
+        if not session_ids:
+            return show_message_box(self.tr("Error"), self.tr("No bills selected."))
+        default_filename = f"Bills_{datetime.datetime.now().strftime('%Y-%m-%d')}.xlsx"
+        initial_dir = self.backup_location if self.backup_location else QDir.homePath()
+        file_path, _ = QFileDialog.getSaveFileName(self, self.tr("Export Bills to Excel"), os.path.join(initial_dir, default_filename), self.tr("Excel Files (*.xlsx)"))
         if not file_path: return
-        try:
-            pd.DataFrame(rows).to_excel(file_path, index=False)
-            show_message_box(self.tr("Export Successful"), self.tr(f"Data exported to:\n{file_path}"))
-            self.update_status(self.tr("Exported to Excel: %s") % os.path.basename(file_path))
-        except Exception as e:
-            show_message_box(self.tr("Export Failed"), self.tr(f"An error occurred: {str(e)}"))
-            self.update_status(self.tr("Export failed: %s") % str(e))
+        self.set_ui_enabled(False)
+        self.request_job.emit({"session_ids": session_ids, "language": self.settings.value("language", "en")}, "export_sessions", file_path)
+
+    def reprice_bills(self):
+        dialog = SessionExportDialog(self, "Reprice Bills")
+        if not dialog.exec(): return
+        session_ids = dialog.selected_session_ids()
+        if not session_ids:
+            return show_message_box(self.tr("Error"), self.tr("No bills selected."))
+        self.start_repricing(session_ids)
+
+    def start_repricing(self, session_ids):
+        reply = QMessageBox.question(self, self.tr("Reprice Bills"),
+                                     self.tr("Replace the rates and amounts of %d saved bills with the current SSR rates?\nQuantities are kept; unsaved changes to the open bill are saved first.") % len(session_ids),
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes: return
+        if self.form_widget.is_dirty:
+            self.quick_save()
+        self.set_ui_enabled(False)
+        self.update_status(self.tr("Repricing %d bills...") % len(session_ids))
+        self.request_job.emit({"session_ids": session_ids}, "reprice_sessions", "")
+
+    def on_repricing_finished(self, report):
+        repriced = {row[0] for row in report if row[2]}
+        self.refresh_sidebar()
+        # The open bill was rewritten underneath the form; show the revised rates.
+        if self.active_session_info and self.active_session_info[0] in repriced:
+            item = self.find_item_by_data(self.active_session_info)
+            if item:
+                self.load_session_data(item)
+        self.update_status(self.tr("%d of %d bills repriced.") % (len(repriced), len(report)))
+        RepriceReportDialog(report, self.settings.value("language", "en"), self).exec()
 
     def start_preview_timer(self):
         self.preview_timer.start()
 
     def trigger_auto_preview(self):
         if not self.isVisible(): return
-        self._trigger_worker("fast_preview")
+        self.preview_doc()
 
     def preview_doc(self):
-        self._trigger_worker("fast_preview")
+        self._trigger_worker("preview" if self.exact_preview_btn.isChecked() else "fast_preview")
+
+    def set_exact_preview(self, enabled):
+        if enabled and not exact_preview_available():
+            self.exact_preview_btn.setChecked(False)
+            return show_message_box(self.tr("Exact Preview"), self.tr("Exact preview needs LibreOffice (or Pandoc with a LaTeX engine) installed."))
+        self.settings.setValue("exact_preview", enabled)
+        # Rendered pages are cached by content, but a conversion still takes seconds, so wait for a longer pause.
+        self.preview_timer.setInterval(EXACT_PREVIEW_DELAY_MS if enabled else PREVIEW_DELAY_MS)
+        if self.isVisible():
+            self.preview_doc()
 
     def save_docx(self):
         data = self.form_widget.gather_data()
@@ -479,7 +726,7 @@ class MainForm(QWidget):
         if file_path: self._trigger_worker("save_docx", output_path=file_path)
 
     def save_pdf(self):
-        if not pypandoc:
+        if not get_pypandoc():
             return show_message_box(self.tr("PDF Not Available"), self.tr("`pypandoc` library not installed."))
         data = self.form_widget.gather_data()
         default_filename = self.get_default_filename(data, "pdf")
@@ -488,9 +735,10 @@ class MainForm(QWidget):
         if file_path: self._trigger_worker("save_pdf", output_path=file_path)
 
     def export_all_reports(self):
-        data = self.form_widget.gather_data()
+        data = with_bill_history(self.gather_render_data())
         if not data.get("name"):
             return show_message_box(self.tr("Missing Info"), self.tr("Please provide a 'Name' in the Document Details before exporting."))
+        pypandoc = get_pypandoc()
         if not pypandoc:
             return show_message_box(self.tr("Dependency Missing"), self.tr("Cannot generate PDF because `pypandoc` is not installed."))
         dir_path = QFileDialog.getExistingDirectory(self, self.tr("Select Directory to Save Report Pack"), self.backup_location if self.backup_location else "")
@@ -521,7 +769,7 @@ class MainForm(QWidget):
             QApplication.processEvents()
             if progress.wasCanceled(): raise OperationCanceledError()
             excel_path = os.path.join(dir_path, f"{base_name_no_ext}.xlsx")
-            pd.DataFrame(data.get("items", [])).to_excel(excel_path, index=False)
+            write_items_workbook(excel_path, data)
             progress.setValue(3)
             show_message_box(self.tr("Success"), self.tr(f"Report pack saved successfully in:\n{dir_path}"))
             self.update_status(self.tr("Report pack generated."))
@@ -534,6 +782,17 @@ class MainForm(QWidget):
             progress.close()
             self.set_ui_enabled(True)
 
+    def set_perf_readout_visible(self, visible):
+        self.settings.setValue("show_perf_readout", visible)
+        self.perf_label.setVisible(visible)
+
+    def update_perf_readout(self, name, duration_ms):
+        label = PERF_READOUT_SPANS.get(name)
+        if not label:
+            return
+        self.perf_readout[label] = duration_ms
+        self.perf_label.setText("  ·  ".join(f"{self.tr(key)} {value:.0f} ms" for key, value in self.perf_readout.items()))
+
     def update_status(self, message):
         timestamp = QDateTime.currentDateTime().toString("hh:mm:ss AP")
         self.status_bar.showMessage(f"{timestamp} | {message}")
\ No newline at end of file
@@ -1,10 +1,15 @@
 import os
+import threading
 from PyQt6.QtWidgets import QWidget, QStackedLayout
 from PyQt6.QtGui import QIcon
 
+from core import profiling
 from core.constants import SCRIPT_DIR
 from .login_screen import LoginScreen
-from .main_form import MainForm
+
+def _warm_main_form_imports():
+    # Pulls in the main form while the user is typing a password; document libraries stay lazy until first save.
+    import ui.main_form
 
 class BillApp(QWidget):
     def __init__(self):
@@ -14,13 +19,26 @@ class BillApp(QWidget):
         self.stack = QStackedLayout(self)
 
         self.login = LoginScreen(self.stack)
-        self.form = MainForm()
+        self.login.login_succeeded.connect(self.show_main_form)
+        self.form = None
 
         self.stack.addWidget(self.login)
-        self.stack.addWidget(self.form)
+        threading.Thread(target=_warm_main_form_imports, daemon=True).start()
+
+    def ensure_main_form(self):
+        if self.form is None:
+            from .main_form import MainForm
+            self.form = MainForm()
+            self.stack.addWidget(self.form)
+            profiling.mark("main form built")
+        return self.form
+
+    def show_main_form(self):
+        self.stack.setCurrentWidget(self.ensure_main_form())
         
     def changeEvent(self, event):
         if event.type() == event.type().LanguageChange:
             self.login.retranslate()
-            self.form.retranslate()
-        super().changeEvent(event)
\ No newline at end of file
+            if self.form is not None:
+                self.form.retranslate()
+        super().changeEvent(event)
@@ -1,21 +1,23 @@
 import os
 from PyQt6.QtWidgets import (
     QFrame, QHBoxLayout, QVBoxLayout, QListWidget, QLineEdit, QLabel,
-    QToolButton, QSizePolicy, QApplication, QListWidgetItem, QMenu, QMessageBox
+    QToolButton, QSizePolicy, QListWidgetItem, QMenu, QMessageBox
 )
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QSize, QDir, QPropertyAnimation
 from PyQt6.QtGui import QIcon, QFont, QColor
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import (
     QFrame, QHBoxLayout, QVBoxLayout, QListWidget, QLineEdit, QLabel,
-    QToolButton, QSizePolicy, QApplication, QListWidgetItem, QMenu, QMessageBox
+    QToolButton, QSizePolicy, QListWidgetItem, QMenu, QMessageBox
 )
 import datetime
 
 from core.constants import SCRIPT_DIR
 from ui.widgets.dialogs import show_message_box
 from core.data_manager import delete_session_from_db, load_sessions
+from core.utilities import translate_text
+
+SESSION_NAME_ROLE = Qt.ItemDataRole.UserRole + 1
 
 class CollapsibleSidebar(QFrame):
     def __init__(self, parent=None):
@@ -60,12 +62,24 @@ class CollapsibleSidebar(QFrame):
         self.search_bar.setPlaceholderText(self.tr("Search sessions..."))
         self.history_label.setText(self.tr("Session History"))
         self.toggle_button.setToolTip(self.tr("Collapse/Expand Sidebar"))
-        parent_main_form = self.parent()
-        if parent_main_form and hasattr(parent_main_form, 'refresh_sidebar'):
-            parent_main_form.refresh_sidebar()
+        for i in range(self.list_widget.count()):
+            item = self.list_widget.item(i)
+            session_info = item.data(Qt.ItemDataRole.UserRole)
+            if session_info is None:
+                item.setText(self.tr("➕  New Bill"))
+            else:
+                item.setText(self.session_item_text(item.data(SESSION_NAME_ROLE), session_info[2]))
+
+    def session_item_text(self, name, timestamp):
+        main_text = name if name else self.tr("Unnamed Session")
+        try:
+            sub_text = datetime.datetime.fromisoformat(timestamp).strftime("%d %b %Y, %I:%M %p")
+        except (ValueError, TypeError):
+            sub_text = self.tr("No date")
+        return f"{main_text}\n{sub_text}"
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def filter_sessions(self, text):
         for i in range(self.list_widget.count()):
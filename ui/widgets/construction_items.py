@@ -1,16 +1,24 @@
-import os
-import pandas as pd
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QLabel, QPushButton,
     QHBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView, QCompleter,
-    QFrame, QComboBox, QApplication
+    QFrame, QComboBox, QApplication, QFileDialog
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QDoubleValidator
-import re
+from PyQt6.QtCore import Qt, QDir, QEvent, QStringListModel, pyqtSignal
+from PyQt6.QtGui import QDoubleValidator, QColor, QKeySequence, QShortcut, QUndoStack
 
 from .dialogs import show_message_box
-from core.constants import SSR_DATA_EXCEL
+from .item_history import UNDO_LIMIT, InsertRowsCommand, RemoveRowsCommand, EditCellsCommand, FieldEditCommand, RecordingDelegate
+from core.constants import ITEM_KEYS
+from core.measurement_import import MeasurementImportError, read_measurement_file, parse_measurement_text, resolve_measurements
+from core.ssr_catalog import get_ssr_catalog_loader, ssr_catalog_versions, chapter_key, DEFAULT_SSR_VERSION
+from core.totals import BillTotals, line_amount, to_decimal, format_rupees
+from core.tracing import span
+from core.utilities import translate_text
+
+# Table columns follow ITEM_KEYS; the last column holds the row's delete action.
+RATE_COLUMN, QUANTITY_COLUMN, TOTAL_COLUMN = 7, 8, 9
+DELETE_COLUMN = 10
+MAX_UNMATCHED_SHOWN = 15
 
 class ConstructionItemsWidget(QWidget):
     dirty_state_changed = pyqtSignal()
@@ -18,9 +26,24 @@ class ConstructionItemsWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.ssr_data = None
+        self.ssr_catalog = None
+        # The schedule of rates this bill is priced with; saved with the session so older bills keep their year's SSR.
+        self.ssr_version = DEFAULT_SSR_VERSION
+        self._watched_loaders = set()
+        self._description_models = {}
+        # None shows every chapter; the descriptions are only read when the item box is first used.
+        self.chapter_filter = None
+        # (chapters, action) pairs waiting on the catalog loader's thread to read those chapters.
+        self._chapters_wanted = []
+        # Line amounts in row order with their running sum, kept in step with every table change.
+        self.totals = BillTotals()
+        # The table's text as one tuple per row, replaced whenever a row changes; copying the list is a snapshot.
+        self.rows = []
+        # Row and cell changes of the open bill; cleared when another bill is opened or a new one started.
+        self.undo_stack = QUndoStack(self)
+        self.undo_stack.setUndoLimit(UNDO_LIMIT)
         self.setup_ui()
-        self.load_ssr_data_from_excel()
+        self.load_ssr_catalog()
     
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -30,13 +53,28 @@ class ConstructionItemsWidget(QWidget):
         item_entry_layout = QFormLayout(item_entry_frame)
         item_entry_layout.setVerticalSpacing(10)
 
+        self.ssr_version_combo = QComboBox()
+        self.ssr_version_label = QLabel(self.tr("SSR Version:"))
+        item_entry_layout.addRow(self.ssr_version_label, self.ssr_version_combo)
+        self.populate_ssr_versions()
+
+        self.chapter_combo = QComboBox()
+        self.chapter_label = QLabel(self.tr("Chapter:"))
+        item_entry_layout.addRow(self.chapter_label, self.chapter_combo)
+
         self.description_combo = QComboBox()
         self.description_combo.setEditable(True)
         self.description_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.no_descriptions = QStringListModel(self)
+        self.description_combo.setModel(self.no_descriptions)
+        self.description_combo.installEventFilter(self)
+        self.description_combo.lineEdit().installEventFilter(self)
         item_entry_layout.addRow(QLabel(self.tr("Item Description:")), self.description_combo)
 
         self.quantity_input = QLineEdit()
-        self.quantity_input.setValidator(QDoubleValidator())
+        quantity_validator = QDoubleValidator(self.quantity_input)
+        quantity_validator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        self.quantity_input.setValidator(quantity_validator)
         item_entry_layout.addRow(QLabel(self.tr("Quantity:")), self.quantity_input)
 
         self.unit_input = QLineEdit(readOnly=True)
@@ -53,6 +91,19 @@ class ConstructionItemsWidget(QWidget):
         self.add_button = QPushButton(self.tr("Add Item"))
         self.add_button.setToolTip(self.tr("Add the defined item to the table below."))
         button_layout.addWidget(self.add_button)
+        self.import_button = QPushButton(self.tr("Import Items..."))
+        self.import_button.setToolTip(self.tr("Import measurements from an Excel or CSV sheet of SSR item numbers and quantities."))
+        button_layout.addWidget(self.import_button)
+        self.paste_button = QPushButton(self.tr("Paste Items"))
+        self.paste_button.setToolTip(self.tr("Paste SSR item numbers and quantities copied from a spreadsheet."))
+        button_layout.addWidget(self.paste_button)
+        self.clear_items_button = QPushButton(self.tr("Clear Items"))
+        self.clear_items_button.setToolTip(self.tr("Remove every item from the table."))
+        button_layout.addWidget(self.clear_items_button)
+        self.undo_button = QPushButton(self.tr("Undo"), enabled=False)
+        button_layout.addWidget(self.undo_button)
+        self.redo_button = QPushButton(self.tr("Redo"), enabled=False)
+        button_layout.addWidget(self.redo_button)
         
         signatories_frame = QFrame()
         signatories_layout = QFormLayout(signatories_frame)
@@ -60,6 +111,8 @@ class ConstructionItemsWidget(QWidget):
         self.jr_engineer_input = QLineEdit()
         self.deputy_engineer_input = QLineEdit()
         self.executive_engineer_input = QLineEdit()
+        self.signatory_inputs = [self.jr_engineer_input, self.deputy_engineer_input, self.executive_engineer_input]
+        self._field_texts = {field: "" for field in self.signatory_inputs}
         signatories_layout.addRow(QLabel(self.tr("Jr./Sect./Asst. Engineer:")), self.jr_engineer_input)
         signatories_layout.addRow(QLabel(self.tr("Deputy Engineer:")), self.deputy_engineer_input)
         signatories_layout.addRow(QLabel(self.tr("Executive Engineer:")), self.executive_engineer_input)
@@ -77,6 +130,7 @@ class ConstructionItemsWidget(QWidget):
             self.items_table.setColumnWidth(i, width)
         
         self.items_table.verticalHeader().setVisible(False)
+        self.items_table.setItemDelegate(RecordingDelegate(self.record_cell_edit, self.items_table))
 
         layout.addWidget(item_entry_frame)
         layout.addLayout(button_layout)
@@ -84,127 +138,410 @@ class ConstructionItemsWidget(QWidget):
         layout.addWidget(signatories_frame)
 
         self.description_combo.currentTextChanged.connect(self.update_item_details)
+        self.ssr_version_combo.currentIndexChanged.connect(self.on_ssr_version_selected)
+        self.chapter_combo.currentIndexChanged.connect(self.on_chapter_selected)
         self.quantity_input.textChanged.connect(self.calculate_total)
         self.add_button.clicked.connect(self.add_to_table)
+        self.import_button.clicked.connect(self.import_items_from_file)
+        self.paste_button.clicked.connect(self.paste_items)
+        paste_shortcut = QShortcut(QKeySequence.StandardKey.Paste, self.items_table)
+        paste_shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+        paste_shortcut.activated.connect(self.paste_items)
+        self.clear_items_button.clicked.connect(self.clear_items)
+        self.undo_button.clicked.connect(self.undo_stack.undo)
+        self.redo_button.clicked.connect(self.undo_stack.redo)
+        self.undo_stack.canUndoChanged.connect(self.undo_button.setEnabled)
+        self.undo_stack.canRedoChanged.connect(self.redo_button.setEnabled)
+        for key, slot in [(QKeySequence.StandardKey.Undo, self.undo_stack.undo), (QKeySequence.StandardKey.Redo, self.undo_stack.redo)]:
+            shortcut = QShortcut(key, self)
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(slot)
+        for field in self.signatory_inputs:
+            field.textEdited.connect(lambda text, field=field: self.record_field_edit(field, text))
         
         self.quantity_input.textChanged.connect(self.dirty_state_changed.emit)
         self.description_combo.currentTextChanged.connect(self.dirty_state_changed.emit)
         self.jr_engineer_input.textChanged.connect(self.dirty_state_changed.emit)
         self.deputy_engineer_input.textChanged.connect(self.dirty_state_changed.emit)
         self.executive_engineer_input.textChanged.connect(self.dirty_state_changed.emit)
+        self.items_table.itemChanged.connect(self.on_item_changed)
         self.items_table.itemChanged.connect(self.dirty_state_changed.emit)
+        self.items_table.cellClicked.connect(self.on_cell_clicked)
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
-
-    def load_ssr_data_from_excel(self):
-        try:
-            if not os.path.exists(SSR_DATA_EXCEL):
-                show_message_box(self.tr("Excel Data Missing"), self.tr(f"Error: '{SSR_DATA_EXCEL}' not found.\nPlease ensure the file exists in the 'assets' folder."))
-                return
-
-            excel_data = pd.read_excel(SSR_DATA_EXCEL, sheet_name=None, header=1)
-
-            self.ssr_data = pd.DataFrame()
-            for df in excel_data.values():
-                self.ssr_data = pd.concat([self.ssr_data, df], ignore_index=True)
-
-            expected_excel_cols = {
-                'Sr. No': 'sr_no', 'Chapter': 'chapter', 'SSR Item No.': 'ssr_item_no',
-                'Reference No.': 'reference_no', 'Description of the item': 'description_of_the_item',
-                'Additional Specification': 'additional_specification', 'Unit': 'unit',
-                'Completed Rates': 'completed_rates'
-            }
-
-            self.ssr_data = self.ssr_data.rename(columns={k: v for k, v in expected_excel_cols.items() if k in self.ssr_data.columns})
-            
-            required_cols_standardized = ['description_of_the_item', 'unit', 'completed_rates', 'ssr_item_no']
-            if not all(col in self.ssr_data.columns for col in required_cols_standardized):
-                show_message_box(self.tr("Invalid Excel File"), self.tr("Excel file must contain required columns."))
-                self.ssr_data = None
-                return
-
-            descriptions = self.ssr_data['description_of_the_item'].dropna().unique().tolist()
-            self.description_combo.clear()
-            self.description_combo.addItems(descriptions)
-
-            completer = QCompleter(descriptions, self)
+        return translate_text(text)
+
+    def populate_ssr_versions(self):
+        versions = list(ssr_catalog_versions())
+        if self.ssr_version not in versions:
+            # Pinned to a schedule whose workbook is missing here; keep the pin so saving does not silently reprice it.
+            versions.append(self.ssr_version)
+        self.ssr_version_combo.blockSignals(True)
+        self.ssr_version_combo.clear()
+        for version in versions:
+            self.ssr_version_combo.addItem(self.tr("Current") if version == DEFAULT_SSR_VERSION else version, version)
+        self.ssr_version_combo.setCurrentIndex(versions.index(self.ssr_version))
+        self.ssr_version_combo.blockSignals(False)
+        # A single schedule leaves nothing to choose.
+        multiple = len(versions) > 1
+        self.ssr_version_label.setVisible(multiple)
+        self.ssr_version_combo.setVisible(multiple)
+
+    def on_ssr_version_selected(self, index):
+        version = self.ssr_version_combo.itemData(index)
+        if version and version != self.ssr_version:
+            self.set_ssr_version(version)
+            self.dirty_state_changed.emit()
+
+    def set_ssr_version(self, version):
+        version = version or DEFAULT_SSR_VERSION
+        changed = version != self.ssr_version
+        self.ssr_version = version
+        self.populate_ssr_versions()
+        if changed:
+            self.ssr_catalog = None
+            self._chapters_wanted = []
+            self.load_ssr_catalog()
+
+    def load_ssr_catalog(self):
+        loader = get_ssr_catalog_loader(self.ssr_version)
+        if loader not in self._watched_loaders:
+            self._watched_loaders.add(loader)
+            loader.ready.connect(self.on_ssr_catalog_ready)
+            loader.failed.connect(self.on_ssr_catalog_failed)
+            loader.chapters_ready.connect(self.on_ssr_chapters_ready)
+        if loader.catalog is not None:
+            self.on_ssr_catalog_ready(loader.catalog)
+            return
+        self.set_item_entry_enabled(False)
+        if loader.error is not None:
+            self.on_ssr_catalog_failed(*loader.error)
+        else:
+            loader.start()
+
+    def set_item_entry_enabled(self, enabled):
+        self.chapter_combo.setEnabled(enabled)
+        self.description_combo.setEnabled(enabled)
+        self.add_button.setEnabled(enabled)
+        self.import_button.setEnabled(enabled)
+        self.paste_button.setEnabled(enabled)
+        self.description_combo.lineEdit().setPlaceholderText("" if enabled else self.tr("Loading SSR catalog..."))
+
+    def on_ssr_catalog_ready(self, catalog):
+        if catalog is not get_ssr_catalog_loader(self.ssr_version).catalog:
+            # A version the bill has since moved away from finished loading.
+            return
+        self.ssr_catalog = catalog
+        self.populate_chapters()
+        self.description_combo.blockSignals(True)
+        self.description_combo.setModel(self.no_descriptions)
+        self.description_combo.setCurrentIndex(-1)
+        self.description_combo.blockSignals(False)
+        self.set_item_entry_enabled(True)
+        if self.description_combo.hasFocus():
+            self.show_descriptions()
+
+    def populate_chapters(self):
+        chapters = self.ssr_catalog.chapters if self.ssr_catalog is not None else []
+        self.chapter_combo.blockSignals(True)
+        self.chapter_combo.clear()
+        self.chapter_combo.addItem(self.tr("All Chapters"), None)
+        for chapter in chapters:
+            self.chapter_combo.addItem(chapter, chapter)
+        self.chapter_combo.setCurrentIndex(max(self.chapter_combo.findData(self.chapter_filter), 0))
+        self.chapter_combo.blockSignals(False)
+
+    def set_chapter_filter(self, chapter):
+        self.chapter_filter = chapter or None
+        index = self.chapter_combo.findData(self.chapter_filter)
+        self.chapter_combo.blockSignals(True)
+        self.chapter_combo.setCurrentIndex(max(index, 0))
+        self.chapter_combo.blockSignals(False)
+        if self.description_combo.model() is not self.no_descriptions:
+            self.show_descriptions()
+
+    def on_chapter_selected(self, index):
+        self.chapter_filter = self.chapter_combo.itemData(index)
+        self.show_descriptions()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.FocusIn and obj in (self.description_combo, self.description_combo.lineEdit()):
+            self.show_descriptions()
+        return super().eventFilter(obj, event)
+
+    def when_chapters_loaded(self, chapters, action):
+        # Chapter rows are read on the catalog loader's thread; item entry stays disabled until they are in,
+        # then action runs on lookups alone.
+        if not self.ssr_catalog.missing_chapters(chapters):
+            action()
+            return
+        self._chapters_wanted.append((chapters, action))
+        self.set_item_entry_enabled(False)
+        get_ssr_catalog_loader(self.ssr_version).load_chapters(chapters)
+
+    def on_ssr_chapters_ready(self, catalog, chapters, error):
+        if catalog is not self.ssr_catalog or not self._chapters_wanted:
+            return
+        if error:
+            self._chapters_wanted = []
+            self.set_item_entry_enabled(True)
+            return show_message_box(self.tr("Excel Load Error"), self.tr(f"An error occurred while reading the Excel file: {error}"))
+        ready = [action for wanted, action in self._chapters_wanted if not catalog.missing_chapters(wanted)]
+        # Requests still being read keep item entry disabled.
+        self._chapters_wanted = [(wanted, action) for wanted, action in self._chapters_wanted if catalog.missing_chapters(wanted)]
+        if not self._chapters_wanted:
+            self.set_item_entry_enabled(True)
+        for action in ready:
+            action()
+
+    def show_descriptions(self):
+        # The filtered chapter (or, for all chapters, the whole book) is read the first time it is shown.
+        if self.ssr_catalog is None:
+            return
+        key = (self.ssr_version, self.chapter_filter)
+        cached = self._description_models.get(key)
+        if cached is None or cached[0] is not self.ssr_catalog:
+            chapters = self.ssr_catalog.chapters if self.chapter_filter is None else [self.chapter_filter]
+            if self.ssr_catalog.missing_chapters(chapters):
+                return self.when_chapters_loaded(chapters, self.show_descriptions)
+            descriptions = self.ssr_catalog.descriptions if self.chapter_filter is None else self.ssr_catalog.chapter_descriptions(self.chapter_filter)
+            # One string list model per catalog and chapter, shown by the combo and searched by the completer alike.
+            cached = self._description_models[key] = (self.ssr_catalog, QStringListModel(descriptions, self))
+        model = cached[1]
+        if self.description_combo.model() is model:
+            return
+        text = self.description_combo.currentText()
+        self.description_combo.blockSignals(True)
+        self.description_combo.setModel(model)
+        self.description_combo.setCurrentIndex(self.description_combo.findText(text) if text else -1)
+        self.description_combo.setEditText(text)
+        self.description_combo.blockSignals(False)
+
+        completer = self.description_combo.completer()
+        if completer is None or completer.parent() is not self:
+            completer = QCompleter(self)
             completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
             completer.setFilterMode(Qt.MatchFlag.MatchContains)
             self.description_combo.setCompleter(completer)
-
-        except Exception as e:
-            show_message_box(self.tr("Excel Load Error"), self.tr(f"An error occurred while reading the Excel file: {e}"))
-            self.ssr_data = None
+        completer.setModel(model)
+
+    def on_ssr_catalog_failed(self, error_kind, detail):
+        if self.sender() is not None and self.sender() is not get_ssr_catalog_loader(self.ssr_version):
+            return
+        self.ssr_catalog = None
+        self.description_combo.lineEdit().setPlaceholderText("")
+        if error_kind == "missing":
+            show_message_box(self.tr("Excel Data Missing"), self.tr(f"Error: '{detail}' not found.\nPlease ensure the file exists in the 'assets' folder."))
+        elif error_kind == "invalid":
+            show_message_box(self.tr("Invalid Excel File"), self.tr("Excel file must contain required columns."))
+        else:
+            show_message_box(self.tr("Excel Load Error"), self.tr(f"An error occurred while reading the Excel file: {detail}"))
 
     def update_item_details(self, description):
         self.unit_input.clear()
         self.rate_input.clear()
         self.calculate_total()
-        if self.ssr_data is None or not description: return
-        item_data = self.ssr_data[self.ssr_data['description_of_the_item'] == description]
-        if not item_data.empty:
-            item = item_data.iloc[0]
-            self.unit_input.setText(str(item.get('unit', '')))
-            rate_val = item.get('completed_rates', 0.0)
-            self.rate_input.setText(f"₹{float(rate_val):,.2f}" if pd.notna(rate_val) else "₹0.00")
+        if self.ssr_catalog is None or not description: return
+        item = self.ssr_catalog.find_by_description(description)
+        if item is not None:
+            self.unit_input.setText(str(item.get('unit') or ''))
+            rate_val = item.get('completed_rates')
+            self.rate_input.setText(format_rupees(rate_val) if rate_val is not None else "₹0.00")
         self.calculate_total()
 
     def calculate_total(self):
-        try:
-            quantity = float(self.quantity_input.text() or 0)
-            rate = float(self.rate_input.text().replace("₹", "").replace(",", "") or 0)
-            self.total_label.setText(f"₹{quantity * rate:,.2f}")
-        except ValueError:
-            self.total_label.setText("₹0.00")
+        self.total_label.setText(format_rupees(line_amount(self.quantity_input.text(), self.rate_input.text())))
         self.dirty_state_changed.emit()
 
     def add_to_table(self):
-        if self.ssr_data is None: return show_message_box(self.tr("Data Not Loaded"), self.tr("SSR data not available."))
+        if self.ssr_catalog is None: return show_message_box(self.tr("Data Not Loaded"), self.tr("SSR data not available."))
         description = self.description_combo.currentText()
         if not description: return show_message_box(self.tr("Invalid Item"), self.tr("Please select a valid item."))
         try:
             if float(self.quantity_input.text() or 0) <= 0: return show_message_box(self.tr("Invalid Input"), self.tr("Enter a positive quantity."))
         except ValueError: return show_message_box(self.tr("Invalid Quantity"), self.tr("Quantity must be a number."))
-        item_data = self.ssr_data[self.ssr_data['description_of_the_item'] == description]
-        if item_data.empty: return show_message_box(self.tr("Item Not Found"), self.tr("Selected item not in data source."))
-
-        ssr_item = item_data.iloc[0]
-        row = self.items_table.rowCount()
-        self.items_table.insertRow(row)
-
-        self.items_table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-        self.items_table.setItem(row, 1, QTableWidgetItem(str(ssr_item.get('chapter', ''))))
-        self.items_table.setItem(row, 2, QTableWidgetItem(str(ssr_item.get('ssr_item_no', ''))))
-        self.items_table.setItem(row, 3, QTableWidgetItem(str(ssr_item.get('reference_no', ''))))
-        self.items_table.setItem(row, 4, QTableWidgetItem(description))
-        self.items_table.setItem(row, 5, QTableWidgetItem(str(ssr_item.get('additional_specification', ''))))
-        self.items_table.setItem(row, 6, QTableWidgetItem(self.unit_input.text()))
-        self.items_table.setItem(row, 7, QTableWidgetItem(self.rate_input.text()))
-        self.items_table.setItem(row, 8, QTableWidgetItem(self.quantity_input.text()))
-        self.items_table.setItem(row, 9, QTableWidgetItem(self.total_label.text()))
-
-        delete_button = QPushButton(self.tr("Delete"))
-        delete_button.clicked.connect(lambda _, r=row: self.remove_table_row(r))
-        self.items_table.setCellWidget(row, 10, delete_button)
+        ssr_item = self.ssr_catalog.find_by_description(description)
+        if ssr_item is None: return show_message_box(self.tr("Item Not Found"), self.tr("Selected item not in data source."))
+
+        self.append_rows([[
+            str(self.items_table.rowCount() + 1), str(ssr_item.get('chapter') or ''), str(ssr_item.get('ssr_item_no') or ''),
+            str(ssr_item.get('reference_no') or ''), description, str(ssr_item.get('additional_specification') or ''),
+            self.unit_input.text(), self.rate_input.text(), self.quantity_input.text(), self.total_label.text()
+        ]])
+        self.clear_entry_fields()
 
+    def import_items_from_file(self):
+        if self.ssr_catalog is None: return show_message_box(self.tr("Data Not Loaded"), self.tr("SSR data not available."))
+        path, _ = QFileDialog.getOpenFileName(self, self.tr("Import Measurements"), QDir.homePath(), self.tr("Measurement Sheets (*.xlsx *.csv)"))
+        if not path: return
+        try:
+            rows = read_measurement_file(path)
+        except MeasurementImportError as e:
+            return show_message_box(self.tr("Import Error"), self.tr("Could not read the measurement sheet: %s") % e)
+        self.import_measurements(rows)
+
+    def paste_items(self):
+        if self.ssr_catalog is None: return show_message_box(self.tr("Data Not Loaded"), self.tr("SSR data not available."))
+        rows = parse_measurement_text(QApplication.clipboard().text())
+        if not rows: return show_message_box(self.tr("Paste Items"), self.tr("The clipboard holds no measurement lines."))
+        self.import_measurements(rows)
+
+    def import_measurements(self, rows):
+        chapters = self.ssr_catalog.item_chapters(item_no for _, item_no, _ in rows)
+        self.when_chapters_loaded(chapters, lambda: self.add_measurements(rows))
+
+    def add_measurements(self, rows):
+        with span("import_measurements", lines=len(rows)) as import_span:
+            resolved, unmatched = resolve_measurements(self.ssr_catalog, rows, self.items_table.rowCount() + 1)
+            self.append_rows(resolved)
+            import_span.set(unmatched=len(unmatched))
+        message = self.tr("%d items imported.") % len(resolved)
+        if unmatched:
+            lines = [self.tr("Line %d: %s (%s)") % (line_no, item_no or "-", self.tr(reason)) for line_no, item_no, _, reason in unmatched[:MAX_UNMATCHED_SHOWN]]
+            if len(unmatched) > MAX_UNMATCHED_SHOWN:
+                lines.append("...")
+            message += "\n\n" + self.tr("%d lines could not be matched:") % len(unmatched) + "\n" + "\n".join(lines)
+        show_message_box(self.tr("Import Measurements"), message)
+
+    def _delete_item(self):
+        # A plain item instead of a QPushButton per row keeps large tables cheap to build; clicks arrive via cellClicked.
+        item = QTableWidgetItem(self.tr("Delete"))
+        item.setFlags(Qt.ItemFlag.ItemIsEnabled)
+        item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        item.setForeground(QColor("#E53935"))
+        return item
+
+    def _fill_rows(self, start, rows):
+        table = self.items_table
+        table.blockSignals(True)
+        table.setUpdatesEnabled(False)
+        try:
+            end = table.rowCount()
+            if start == end:
+                table.setRowCount(start + len(rows))
+            else:
+                for _ in rows:
+                    table.insertRow(start)
+            for row, values in enumerate(rows, start):
+                for column, text in enumerate(values):
+                    table.setItem(row, column, QTableWidgetItem(text))
+                table.setItem(row, DELETE_COLUMN, self._delete_item())
+            self.rows[start:start] = [tuple(values) for values in rows]
+            self._renumber(start + len(rows))
+        finally:
+            table.setUpdatesEnabled(True)
+            table.blockSignals(False)
+        self.totals.insert(start, [to_decimal(values[TOTAL_COLUMN]) for values in rows])
+
+    def _renumber(self, start):
+        table = self.items_table
+        for r in range(start, table.rowCount()):
+            sr_no = str(r + 1)
+            table.item(r, 0).setText(sr_no)
+            self.rows[r] = (sr_no,) + self.rows[r][1:]
+
+    def _store_cells(self, row, texts):
+        values = list(self.rows[row])
+        for column, text in texts.items():
+            values[column] = text
+        self.rows[row] = tuple(values)
+
+    def _row_values(self, row):
+        return list(self.rows[row])
+
+    def insert_rows(self, start, rows):
+        self._fill_rows(start, rows)
         self.dirty_state_changed.emit()
         self.rows_changed.emit()
-        self.clear_entry_fields()
-
-    def remove_table_row(self, row):
-        self.items_table.removeRow(row)
-        for r in range(self.items_table.rowCount()):
-            self.items_table.item(r, 0).setText(str(r+1))
-            delete_button = self.items_table.cellWidget(r, 10)
-            if delete_button:
-                try: delete_button.clicked.disconnect()
-                except TypeError: pass
-                delete_button.clicked.connect(lambda _, current_r=r: self.remove_table_row(current_r))
 
+    def take_rows(self, start, count):
+        table = self.items_table
+        table.blockSignals(True)
+        table.setUpdatesEnabled(False)
+        try:
+            del self.rows[start:start + count]
+            if start + count == table.rowCount():
+                table.setRowCount(start)
+            else:
+                for _ in range(count):
+                    table.removeRow(start)
+                self._renumber(start)
+            self.totals.remove(start, count)
+        finally:
+            table.setUpdatesEnabled(True)
+            table.blockSignals(False)
         self.dirty_state_changed.emit()
         self.rows_changed.emit()
 
+    def set_cells(self, row, texts):
+        table = self.items_table
+        table.blockSignals(True)
+        try:
+            for column, text in texts.items():
+                table.item(row, column).setText(text)
+        finally:
+            table.blockSignals(False)
+        self._store_cells(row, texts)
+        self.totals.update(row, to_decimal(self.rows[row][TOTAL_COLUMN]))
+        self.dirty_state_changed.emit()
+
+    def set_field_text(self, field, text):
+        self._field_texts[field] = text
+        field.setText(text)
+
+    def _sync_field_texts(self):
+        self._field_texts = {field: field.text() for field in self.signatory_inputs}
+
+    def record_cell_edit(self, row, column, commit):
+        # A quantity or rate edit also re-prices the line, so the line total is recorded with it.
+        columns = [column] if column == TOTAL_COLUMN else [column, TOTAL_COLUMN]
+        before = [self.rows[row][c] for c in columns]
+        commit()
+        cells = {c: (old, self.rows[row][c]) for c, old in zip(columns, before)}
+        cells = {c: texts for c, texts in cells.items() if texts[0] != texts[1]}
+        if cells:
+            self.undo_stack.push(EditCellsCommand(self, row, cells, self.tr("Edit Item")))
+
+    def record_field_edit(self, field, text):
+        old = self._field_texts[field]
+        self._field_texts[field] = text
+        self.undo_stack.push(FieldEditCommand(self, field, old, text, self.tr("Edit Signatory")))
+
+    def append_rows(self, rows):
+        if not rows: return
+        self.undo_stack.push(InsertRowsCommand(self, self.items_table.rowCount(), rows, self.tr("Add Items")))
+
+    def clear_items(self):
+        if self.rows:
+            rows = [list(values) for values in self.rows]
+            self.undo_stack.push(RemoveRowsCommand(self, 0, rows, self.tr("Clear Items")))
+
+    def on_cell_clicked(self, row, column):
+        if column == DELETE_COLUMN:
+            self.remove_table_row(row)
+
+    def on_item_changed(self, item):
+        # An edited quantity or rate re-prices that line; the bill total moves by the line's difference only.
+        row, column = item.row(), item.column()
+        if column >= len(ITEM_KEYS):
+            return
+        self._store_cells(row, {column: item.text()})
+        table = self.items_table
+        if column in (RATE_COLUMN, QUANTITY_COLUMN):
+            amount = line_amount(self.rows[row][QUANTITY_COLUMN], self.rows[row][RATE_COLUMN])
+            table.blockSignals(True)
+            table.item(row, TOTAL_COLUMN).setText(format_rupees(amount))
+            table.blockSignals(False)
+            self._store_cells(row, {TOTAL_COLUMN: format_rupees(amount)})
+        elif column == TOTAL_COLUMN:
+            amount = to_decimal(item.text())
+        else:
+            return
+        self.totals.update(row, amount)
+
+    def remove_table_row(self, row):
+        self.undo_stack.push(RemoveRowsCommand(self, row, [self._row_values(row)], self.tr("Delete Item")))
+
     def clear_entry_fields(self):
         self.description_combo.setCurrentIndex(-1)
         self.description_combo.clearEditText()
@@ -216,72 +553,71 @@ class ConstructionItemsWidget(QWidget):
     def clear_form(self):
         self.clear_entry_fields()
         self.items_table.setRowCount(0)
+        self.rows = []
+        self.totals.reset()
         self.jr_engineer_input.clear()
         self.deputy_engineer_input.clear()
         self.executive_engineer_input.clear()
+        self._sync_field_texts()
+        self.undo_stack.clear()
+        self.set_ssr_version(DEFAULT_SSR_VERSION)
+        self.set_chapter_filter(None)
         self.dirty_state_changed.emit()
         self.rows_changed.emit()
 
-    def gather_data(self):
-        items = []
-        for row in range(self.items_table.rowCount()):
-            items.append({
-                "sr_no": self.items_table.item(row, 0).text(), "chapter": self.items_table.item(row, 1).text(),
-                "ssr_no": self.items_table.item(row, 2).text(), "reference_no": self.items_table.item(row, 3).text(),
-                "description": self.items_table.item(row, 4).text(), "additional_spec": self.items_table.item(row, 5).text(),
-                "unit": self.items_table.item(row, 6).text(), "unit_rate": self.items_table.item(row, 7).text(),
-                "quantity": self.items_table.item(row, 8).text(), "total": self.items_table.item(row, 9).text()
-            })
-        
-        # Robustly handle potential non-numeric characters in the 'total' field
-        def extract_float(s):
-            if not s:
-                return 0.0
-            numeric_str = "".join(re.findall(r'[\d.]+', s.replace(",", "")))
-            try:
-                return float(numeric_str) if numeric_str else 0.0
-            except ValueError:
-                return 0.0
-        
-        overall_total_amount = sum(extract_float(i.get("total")) for i in items if i.get("total"))
-        
+    def snapshot(self):
         return {
-            "items": items, "total_amount": f"₹{overall_total_amount:,.2f}",
-            "signatory_jr_engineer": self.jr_engineer_input.text(),
-            "signatory_deputy_engineer": self.deputy_engineer_input.text(),
-            "signatory_exec_engineer": self.executive_engineer_input.text()
+            "rows": list(self.rows), "total_amount": format_rupees(self.totals.total), "ssr_version": self.ssr_version,
+            "signatories": {"signatory_jr_engineer": self.jr_engineer_input.text(),
+                            "signatory_deputy_engineer": self.deputy_engineer_input.text(),
+                            "signatory_exec_engineer": self.executive_engineer_input.text()}
         }
 
+    def gather_data(self):
+        snapshot = self.snapshot()
+        data = {"items": [dict(zip(ITEM_KEYS, row)) for row in snapshot["rows"]],
+                "total_amount": snapshot["total_amount"], "ssr_version": snapshot["ssr_version"]}
+        data.update(snapshot["signatories"])
+        return data
+
     def load_data(self, data):
+        # Opening a session fills the whole table with signals and repaints suspended, then reports one change.
+        rows = [[str(entry.get(key, "")) for key in ITEM_KEYS] for entry in data.get("items", [])]
         self.items_table.setRowCount(0)
-        items_to_load = data.get("items", [])
-        for entry in items_to_load:
-            row = self.items_table.rowCount()
-            self.items_table.insertRow(row)
-            self.items_table.setItem(row, 0, QTableWidgetItem(entry.get("sr_no", "")))
-            self.items_table.setItem(row, 1, QTableWidgetItem(entry.get("chapter", "")))
-            self.items_table.setItem(row, 2, QTableWidgetItem(entry.get("ssr_no", "")))
-            self.items_table.setItem(row, 3, QTableWidgetItem(entry.get("reference_no", "")))
-            self.items_table.setItem(row, 4, QTableWidgetItem(entry.get("description", "")))
-            self.items_table.setItem(row, 5, QTableWidgetItem(entry.get("additional_spec", "")))
-            self.items_table.setItem(row, 6, QTableWidgetItem(entry.get("unit", "")))
-            self.items_table.setItem(row, 7, QTableWidgetItem(str(entry.get("unit_rate", ""))))
-            self.items_table.setItem(row, 8, QTableWidgetItem(str(entry.get("quantity", ""))))
-            self.items_table.setItem(row, 9, QTableWidgetItem(str(entry.get("total", ""))))
-            delete_button = QPushButton(self.tr("Delete"))
-            delete_button.clicked.connect(lambda _, r=row: self.remove_table_row(r))
-            self.items_table.setCellWidget(row, 10, delete_button)
-        self.jr_engineer_input.setText(data.get("signatory_jr_engineer", ""))
-        self.deputy_engineer_input.setText(data.get("signatory_deputy_engineer", ""))
-        self.executive_engineer_input.setText(data.get("signatory_exec_engineer", ""))
+        self.rows = []
+        self.totals.reset()
+        self._fill_rows(0, rows)
+        for widget, key in [(self.jr_engineer_input, "signatory_jr_engineer"), (self.deputy_engineer_input, "signatory_deputy_engineer"),
+                            (self.executive_engineer_input, "signatory_exec_engineer")]:
+            widget.blockSignals(True)
+            widget.setText(data.get(key, ""))
+            widget.blockSignals(False)
+        self._sync_field_texts()
+        self.undo_stack.clear()
+        self.set_ssr_version(data.get("ssr_version", DEFAULT_SSR_VERSION))
+        # Carry on in the chapter the bill was last added to; only that chapter is read when the item box is used.
+        items = data.get("items", [])
+        self.set_chapter_filter(chapter_key(items[-1].get("chapter")) if items else None)
         self.dirty_state_changed.emit()
         self.rows_changed.emit()
 
     def retranslate(self):
+        self.populate_ssr_versions()
+        self.ssr_version_label.setText(self.tr("SSR Version:"))
+        self.populate_chapters()
+        self.chapter_label.setText(self.tr("Chapter:"))
         self.add_button.setText(self.tr("Add Item"))
         self.add_button.setToolTip(self.tr("Add the defined item to the table below."))
+        self.import_button.setText(self.tr("Import Items..."))
+        self.import_button.setToolTip(self.tr("Import measurements from an Excel or CSV sheet of SSR item numbers and quantities."))
+        self.paste_button.setText(self.tr("Paste Items"))
+        self.paste_button.setToolTip(self.tr("Paste SSR item numbers and quantities copied from a spreadsheet."))
+        self.clear_items_button.setText(self.tr("Clear Items"))
+        self.clear_items_button.setToolTip(self.tr("Remove every item from the table."))
+        self.undo_button.setText(self.tr("Undo"))
+        self.redo_button.setText(self.tr("Redo"))
         self.items_table.setHorizontalHeaderLabels([self.tr("Sr. No"), self.tr("Chapter"), self.tr("SSR Item No."), self.tr("Reference No."), self.tr("Description"), self.tr("Add. Spec."), self.tr("Unit"), self.tr("Rate"), self.tr("Qty"), self.tr("Total"), self.tr("Actions")])
+        self.items_table.blockSignals(True)
         for row in range(self.items_table.rowCount()):
-            delete_button = self.items_table.cellWidget(row, 10)
-            if delete_button:
-                delete_button.setText(self.tr("Delete"))
\ No newline at end of file
+            self.items_table.item(row, DELETE_COLUMN).setText(self.tr("Delete"))
+        self.items_table.blockSignals(False)
\ No newline at end of file
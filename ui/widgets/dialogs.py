@@ -2,11 +2,16 @@ import os
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialogButtonBox,
     QTextEdit, QToolButton, QFileDialog, QLineEdit, QComboBox, QSpinBox, 
-    QApplication, QAbstractButton, QSizePolicy, QFrame, QFormLayout
+    QAbstractButton, QSizePolicy, QFrame, QFormLayout,
+    QListWidget, QListWidgetItem, QCheckBox, QDateEdit, QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PyQt6.QtCore import Qt, QSize, pyqtSignal, QAbstractAnimation, QVariantAnimation, QEasingCurve
+from PyQt6.QtCore import Qt, QSize, QDate, pyqtSignal, QAbstractAnimation, QVariantAnimation, QEasingCurve
 from PyQt6.QtGui import QColor, QPalette, QPainter
 from PyQt6.QtWidgets import QAbstractButton, QSizePolicy
+from core.data_manager import load_session_index
+from core.repricing import REPRICE_REPORT_HEADERS
+from .preview_view import PreviewView, PreviewNavigator
+from core.utilities import translate_text
 
 class CustomMessageBox(QDialog):
     def __init__(self, title, text, parent=None):
@@ -51,7 +56,7 @@ class MessageEditorDialog(QDialog):
         layout.addWidget(button_box)
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def get_text(self):
         return self.text_edit.toPlainText()
@@ -59,23 +64,19 @@ class MessageEditorDialog(QDialog):
 class DetachedPreviewDialog(QDialog):
     closed = pyqtSignal()
 
-    def __init__(self, preview_widget, parent=None):
+    def __init__(self, document, parent=None):
         super().__init__(parent)
         self.setWindowTitle(self.tr("Detached Preview"))
         self.setMinimumSize(800, 600)
         self.setWindowFlags(Qt.WindowType.Window)
-        self.preview_widget = preview_widget
-        self.preview_widget.setStyleSheet("""
-            QTextEdit {
-                background-color: #FFFFFF;
-                border: none;
-                color: #212121;
-                font-family: Arial, sans-serif;
-            }
-        """)
+        # A second view on the main window's preview document; nothing is reparented or laid out again.
+        self.preview_widget = PreviewView()
+        self.preview_widget.set_document(document)
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         zoom_layout = QHBoxLayout()
+        self.navigator = PreviewNavigator(self.preview_widget)
+        zoom_layout.addWidget(self.navigator)
         zoom_layout.addStretch()
         zoom_in_btn = QToolButton(objectName="zoomInButton")
         zoom_in_btn.setText("➕")
@@ -91,7 +92,7 @@ class DetachedPreviewDialog(QDialog):
         layout.addWidget(self.preview_widget)
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def closeEvent(self, event):
         self.closed.emit()
@@ -105,6 +106,128 @@ class DetachedPreviewDialog(QDialog):
         zoom_out_btn = self.findChild(QToolButton, "zoomOutButton")
         if zoom_out_btn:
             zoom_out_btn.setToolTip(self.tr("Zoom Out"))
+        self.navigator.retranslate()
+
+class SessionExportDialog(QDialog):
+    def __init__(self, parent=None, title="Export Bills to Excel"):
+        super().__init__(parent)
+        self.setWindowTitle(self.tr(title))
+        self.setMinimumSize(500, 500)
+        layout = QVBoxLayout(self)
+        filter_layout = QHBoxLayout()
+        self.date_filter_check = QCheckBox(self.tr("Filter by date"))
+        self.date_from = QDateEdit(QDate.currentDate().addDays(1 - QDate.currentDate().day()))
+        self.date_to = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from, self.date_to):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("dd-MM-yyyy")
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.reload_sessions)
+        self.date_filter_check.toggled.connect(self.date_from.setEnabled)
+        self.date_filter_check.toggled.connect(self.date_to.setEnabled)
+        self.date_filter_check.toggled.connect(self.reload_sessions)
+        filter_layout.addWidget(self.date_filter_check)
+        filter_layout.addWidget(QLabel(self.tr("From")))
+        filter_layout.addWidget(self.date_from)
+        filter_layout.addWidget(QLabel(self.tr("To")))
+        filter_layout.addWidget(self.date_to)
+        layout.addLayout(filter_layout)
+        self.session_list = QListWidget()
+        layout.addWidget(self.session_list, 1)
+        selection_layout = QHBoxLayout()
+        select_all_btn = QPushButton(self.tr("Select All"))
+        select_all_btn.clicked.connect(lambda: self.set_all_checked(True))
+        select_none_btn = QPushButton(self.tr("Select None"))
+        select_none_btn.clicked.connect(lambda: self.set_all_checked(False))
+        selection_layout.addWidget(select_all_btn)
+        selection_layout.addWidget(select_none_btn)
+        selection_layout.addStretch()
+        layout.addLayout(selection_layout)
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        self.reload_sessions()
+
+    def tr(self, text):
+        return translate_text(text)
+
+    def reload_sessions(self):
+        date_from = date_to = None
+        if self.date_filter_check.isChecked():
+            date_from, date_to = self.date_from.date().toPyDate(), self.date_to.date().toPyDate()
+        self.session_list.setUpdatesEnabled(False)
+        self.session_list.clear()
+        for sid, name, timestamp in load_session_index(date_from, date_to):
+            item = QListWidgetItem(f"{name}  ({(timestamp or '')[:10]})")
+            item.setData(Qt.ItemDataRole.UserRole, sid)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            self.session_list.addItem(item)
+        self.session_list.setUpdatesEnabled(True)
+
+    def set_all_checked(self, checked):
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for row in range(self.session_list.count()):
+            self.session_list.item(row).setCheckState(state)
+
+    def selected_session_ids(self):
+        # The list is newest first; bills are exported oldest first.
+        ids = []
+        for row in range(self.session_list.count() - 1, -1, -1):
+            item = self.session_list.item(row)
+            if item.checkState() == Qt.CheckState.Checked:
+                ids.append(item.data(Qt.ItemDataRole.UserRole))
+        return ids
+
+class RepriceReportDialog(QDialog):
+    def __init__(self, report, language="en", parent=None):
+        super().__init__(parent)
+        self.report = report
+        self.language = language
+        self.setWindowTitle(self.tr("Rate Revision Report"))
+        self.setMinimumSize(700, 450)
+        layout = QVBoxLayout(self)
+        changed = sum(1 for row in report if row[2])
+        old_sum = sum(row[4] for row in report)
+        new_sum = sum(row[5] for row in report)
+        summary = QLabel(self.tr("%d of %d bills repriced. Total change: ₹%s") % (changed, len(report), f"{new_sum - old_sum:,.2f}"))
+        summary.setWordWrap(True)
+        layout.addWidget(summary)
+        table = QTableWidget(len(report), len(REPRICE_REPORT_HEADERS))
+        table.setHorizontalHeaderLabels([self.tr(header) for header in REPRICE_REPORT_HEADERS])
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        table.setUpdatesEnabled(False)
+        numeric = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        for row, (_, name, repriced, unmatched, old_total, new_total) in enumerate(report):
+            cells = [name, str(repriced), str(unmatched), f"₹{old_total:,.2f}", f"₹{new_total:,.2f}", f"₹{new_total - old_total:,.2f}"]
+            for column, text in enumerate(cells):
+                cell = QTableWidgetItem(text)
+                if column:
+                    cell.setTextAlignment(numeric)
+                table.setItem(row, column, cell)
+        table.setUpdatesEnabled(True)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(table, 1)
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        save_btn = button_box.addButton(self.tr("Save Report..."), QDialogButtonBox.ButtonRole.ActionRole)
+        save_btn.clicked.connect(self.save_report)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def tr(self, text):
+        return translate_text(text)
+
+    def save_report(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, self.tr("Save Report"), "Rate_Revision.xlsx", self.tr("Excel Files (*.xlsx)"))
+        if not file_path: return
+        from core.excel_export import write_reprice_report
+        try:
+            write_reprice_report(file_path, self.report, self.language)
+        except Exception as e:
+            return show_message_box(self.tr("Error"), self.tr("Could not save the report: %s") % e)
+        show_message_box(self.tr("Export Successful"), self.tr(f"Data exported to:\n{file_path}"))
 
 class MaterialSwitch(QAbstractButton):
     def __init__(self, parent=None):
@@ -161,12 +284,13 @@ class SettingsDialog(QDialog):
     languageChanged = pyqtSignal(str)
     autoSaveChanged = pyqtSignal(int)
     backupPathChanged = pyqtSignal(str)
+    perfReadoutChanged = pyqtSignal(bool)
 
     def __init__(self, settings, parent=None):
         super().__init__(parent)
         self.settings = settings
         self.setWindowTitle(self.tr("Settings"))
-        self.setFixedSize(500, 300)
+        self.setFixedSize(500, 340)
         layout = QFormLayout(self)
         self.dark_mode_switch = MaterialSwitch()
         self.dark_mode_switch.setChecked(self.settings.value("dark_mode", True, type=bool))
@@ -181,10 +305,10 @@ class SettingsDialog(QDialog):
         layout.addRow(QLabel(self.tr("Software Language")), self.language_combo)
         self.autosave_spinbox = QSpinBox()
         self.autosave_spinbox.setRange(1, 60)
-        self.autosave_spinbox.setSuffix(" " + self.tr("minutes"))
-        self.autosave_spinbox.setValue(self.settings.value("auto_save_interval", 5, type=int))
+        self.autosave_spinbox.setSuffix(" " + self.tr("seconds"))
+        self.autosave_spinbox.setValue(self.settings.value("auto_save_idle", 3, type=int))
         self.autosave_spinbox.valueChanged.connect(self.autoSaveChanged.emit)
-        layout.addRow(QLabel(self.tr("Auto-Save Interval (minutes)")), self.autosave_spinbox)
+        layout.addRow(QLabel(self.tr("Auto-Save After Idle (seconds)")), self.autosave_spinbox)
         self.backup_path_edit = QLineEdit(self.settings.value("backup_location", ""))
         self.backup_path_edit.setPlaceholderText(self.tr("No backup path set"))
         self.backup_path_edit.textChanged.connect(self.backupPathChanged.emit)
@@ -194,9 +318,13 @@ class SettingsDialog(QDialog):
         h_layout.addWidget(self.backup_path_edit)
         h_layout.addWidget(browse_button)
         layout.addRow(QLabel(self.tr("Backup & Export Location")), h_layout)
+        self.perf_readout_switch = MaterialSwitch()
+        self.perf_readout_switch.setChecked(self.settings.value("show_perf_readout", False, type=bool))
+        self.perf_readout_switch.toggled.connect(self.perfReadoutChanged.emit)
+        layout.addRow(QLabel(self.tr("Show Performance Readout")), self.perf_readout_switch)
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def choose_backup_location(self):
         path = QFileDialog.getExistingDirectory(self, self.tr("Choose Location"), self.backup_path_edit.text())
@@ -208,10 +336,11 @@ class SettingsDialog(QDialog):
         self.dark_mode_switch.update()
         self.language_combo.setItemText(0, self.tr("English"))
         self.language_combo.setItemText(1, self.tr("Marathi"))
-        self.autosave_spinbox.setSuffix(" " + self.tr("minutes"))
+        self.autosave_spinbox.setSuffix(" " + self.tr("seconds"))
         self.findChild(QLabel, self.tr("Dark Mode")).setText(self.tr("Dark Mode"))
         self.findChild(QLabel, self.tr("Software Language")).setText(self.tr("Software Language"))
-        self.findChild(QLabel, self.tr("Auto-Save Interval (minutes)")).setText(self.tr("Auto-Save Interval (minutes)"))
+        self.findChild(QLabel, self.tr("Auto-Save After Idle (seconds)")).setText(self.tr("Auto-Save After Idle (seconds)"))
         self.findChild(QLabel, self.tr("Backup & Export Location")).setText(self.tr("Backup & Export Location"))
+        self.findChild(QLabel, self.tr("Show Performance Readout")).setText(self.tr("Show Performance Readout"))
         self.backup_path_edit.setPlaceholderText(self.tr("No backup path set"))
         self.findChild(QPushButton, self.tr("Choose Location")).setText(self.tr("Choose Location"))
\ No newline at end of file
@@ -1,15 +1,34 @@
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget, QHeaderView, QTableWidgetItem,
-    QApplication
+    QWidget, QVBoxLayout, QTableWidget, QHeaderView, QTableWidgetItem
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
+from core.constants import EXCESS_KEYS
+from core.utilities import translate_text
+
+# Columns holding (sr no, executed quantity, excess, saving, remarks), the part of a row a bill saves.
+SAVED_COLUMNS = (0, 2, 5, 6, 7)
+
+def diff_texts(tender, executed):
+    # (excess, saving) as shown in the table.
+    try:
+        diff = float(executed) - float(tender)
+    except (ValueError, TypeError):
+        return "-", "-"
+    if abs(diff) < 1e-9:
+        return "-", "-"
+    if diff > 0:
+        return f"{diff:.2f}", "-"
+    return "-", f"{-diff:.2f}"
+
 class ExcessSavingWidget(QWidget):
     dirty_state_changed = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._is_updating = False
+        # One tuple of SAVED_COLUMNS text per row, kept in step with the table.
+        self.rows = []
         self.setup_ui()
 
     def setup_ui(self):
@@ -42,7 +61,7 @@ class ExcessSavingWidget(QWidget):
         ])
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def _calculate_and_set_diff(self, row):
         tender_item = self.table.item(row, 1)
@@ -51,76 +70,61 @@ class ExcessSavingWidget(QWidget):
         saving_item = self.table.item(row, 6)
         if not all([tender_item, executed_item, excess_item, saving_item]):
             return
-        try:
-            tender_qty = float(tender_item.text())
-            executed_qty = float(executed_item.text())
-            diff = executed_qty - tender_qty
-            if abs(diff) < 1e-9:
-                excess_item.setText("-")
-                saving_item.setText("-")
-            elif diff > 0:
-                excess_item.setText(f"{diff:.2f}")
-                saving_item.setText("-")
-            else:
-                excess_item.setText("-")
-                saving_item.setText(f"{-diff:.2f}")
-        except (ValueError, TypeError):
-            excess_item.setText("-")
-            saving_item.setText("-")
+        excess, saving = diff_texts(tender_item.text(), executed_item.text())
+        excess_item.setText(excess)
+        saving_item.setText(saving)
+
+    def _store_row(self, row):
+        self.rows[row] = tuple(self.table.item(row, column).text() for column in SAVED_COLUMNS)
 
     def _on_item_changed(self, item):
         if self._is_updating:
             return
         if item.column() == 2:
             self._calculate_and_set_diff(item.row())
+            self._store_row(item.row())
             self.dirty_state_changed.emit()
         elif item.column() == 7:
+            self._store_row(item.row())
             self.dirty_state_changed.emit()
 
     def update_table(self, items_data):
         self._is_updating = True
-        self.table.setRowCount(0)
-        for item_data in items_data:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            sr_no_item = QTableWidgetItem(item_data.get("sr_no", ""))
-            tender_qty_item = QTableWidgetItem(item_data.get("quantity", "0"))
-            executed_qty_val = item_data.get("executed_quantity", item_data.get("quantity", "0"))
-            executed_qty_item = QTableWidgetItem(str(executed_qty_val))
-            unit_item = QTableWidgetItem(item_data.get("unit", ""))
-            desc_item = QTableWidgetItem(item_data.get("description", ""))
-            excess_item = QTableWidgetItem("-")
-            saving_item = QTableWidgetItem("-")
-            remarks_val = item_data.get("remarks_excess_saving", "As Per Site Condition")
-            remarks_item = QTableWidgetItem(remarks_val)
-            for itm in [sr_no_item, tender_qty_item, unit_item, desc_item, excess_item, saving_item]:
-                itm.setFlags(itm.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, 0, sr_no_item)
-            self.table.setItem(row, 1, tender_qty_item)
-            self.table.setItem(row, 2, executed_qty_item)
-            self.table.setItem(row, 3, unit_item)
-            self.table.setItem(row, 4, desc_item)
-            self.table.setItem(row, 5, excess_item)
-            self.table.setItem(row, 6, saving_item)
-            self.table.setItem(row, 7, remarks_item)
-            self._calculate_and_set_diff(row)
-        self._is_updating = False
+        self.table.blockSignals(True)
+        self.table.setUpdatesEnabled(False)
+        read_only = QTableWidgetItem().flags() & ~Qt.ItemFlag.ItemIsEditable
+        rows = []
+        try:
+            self.table.setRowCount(len(items_data))
+            for row, item_data in enumerate(items_data):
+                quantity = str(item_data.get("quantity", "0"))
+                executed = str(item_data.get("executed_quantity", quantity))
+                values = [
+                    str(item_data.get("sr_no", "")), quantity, executed,
+                    str(item_data.get("unit", "")), str(item_data.get("description", "")), *diff_texts(quantity, executed),
+                    str(item_data.get("remarks_excess_saving", "As Per Site Condition"))
+                ]
+                for column, text in enumerate(values):
+                    cell = QTableWidgetItem(text)
+                    if column not in (2, 7):
+                        cell.setFlags(read_only)
+                    self.table.setItem(row, column, cell)
+                rows.append(tuple(values[column] for column in SAVED_COLUMNS))
+            self.rows = rows
+        finally:
+            self.table.setUpdatesEnabled(True)
+            self.table.blockSignals(False)
+            self._is_updating = False
+
+    def snapshot(self):
+        return list(self.rows)
 
     def gather_data(self):
-        data = {}
-        for row in range(self.table.rowCount()):
-            sr_no = self.table.item(row, 0).text()
-            if sr_no:
-                data[sr_no] = {
-                    "executed_quantity": self.table.item(row, 2).text(),
-                    "excess": self.table.item(row, 5).text(),
-                    "saving": self.table.item(row, 6).text(),
-                    "remarks_excess_saving": self.table.item(row, 7).text()
-                }
-        return data
+        return {row[0]: dict(zip(EXCESS_KEYS, row[1:])) for row in self.rows if row[0]}
 
     def clear_form(self):
         self._is_updating = True
         self.table.setRowCount(0)
+        self.rows = []
         self._is_updating = False
         self.dirty_state_changed.emit()
\ No newline at end of file
@@ -0,0 +1,84 @@
+from PyQt6.QtGui import QUndoCommand
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+# Each command keeps only what its operation touched (the rows it inserted or removed, the cells or the field it
+# changed), so undoing is a single table operation whatever the size of the bill and the history stays small.
+UNDO_LIMIT = 200
+FIELD_EDIT_ID = 1
+
+class InsertRowsCommand(QUndoCommand):
+    def __init__(self, widget, start, rows, text):
+        super().__init__(text)
+        self.widget = widget
+        self.start = start
+        self.rows = rows
+
+    def redo(self):
+        self.widget.insert_rows(self.start, self.rows)
+
+    def undo(self):
+        self.widget.take_rows(self.start, len(self.rows))
+
+class RemoveRowsCommand(InsertRowsCommand):
+    def redo(self):
+        InsertRowsCommand.undo(self)
+
+    def undo(self):
+        InsertRowsCommand.redo(self)
+
+class EditCellsCommand(QUndoCommand):
+    # cells maps column -> (old text, new text) for the cells one edit changed in a row, the line total included.
+    # The edit is already in the table when the command is pushed, so the first redo has nothing to do.
+    def __init__(self, widget, row, cells, text):
+        super().__init__(text)
+        self.widget = widget
+        self.row = row
+        self.cells = cells
+        self.applied = True
+
+    def redo(self):
+        if self.applied:
+            self.applied = False
+            return
+        self.widget.set_cells(self.row, {column: new for column, (_, new) in self.cells.items()})
+
+    def undo(self):
+        self.widget.set_cells(self.row, {column: old for column, (old, _) in self.cells.items()})
+
+class FieldEditCommand(QUndoCommand):
+    # Keystrokes in one field merge into a single step until another command comes in between.
+    def __init__(self, widget, field, old, new, text):
+        super().__init__(text)
+        self.widget = widget
+        self.field = field
+        self.old = old
+        self.new = new
+        self.applied = True
+
+    def id(self):
+        return FIELD_EDIT_ID
+
+    def mergeWith(self, other):
+        if other.field is not self.field:
+            return False
+        self.new = other.new
+        self.setObsolete(self.new == self.old)
+        return True
+
+    def redo(self):
+        if self.applied:
+            self.applied = False
+            return
+        self.widget.set_field_text(self.field, self.new)
+
+    def undo(self):
+        self.widget.set_field_text(self.field, self.old)
+
+class RecordingDelegate(QStyledItemDelegate):
+    # Hands each committed cell edit to on_commit(row, column, commit) so the cells' old text can be recorded.
+    def __init__(self, on_commit, parent=None):
+        super().__init__(parent)
+        self.on_commit = on_commit
+
+    def setModelData(self, editor, model, index):
+        self.on_commit(index.row(), index.column(), lambda: super(RecordingDelegate, self).setModelData(editor, model, index))
@@ -1,11 +1,14 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QTabWidget, QScrollArea, QFrame,
     QFormLayout, QLabel, QLineEdit, QDateEdit, QComboBox, QTextEdit,
-    QPushButton, QHBoxLayout, QApplication
+    QPushButton, QHBoxLayout
 )
 from PyQt6.QtCore import QDate, Qt, pyqtSignal
 from PyQt6.QtGui import QDoubleValidator
 
+from core.data_manager import bill_data
+from core.tracing import span
+from core.utilities import translate_text
 from .construction_items import ConstructionItemsWidget
 from .excess_saving import ExcessSavingWidget
 from .dialogs import MessageEditorDialog, QDialog
@@ -17,6 +20,11 @@ class MergedFormWidget(QWidget):
         super().__init__(parent)
         self.inputs = {}
         self.is_dirty = False
+        # Bumped when another bill is loaded or a new one started, and on every edit; a background save
+        # compares them to tell whether what it wrote is still what the form shows.
+        self.load_count = 0
+        self.change_count = 0
+        self._loading = False
         self.message_text = ""
         self.setup_ui()
         self.update_styles(True)
@@ -98,7 +106,7 @@ class MergedFormWidget(QWidget):
         self.excess_saving_widget.retranslate()
 
     def tr(self, text):
-        return QApplication.instance().tr(text)
+        return translate_text(text)
 
     def open_message_editor(self):
         dialog = MessageEditorDialog(self.message_text, self)
@@ -110,6 +118,7 @@ class MergedFormWidget(QWidget):
                 self.set_dirty()
         
     def sync_excess_saving_table(self):
+        if self._loading: return
         existing_excess_data = self.excess_saving_widget.gather_data()
         construction_data = self.construction_items_widget.gather_data()
         items_data = construction_data.get('items', [])
@@ -121,39 +130,52 @@ class MergedFormWidget(QWidget):
         self.excess_saving_widget.update_table(items_data)
 
     def set_dirty(self):
+        if self._loading: return
         self.is_dirty = True
+        self.change_count += 1
         self.something_changed.emit()
 
     def clear_dirty(self):
         self.is_dirty = False
 
-    def gather_data(self):
-        data = {}
+    def snapshot(self):
+        # Copies of the form's text and row tuples only; data_manager.bill_data turns it into the session dict,
+        # on whichever thread does the saving.
+        fields = {}
         for key, widget in self.inputs.items():
-            if isinstance(widget, QLineEdit): data[key] = widget.text()
-            elif isinstance(widget, QDateEdit): data[key] = widget.date().toString("dd-MM-yyyy")
-            elif isinstance(widget, QComboBox): data[key] = widget.currentText()
-        data["message"] = self.message_text
-        construction_data = self.construction_items_widget.gather_data()
-        data.update(construction_data)
-        excess_data = self.excess_saving_widget.gather_data()
-        for item in data.get("items", []):
-            sr_no = item.get("sr_no")
-            if sr_no in excess_data:
-                item.update(excess_data[sr_no])
-        return data
+            if isinstance(widget, QLineEdit): fields[key] = widget.text()
+            elif isinstance(widget, QDateEdit): fields[key] = widget.date().toString("dd-MM-yyyy")
+            elif isinstance(widget, QComboBox): fields[key] = widget.currentText()
+        snapshot = {"fields": fields, "message": self.message_text, "excess_rows": self.excess_saving_widget.snapshot()}
+        snapshot.update(self.construction_items_widget.snapshot())
+        return snapshot
+
+    def gather_data(self):
+        with span("gather_data") as gather_span:
+            data = bill_data(self.snapshot())
+            gather_span.set(items=len(data["items"]))
+            return data
 
     def load_data(self, data):
-        for key, widget in self.inputs.items():
-            if key in data:
-                val = data.get(key, "")
-                if isinstance(widget, QLineEdit): widget.setText(val)
-                elif isinstance(widget, QDateEdit): widget.setDate(QDate.fromString(val, "dd-MM-yyyy"))
-                elif isinstance(widget, QComboBox): widget.setCurrentText(val)
-        self.message_text = data.get("message", "")
-        self.message_preview.setPlainText(self.message_text)
-        self.construction_items_widget.load_data(data)
+        # Field and table signals are swallowed while a session loads; listeners get a single change at the end.
+        self._loading = True
+        try:
+            for key, widget in self.inputs.items():
+                if key in data:
+                    val = data.get(key, "")
+                    if isinstance(widget, QLineEdit): widget.setText(val)
+                    elif isinstance(widget, QDateEdit): widget.setDate(QDate.fromString(val, "dd-MM-yyyy"))
+                    elif isinstance(widget, QComboBox): widget.setCurrentText(val)
+            self.message_text = data.get("message", "")
+            self.message_preview.setPlainText(self.message_text)
+            self.construction_items_widget.load_data(data)
+            # Saved items already carry their executed quantities and remarks.
+            self.excess_saving_widget.update_table(data.get("items", []))
+        finally:
+            self._loading = False
+        self.load_count += 1
         self.clear_dirty()
+        self.something_changed.emit()
 
     def clear_form(self):
         for widget in self.inputs.values():
@@ -163,6 +185,7 @@ class MergedFormWidget(QWidget):
         self.message_text = ""
         self.message_preview.clear()
         self.construction_items_widget.clear_form()
+        self.load_count += 1
         self.clear_dirty()
 
     def update_styles(self, dark_mode):
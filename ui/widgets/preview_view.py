@@ -0,0 +1,219 @@
+from collections import OrderedDict
+from PyQt6.QtWidgets import QAbstractScrollArea, QWidget, QHBoxLayout, QToolButton, QSpinBox, QLabel, QComboBox
+from PyQt6.QtCore import Qt, QRectF, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QPixmap
+
+from core.utilities import translate_text
+
+PAGE_GAP = 16
+ZOOM_STEP = 0.05
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+MAX_CACHED_PAGES = 24
+
+class PreviewView(QAbstractScrollArea):
+    page_changed = pyqtSignal(int, int)
+    document_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.document = None
+        self.zoom = 1.0
+        self.current_page = 0
+        self.background = QColor("#e0e0e0")
+        self._tiles = OrderedDict()
+        self.verticalScrollBar().setSingleStep(40)
+        self.verticalScrollBar().valueChanged.connect(lambda _: self._update_current_page())
+
+    def set_document(self, document):
+        # The document arrives already laid out (see DocGenWorker) and is owned by whoever supplies it,
+        # so several views can show the same one.
+        self.document = document
+        self._tiles.clear()
+        self._update_scrollbars()
+        self._update_current_page(force=True)
+        self.document_changed.emit()
+        self.viewport().update()
+
+    def clear(self):
+        self.set_document(None)
+
+    def page_count(self):
+        return self.document.pageCount() if self.document is not None else 0
+
+    def sections(self):
+        if self.document is None:
+            return []
+        return self.document.property("preview_sections") or []
+
+    def _scaled_page_size(self):
+        size = self.document.pageSize()
+        return size.width() * self.zoom, size.height() * self.zoom
+
+    def _page_stride(self):
+        return self._scaled_page_size()[1] + PAGE_GAP
+
+    def _update_scrollbars(self):
+        if self.document is None:
+            self.verticalScrollBar().setRange(0, 0)
+            self.horizontalScrollBar().setRange(0, 0)
+            return
+        page_w, _ = self._scaled_page_size()
+        content_h = PAGE_GAP + self.page_count() * self._page_stride()
+        content_w = page_w + 2 * PAGE_GAP
+        viewport = self.viewport().size()
+        self.verticalScrollBar().setPageStep(viewport.height())
+        self.verticalScrollBar().setRange(0, max(0, int(content_h - viewport.height())))
+        self.horizontalScrollBar().setPageStep(viewport.width())
+        self.horizontalScrollBar().setRange(0, max(0, int(content_w - viewport.width())))
+
+    def _page_rect(self, index):
+        page_w, page_h = self._scaled_page_size()
+        x = max(PAGE_GAP, (self.viewport().width() - page_w) / 2) - self.horizontalScrollBar().value()
+        y = PAGE_GAP + index * self._page_stride() - self.verticalScrollBar().value()
+        return QRectF(x, y, page_w, page_h)
+
+    def visible_pages(self):
+        if self.document is None or not self.page_count():
+            return range(0)
+        top = self.verticalScrollBar().value()
+        first = max(0, int((top - PAGE_GAP) // self._page_stride()))
+        last = min(self.page_count() - 1, int((top + self.viewport().height()) // self._page_stride()))
+        return range(first, last + 1)
+
+    def _tile(self, index):
+        # Pages are rasterised once per zoom level; scrolling afterwards is just a pixmap blit.
+        tile = self._tiles.get(index)
+        if tile is not None:
+            self._tiles.move_to_end(index)
+            return tile
+        ratio = self.devicePixelRatioF()
+        page_size = self.document.pageSize()
+        page_w, page_h = self._scaled_page_size()
+        tile = QPixmap(max(1, int(page_w * ratio)), max(1, int(page_h * ratio)))
+        tile.setDevicePixelRatio(ratio)
+        tile.fill(Qt.GlobalColor.white)
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.scale(self.zoom, self.zoom)
+        painter.translate(0, -index * page_size.height())
+        self.document.drawContents(painter, QRectF(0, index * page_size.height(), page_size.width(), page_size.height()))
+        painter.end()
+        self._tiles[index] = tile
+        while len(self._tiles) > MAX_CACHED_PAGES:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.background)
+        if self.document is None:
+            return
+        for index in self.visible_pages():
+            target = self._page_rect(index)
+            painter.drawPixmap(target.topLeft(), self._tile(index))
+
+    def _update_current_page(self, force=False):
+        page = 0
+        if self.document is not None and self.page_count():
+            center = self.verticalScrollBar().value() + self.viewport().height() / 2
+            page = min(self.page_count() - 1, max(0, int((center - PAGE_GAP) // self._page_stride())))
+        if force or page != self.current_page:
+            self.current_page = page
+            self.page_changed.emit(page, self.page_count())
+
+    def go_to_page(self, index):
+        if self.document is None:
+            return
+        index = min(self.page_count() - 1, max(0, index))
+        self.verticalScrollBar().setValue(int(index * self._page_stride()))
+
+    def set_zoom(self, zoom):
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+        if zoom == self.zoom:
+            return
+        # Keep the same part of the document in view; zooming re-rasterises pages but never re-lays them out.
+        bar = self.verticalScrollBar()
+        anchor = (bar.value() + self.viewport().height() / 2) / self.zoom
+        self.zoom = zoom
+        self._tiles.clear()
+        self._update_scrollbars()
+        bar.setValue(int(anchor * self.zoom - self.viewport().height() / 2))
+        self.viewport().update()
+
+    def zoomIn(self, steps=1):
+        self.set_zoom(self.zoom + steps * ZOOM_STEP)
+
+    def zoomOut(self, steps=1):
+        self.set_zoom(self.zoom - steps * ZOOM_STEP)
+
+    def wheelEvent(self, event):
+        if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.zoomIn(2) if event.angleDelta().y() > 0 else self.zoomOut(2)
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+class PreviewNavigator(QWidget):
+    def __init__(self, view, parent=None):
+        super().__init__(parent)
+        self.view = view
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.prev_btn = QToolButton()
+        self.prev_btn.setText("◀")
+        self.prev_btn.clicked.connect(lambda: self.view.go_to_page(self.view.current_page - 1))
+        self.page_spin = QSpinBox()
+        self.page_spin.setMinimum(1)
+        self.page_spin.setKeyboardTracking(False)
+        self.page_spin.valueChanged.connect(lambda value: self.view.go_to_page(value - 1))
+        self.count_label = QLabel()
+        self.next_btn = QToolButton()
+        self.next_btn.setText("▶")
+        self.next_btn.clicked.connect(lambda: self.view.go_to_page(self.view.current_page + 1))
+        self.section_combo = QComboBox()
+        self.section_combo.setMinimumContentsLength(18)
+        self.section_combo.activated.connect(lambda index: self.view.go_to_page(self.section_combo.itemData(index)))
+        layout.addWidget(self.section_combo)
+        layout.addWidget(self.prev_btn)
+        layout.addWidget(self.page_spin)
+        layout.addWidget(self.count_label)
+        layout.addWidget(self.next_btn)
+        view.page_changed.connect(self.on_page_changed)
+        view.document_changed.connect(self.reload_sections)
+        self.retranslate()
+        self.reload_sections()
+
+    def tr(self, text):
+        return translate_text(text)
+
+    def retranslate(self):
+        self.prev_btn.setToolTip(self.tr("Previous Page"))
+        self.next_btn.setToolTip(self.tr("Next Page"))
+        self.reload_sections()
+
+    def reload_sections(self):
+        self.section_combo.clear()
+        for title, page in self.view.sections():
+            self.section_combo.addItem(title or self.tr("Page %d") % (page + 1), page)
+        self.on_page_changed(self.view.current_page, self.view.page_count())
+
+    def on_page_changed(self, page, count):
+        self.page_spin.blockSignals(True)
+        self.page_spin.setMaximum(max(1, count))
+        self.page_spin.setValue(page + 1)
+        self.page_spin.blockSignals(False)
+        self.count_label.setText(f"/ {count}")
+        section_index = -1
+        for index in range(self.section_combo.count()):
+            if self.section_combo.itemData(index) <= page:
+                section_index = index
+        self.section_combo.setCurrentIndex(section_index)